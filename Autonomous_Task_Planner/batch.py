@@ -0,0 +1,224 @@
+"""
+Batch goal runner: plans many goals at once and streams final states to JSON lines.
+
+Usage:
+    python batch.py GOALS_FILE [--workers N] [--mode process|async] [--executor local|llm]
+                    [--output states.jsonl] [--rpm N]
+
+GOALS_FILE has one goal per line (blank lines and # comments are skipped).
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from state import initialize_state
+from config import BATCH_WORKERS, LLM_REQUESTS_PER_MINUTE
+
+
+class SharedRateLimiter:
+    """
+    Request spacing shared by every process of a batch:
+    each call reserves the next free slot, 60 / requests_per_minute seconds
+    after the previous one, and waits for it
+    """
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = multiprocessing.Value("d", 0.0)
+
+    def _reserve(self) -> float:
+        with self._next.get_lock():
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+        return slot - now
+
+    def acquire(self):
+        if self.interval:
+            delay = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def acquire_async(self):
+        if self.interval:
+            delay = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+def rate_limited(execute, limiter: SharedRateLimiter):
+    """
+    execute(task) that waits for the shared limiter first; keeps the
+    executor's version and determinism for the task cache
+    """
+    @functools.wraps(execute)
+    def limited(task):
+        limiter.acquire()
+        return execute(task)
+
+    return limited
+
+
+def load_goals(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def error_state(goal: str, error: Exception):
+    state = initialize_state(goal)
+    state["status"] = "error"
+    state["error"] = f"{type(error).__name__}: {error}"
+    return state
+
+
+# ----- Process mode -----
+
+_worker_execute = None
+
+
+def _init_worker(executor: str, limiter: SharedRateLimiter):
+    global _worker_execute
+
+    if executor == "llm":
+        from executor_llm import execute_task
+        _worker_execute = rate_limited(execute_task, limiter)
+    else:
+        from executor import execute_task
+        _worker_execute = execute_task
+
+
+def _run_goal(goal: str) -> dict:
+    from main import run
+
+    try:
+        return run(goal, execute=_worker_execute)
+    except Exception as e:
+        return error_state(goal, e)
+
+
+def _run_processes(goals, workers, executor, limiter, on_state):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(executor, limiter)) as pool:
+        futures = {pool.submit(_run_goal, goal): i for i, goal in enumerate(goals)}
+        for future in as_completed(futures):
+            on_state(futures[future], future.result())
+
+
+# ----- Async mode -----
+
+async def _run_async(goals, workers, executor, limiter, on_state):
+    from main import run_async
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def one(i, goal, execute):
+        async with semaphore:
+            try:
+                state = await run_async(goal, execute)
+            except Exception as e:
+                state = error_state(goal, e)
+        on_state(i, state)
+
+    if executor == "llm":
+        from executor_llm import AsyncExecutor
+
+        async with AsyncExecutor() as llm:
+            @functools.wraps(llm.execute_task)
+            async def execute(task):
+                await limiter.acquire_async()
+                return await llm.execute_task(task)
+
+            execute.version, execute.deterministic = llm.version, llm.deterministic
+            await asyncio.gather(*(one(i, goal, execute) for i, goal in enumerate(goals)))
+    else:
+        await asyncio.gather(*(one(i, goal, None) for i, goal in enumerate(goals)))
+
+
+def run_many(goals: list[str], workers: int = BATCH_WORKERS, mode: str = "process", executor: str = "local",
+             output: str | None = None, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE) -> tuple[list, dict]:
+    """
+    Batch Runner:
+    - Runs goals on `workers` processes (mode="process") or as concurrent
+      async runs in one event loop (mode="async")
+    - LLM calls of all workers share one requests-per-minute limit
+    - Each final state is appended to `output` (JSON lines) as soon as it finishes
+    - Returns (states in goal order, aggregate stats)
+    """
+    if mode not in ("process", "async"):
+        raise ValueError(f"Unknown mode {mode!r}; expected 'process' or 'async'")
+
+    limiter = SharedRateLimiter(requests_per_minute if executor == "llm" else 0)
+    states = [None] * len(goals)
+    sink = open(output, "a", encoding="utf-8") if output else None
+    start = time.perf_counter()
+
+    def on_state(i, state):
+        states[i] = state
+        if sink is not None:
+            sink.write(json.dumps(state.to_dict()) + "\n")
+            sink.flush()
+
+    try:
+        if mode == "process":
+            _run_processes(goals, workers, executor, limiter, on_state)
+        else:
+            asyncio.run(_run_async(goals, workers, executor, limiter, on_state))
+    finally:
+        if sink is not None:
+            sink.close()
+
+    return states, summarize(states, time.perf_counter() - start)
+
+
+def summarize(states: list[dict], seconds: float) -> dict:
+    total = len(states)
+    completed = sum(state["status"] == "completed" for state in states)
+    errors = sum(state["status"] == "error" for state in states)
+    return {
+        "goals": total,
+        "completed": completed,
+        "failed": total - completed - errors,
+        "errors": errors,
+        "failure_rate": (total - completed) / total if total else 0.0,
+        "seconds": seconds,
+        "goals_per_second": total / seconds if seconds else 0.0,
+        "tasks_completed": sum(len(state.get("completed_tasks", [])) for state in states),
+        "replans": sum(state.get("replan_count", 0) for state in states),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("goals_file")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--mode", choices=["process", "async"], default="process")
+    parser.add_argument("--executor", choices=["local", "llm"], default="local")
+    parser.add_argument("--output", help="append final states to this JSON lines file")
+    parser.add_argument("--rpm", type=float, default=LLM_REQUESTS_PER_MINUTE, help="LLM requests per minute, shared")
+    args = parser.parse_args()
+
+    goals = load_goals(args.goals_file)
+    if not goals:
+        print("No goals found in", args.goals_file)
+        sys.exit(1)
+
+    _, stats = run_many(goals, args.workers, args.mode, args.executor, args.output, args.rpm)
+
+    print(f"Goals:        {stats['goals']}")
+    print(f"Completed:    {stats['completed']}")
+    print(f"Failed:       {stats['failed']}")
+    print(f"Errors:       {stats['errors']}")
+    print(f"Failure rate: {stats['failure_rate']:.1%}")
+    print(f"Wall time:    {stats['seconds']:.2f}s")
+    print(f"Throughput:   {stats['goals_per_second']:.2f} goals/s")
+    print(f"Tasks done:   {stats['tasks_completed']} ({stats['replans']} replans)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime, timezone
+
+from state import RunState, initialize_state, apply_outcomes
+from scheduler import in_plan_order
+from config import CHECKPOINT_DIR, CHECKPOINT_SNAPSHOT_EVERY
+
+EVENTS_FILE = "events.jsonl"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class Checkpointer:
+    """
+    Durable run state:
+    - Every plan, every finished task and every applied batch of outcomes is
+      appended to events.jsonl and fsynced before the run moves on
+    - Every snapshot_every events the full state is written to snapshot.json,
+      with the log offset it covers, so resuming replays only newer events
+    - Tasks finished but not yet applied when the process died are restored
+      as pending outcomes and are not executed again
+    """
+
+    def __init__(self, path: str, snapshot_every: int = CHECKPOINT_SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.plan = []
+        self.dependencies = {}
+        self.pending = {}
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._log = open(os.path.join(path, EVENTS_FILE), "a", encoding="utf-8")
+
+    # ----- Writing -----
+
+    def _append(self, event: dict, state: dict):
+        with self._lock:
+            self._log.write(json.dumps(event) + "\n")
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._since_snapshot += 1
+
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot(state)
+
+    def _write_snapshot(self, state: dict):
+        snapshot = {
+            "offset": self._log.tell(),
+            "state": state.to_dict(),
+            "plan": self.plan,
+            "dependencies": self.dependencies,
+            "pending": self.pending,
+        }
+        temp = os.path.join(self.path, SNAPSHOT_FILE + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, os.path.join(self.path, SNAPSHOT_FILE))
+        self._since_snapshot = 0
+
+    def record_start(self, state: dict):
+        self._append({"event": "start", "goal": state["goal"]}, state)
+
+    def record_plan(self, state: dict):
+        """
+        Logs a new plan; a plan restored on resume is not logged again
+        """
+        if self.plan and state["plan"] == self.plan:
+            return
+
+        self.plan = list(state["plan"])
+        self.dependencies = dict(state["dependencies"])
+        self.pending = {}
+        self._append({"event": "plan", "plan": self.plan, "dependencies": self.dependencies}, state)
+
+    def record_task(self, state: dict, task: str, outcome: tuple):
+        decision, result = outcome
+        with self._lock:
+            self.pending[task] = [decision, result]
+        self._append({"event": "task", "task": task, "decision": decision, "result": result}, state)
+
+    def record_applied(self, state: dict):
+        self.plan = []
+        self.dependencies = {}
+        self.pending = {}
+        self._append({"event": "applied"}, state)
+
+    def record_final(self, state: dict):
+        self._append({"event": "final", "status": state["status"]}, state)
+
+    def wrap(self, state: dict, run_task):
+        """
+        run_task that returns the logged outcome of a task finished before a
+        restart, and logs every new outcome
+        """
+        def checkpointed(task, cancelled=None):
+            if task in self.pending:
+                return tuple(self.pending[task])
+
+            outcome = run_task(task, cancelled)
+            if outcome[0] != "cancelled":
+                self.record_task(state, task, outcome)
+            return outcome
+
+        return checkpointed
+
+    def wrap_async(self, state: dict, run_task):
+        async def checkpointed(task):
+            if task in self.pending:
+                return tuple(self.pending[task])
+
+            outcome = await run_task(task)
+            self.record_task(state, task, outcome)
+            return outcome
+
+        return checkpointed
+
+    def close(self):
+        self._log.close()
+
+    # ----- Reading -----
+
+    def restore(self) -> dict:
+        """
+        Rebuilds the state from the latest snapshot plus newer events. A
+        torn last event (the process died mid-write) is dropped from the log.
+        """
+        state = None
+        offset = 0
+        snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            state = RunState.from_dict(snapshot["state"])
+            self.plan = snapshot["plan"]
+            self.dependencies = snapshot["dependencies"]
+            self.pending = snapshot["pending"]
+            offset = snapshot["offset"]
+
+        events_path = os.path.join(self.path, EVENTS_FILE)
+        with open(events_path, "rb") as f:
+            f.seek(offset)
+
+            for line in iter(f.readline, b""):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated event")
+                    event = json.loads(line)
+                except ValueError:
+                    break  # Torn write at the moment of the crash
+
+                offset += len(line)
+                state = self._replay(state, event)
+
+        # Cut a torn last line off, so events logged from now on are not glued to it
+        if offset < os.path.getsize(events_path):
+            with self._lock:
+                os.truncate(events_path, offset)
+                self._log.seek(0, os.SEEK_END)
+
+        if state is None:
+            raise ValueError(f"No checkpoint found in {self.path}")
+
+        return state
+
+    def _replay(self, state: dict | None, event: dict) -> dict | None:
+        kind = event["event"]
+
+        if kind == "start":
+            state = initialize_state(event["goal"])
+
+        elif kind == "plan":
+            self.plan = event["plan"]
+            self.dependencies = event["dependencies"]
+            self.pending = {}
+            state["plan"] = list(self.plan)
+            state["dependencies"] = dict(self.dependencies)
+
+        elif kind == "task":
+            self.pending[event["task"]] = [event["decision"], event["result"]]
+
+        elif kind == "applied":
+            outcomes = in_plan_order(self.plan, {t: tuple(o) for t, o in self.pending.items()})
+            apply_outcomes(state, outcomes)
+            self.plan, self.dependencies, self.pending = [], {}, {}
+
+        elif kind == "final":
+            state["status"] = event["status"]
+
+        return state
+
+
+def new_checkpoint_dir(root: str = CHECKPOINT_DIR) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return os.path.join(root, f"run-{stamp}-{uuid.uuid4().hex[:8]}")
+
+
+def open_run(goal: str, checkpoint_dir: str | None = None, resume_from: str | None = None) -> tuple:
+    """
+    (state, checkpointer) for a new or resumed run; checkpointer is None
+    when checkpointing is off (no checkpoint_dir, resume_from or CHECKPOINT_DIR)
+    """
+    if resume_from:
+        checkpointer = Checkpointer(resume_from)
+        state = checkpointer.restore()
+
+        if goal and goal != state["goal"]:
+            checkpointer.close()
+            raise ValueError(f"Checkpoint in {resume_from} is for goal {state['goal']!r}, not {goal!r}")
+
+        state["checkpoint"] = resume_from
+        return state, checkpointer
+
+    if checkpoint_dir is None and CHECKPOINT_DIR:
+        checkpoint_dir = new_checkpoint_dir()
+
+    state = initialize_state(goal)
+
+    if checkpoint_dir is None:
+        return state, None
+
+    checkpointer = Checkpointer(checkpoint_dir)
+    state["checkpoint"] = checkpoint_dir
+    checkpointer.record_start(state)
+    return state, checkpointer
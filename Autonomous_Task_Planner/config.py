@@ -2,3 +2,21 @@ MAX_REPLANS = 3
 MAX_RETRIES_PER_TASK = 2
 MAX_TOTAL_TASKS = 10
 MAX_EXECUTED_TASKS = 20
+MAX_PARALLEL_TASKS = 4
+RESULT_SPILL_BYTES = 4096
+LLM_TIMEOUT_SECONDS = 60
+LLM_MAX_CONCURRENCY = 8
+TASK_CACHE_POLICY = "deterministic"
+TASK_CACHE_MAX_ENTRIES = 1024
+TASK_CACHE_PATH = None
+CHECKPOINT_DIR = None
+CHECKPOINT_SNAPSHOT_EVERY = 10
+EVALUATOR = "keyword"
+EVALUATOR_EMBEDDING_MODEL = None
+EVALUATOR_ACCEPT_CONFIDENCE = 0.5
+EVALUATOR_REPLAN_RELEVANCE = 0.04
+EVALUATOR_BATCH_WAIT_SECONDS = 0.005
+BATCH_WORKERS = 4
+LLM_REQUESTS_PER_MINUTE = 30
+TRACING_ENABLED = True
+TRACE_DIR = None
@@ -55,3 +55,7 @@ def execute_task(task: str) -> tuple[str, bool]:
 
     success = True
     return result, success
+
+
+execute_task.version = "rules-1"
+execute_task.deterministic = True
@@ -1,7 +1,15 @@
 import os
-from groq import Groq
+import asyncio
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+import httpx
+from groq import Groq, AsyncGroq
+
+from config import LLM_TIMEOUT_SECONDS, LLM_MAX_CONCURRENCY
+from tracing import record_usage
+
+MODEL = "llama-3.3-70b-versatile"
+
+client = Groq(api_key=os.getenv("GROQ_API_KEY"), timeout=LLM_TIMEOUT_SECONDS)
 
 SYSTEM_PROMPT = """
 You are an autonomous task execution agent.
@@ -10,23 +18,109 @@ Do not plan, do not evaluate, do not ask questions.
 Produce clear, structured, actionable output.
 """
 
+
+def build_messages(task: str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": task}
+    ]
+
+
+def record_response_usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        record_usage(usage.prompt_tokens or 0, usage.completion_tokens or 0)
+
+
 def execute_task(task: str) -> tuple[str, bool]:
     if not task or not isinstance(task, str):
         return "", False
 
     try:
         response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": task}
-            ],
+            model=MODEL,
+            messages=build_messages(task),
             temperature=0.3,
             max_tokens=500,
         )
 
+        record_response_usage(response)
         result = response.choices[0].message.content.strip()
         return result, True
 
     except Exception as e:
         return f"Execution error: {str(e)}", False
+
+
+execute_task.version = f"groq:{MODEL}"
+execute_task.deterministic = False
+
+
+class AsyncExecutor:
+    """
+    Async Executor Agent:
+    - One AsyncGroq client on a shared, keep-alive HTTP connection pool
+    - At most max_concurrency calls in flight; the rest wait their turn
+    - Each call is bounded by a timeout; cancelling the caller cancels the request
+    - execute_task returns the same (result, success) as the sync executor
+
+    Create it inside the event loop that uses it:
+
+        async with AsyncExecutor() as llm:
+            result, success = await llm.execute_task(task)
+    """
+
+    version = f"groq:{MODEL}"
+    deterministic = False
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, timeout: float = LLM_TIMEOUT_SECONDS,
+                 api_key: str | None = None, base_url: str | None = None):
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=timeout,
+        )
+        self.client = AsyncGroq(
+            api_key=api_key or os.getenv("GROQ_API_KEY"),
+            base_url=base_url,
+            timeout=timeout,
+            http_client=self._http,
+        )
+
+    async def execute_task(self, task: str, timeout: float | None = None) -> tuple[str, bool]:
+        if not task or not isinstance(task, str):
+            return "", False
+
+        timeout = self.timeout if timeout is None else timeout
+
+        try:
+            async with self._semaphore:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=MODEL,
+                        messages=build_messages(task),
+                        temperature=0.3,
+                        max_tokens=500,
+                    ),
+                    timeout,
+                )
+
+            record_response_usage(response)
+            result = response.choices[0].message.content.strip()
+            return result, True
+
+        except asyncio.TimeoutError:
+            return f"Execution error: no response within {timeout}s", False
+
+        except Exception as e:
+            return f"Execution error: {str(e)}", False
+
+    async def aclose(self):
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
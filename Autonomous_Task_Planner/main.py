@@ -1,99 +1,408 @@
-from state import initialize_state
-from planner import plan_tasks
+import time
+import queue
+import asyncio
+import functools
+import threading
+
+from state import apply_outcomes
+from planner import plan_tasks, plan_dependencies
 from executor import execute_task
 from evaluator import evaluate_task
-from config import MAX_REPLANS, MAX_RETRIES_PER_TASK, MAX_TOTAL_TASKS, MAX_EXECUTED_TASKS
+from scheduler import execute_plan, execute_plan_async
+from task_cache import TaskCache, shared_cache
+from checkpoint import open_run
+from tracing import Tracer, take_usage, export_run, format_summary
+from config import MAX_RETRIES_PER_TASK, MAX_TOTAL_TASKS, MAX_PARALLEL_TASKS, EVALUATOR, TRACING_ENABLED
+
+
+def run_task(task: str, execute=execute_task, cache=None, evaluate=evaluate_task,
+             on_event=None, cancelled=None) -> tuple[str, str]:
+    """
+    Executes and evaluates one task, retrying up to MAX_RETRIES_PER_TASK times.
+    Returns ("accept", result), ("replan", result) or ("exhausted", "").
+    With a RunCache, a result cached for the same task is reused instead of executing.
+    Once the cancelled event is set, no further attempt is made and
+    ("cancelled", "") is returned.
+    """
+    retry_count = 0
+
+    while retry_count <= MAX_RETRIES_PER_TASK:
+        if cancelled is not None and cancelled.is_set():
+            return "cancelled", ""
+
+        attempt = retry_count + 1
+        emit(on_event, "task_started", task=task, attempt=attempt)
+        started = time.perf_counter()
+        result = cache.get(task) if cache is not None else None
+        cached = result is not None
+
+        if cached:
+            success = True
+        else:
+            result, success = execute(task)
+
+            if success and cache is not None:
+                cache.put(task, result)
+
+        emit(on_event, "task_result", task=task, attempt=attempt, result=result, success=success,
+             cached=cached, tokens=None if cached else take_usage(), seconds=time.perf_counter() - started)
+
+        if not success:
+            retry_count += 1
+            continue
+
+        started = time.perf_counter()
+        decision = evaluate(task, result)
+        emit(on_event, "evaluation", task=task, attempt=attempt, decision=decision,
+             seconds=time.perf_counter() - started)
 
+        if decision == "accept":
+            return "accept", result
 
-def run(goal: str):
-    state = initialize_state(goal)
+        if cache is not None:
+            cache.reject(task)
 
-    while state["status"] == "running":
-        if state["replan_count"] > 0 and state["completed_tasks"]:
+        if decision == "replan":
+            return "replan", result
+
+        retry_count += 1
+
+    return "exhausted", ""
+
+
+async def run_task_async(task: str, execute, cache=None, evaluate=evaluate_task,
+                        on_event=None) -> tuple[str, str]:
+    """
+    Same as run_task, awaiting an async executor such as
+    executor_llm.AsyncExecutor.execute_task (the evaluator runs in a
+    worker thread so concurrent evaluations can be batched)
+    """
+    retry_count = 0
+
+    while retry_count <= MAX_RETRIES_PER_TASK:
+        attempt = retry_count + 1
+        emit(on_event, "task_started", task=task, attempt=attempt)
+        started = time.perf_counter()
+        result = cache.get(task) if cache is not None else None
+        cached = result is not None
+
+        if cached:
+            success = True
+        else:
+            result, success = await execute(task)
+
+            if success and cache is not None:
+                cache.put(task, result)
+
+        emit(on_event, "task_result", task=task, attempt=attempt, result=result, success=success,
+             cached=cached, tokens=None if cached else take_usage(), seconds=time.perf_counter() - started)
+
+        if not success:
+            retry_count += 1
+            continue
+
+        started = time.perf_counter()
+        decision = await asyncio.to_thread(evaluate, task, result)
+        emit(on_event, "evaluation", task=task, attempt=attempt, decision=decision,
+             seconds=time.perf_counter() - started)
+
+        if decision == "accept":
+            return "accept", result
+
+        if cache is not None:
+            cache.reject(task)
+
+        if decision == "replan":
+            return "replan", result
+
+        retry_count += 1
+
+    return "exhausted", ""
+
+
+def emit(on_event, kind: str, **fields):
+    """
+    Sends {"type": kind, "time": ..., **fields} to on_event, if given
+    """
+    if on_event is not None:
+        on_event({"type": kind, "time": time.time(), **fields})
+
+
+def next_plan(state: dict, on_event=None) -> bool:
+    """
+    Planning phase: returns True if state["plan"] holds tasks to execute,
+    False once the run has finished (state["status"] is then final)
+    """
+    if state["status"] != "running":
+        return False
+
+    if state["replan_count"] > 0 and state["completed_tasks"]:
+        state["status"] = "completed"
+        return False
+
+    if not state["plan"]:
+        started = time.perf_counter()
+        tasks = plan_tasks(state)
+        state["plan"] = tasks
+
+        if not tasks:
             state["status"] = "completed"
-            break
+            return False
 
-        # Planning phase
-        if not state["plan"]:
-            state["plan"] = plan_tasks(state)
+        if len(tasks) > MAX_TOTAL_TASKS:
+            state["status"] = "failed"
+            return False
 
-            if not state["plan"]:
-                state["status"] = "completed"
-                break
+        state["dependencies"] = plan_dependencies(tasks)
+        emit(on_event, "plan", plan=list(tasks), dependencies=state["dependencies"],
+             replan_count=state["replan_count"], seconds=time.perf_counter() - started)
 
-            if len(state["plan"]) > MAX_TOTAL_TASKS:
-                state["status"] = "failed"
-                break
+    return True
 
 
-        # Select next task
-        task = state["plan"].pop(0)
-        state["current_task"] = task
-        
-        retry_count = 0
-        replanned = False
+def apply_and_report(state: dict, outcomes: list[tuple], on_event=None):
+    """
+    apply_outcomes, then reports a replan if a task failed and the run goes on
+    """
+    failed_before = len(state["failed_tasks"])
+    apply_outcomes(state, outcomes)
 
-        while retry_count <= MAX_RETRIES_PER_TASK:
-            result, success = execute_task(task)
+    if len(state["failed_tasks"]) > failed_before and state["status"] == "running":
+        emit(on_event, "replan", task=state["failed_tasks"][-1], replan_count=state["replan_count"])
 
 
-            if not success:
-                retry_count += 1
-                continue
+def make_evaluator(goal: str):
+    """
+    evaluate(task, result) as set by EVALUATOR: "keyword" or "semantic"
+    (batched, embedding-based, records a confidence per task)
+    """
+    if EVALUATOR == "semantic":
+        from semantic_evaluator import SemanticEvaluator  # needs numpy
 
-            decision = evaluate_task(task, result)
+        return SemanticEvaluator(goal).evaluate_task
 
-            if decision == "accept":
-                # ---- Global execution safety cap ----
-                if len(state["completed_tasks"]) >= MAX_EXECUTED_TASKS:
-                    state["status"] = "failed"
-                    return state
+    return evaluate_task
 
-                state["completed_tasks"].append(task)
-                state["results"][task] = result
-                break
 
-            elif decision == "retry":
-                retry_count += 1
-                continue
+def record_evaluator_stats(state: dict, evaluate):
+    evaluator = getattr(evaluate, "__self__", None)
+    if evaluator is not None:
+        state["confidence"] = dict(evaluator.confidences)
 
-            elif decision == "replan":
-                state["failed_tasks"].append(task)
-                state["replan_count"] += 1
-                replanned = True
 
-                if state["replan_count"] > MAX_REPLANS:
-                    state["status"] = "failed"
-                    return state
+def observe(on_event, tracer):
+    """
+    One on_event callback feeding the tracer and the caller's callback
+    """
+    if tracer is None:
+        return on_event
+    if on_event is None:
+        return tracer
 
-                state["plan"] = []
-                break
+    def both(event):
+        tracer(event)
+        on_event(event)
 
-        # ----- Handle retry exhaustion -----
-        if retry_count > MAX_RETRIES_PER_TASK and not replanned:
-            state["failed_tasks"].append(task)
-            state["replan_count"] += 1
+    return both
 
-            if state["replan_count"] > MAX_REPLANS:
-                state["status"] = "failed"
-                return state
 
-            # Force replanning
-            state["plan"] = []
+def record_trace(state: dict, tracer):
+    if tracer is not None:
+        tracer.ended = time.time()
+        state["trace"] = tracer.summary()
+        files = export_run(tracer, state)
+        if files:
+            state["trace"]["files"] = files
 
-            continue
 
+def record_cache_stats(state: dict, run_cache, cache: TaskCache):
+    if run_cache is not None:
+        state["cache"] = run_cache.stats()
+    else:
+        state["cache"]["policy"] = cache.policy
 
 
-        if not state["plan"] and state["status"] != "failed":
-            continue
+def run(goal: str, max_workers: int = MAX_PARALLEL_TASKS, execute=execute_task, cache: TaskCache | None = None,
+        checkpoint_dir: str | None = None, resume_from: str | None = None, evaluate=None, on_event=None,
+        tracer: Tracer | None = None):
+    """
+    Plan -> Execute -> Evaluate loop for one goal. Task results are
+    memoized in cache (the shared config-built cache by default) as its
+    policy allows; this run's hits are reported in state["cache"].
+
+    With checkpoint_dir (or CHECKPOINT_DIR), progress is logged durably
+    after every finished task; run(goal, resume_from=dir) continues such a
+    run where it stopped, without executing finished tasks again.
+    """
+    state, checkpointer = open_run(goal, checkpoint_dir, resume_from)
+    cache = cache if cache is not None else shared_cache()
+    run_cache = cache.for_run(state["goal"], execute)
+    evaluate = evaluate or make_evaluator(state["goal"])
+    tracer = tracer if tracer is not None else (Tracer() if TRACING_ENABLED else None)
+    on_event = observe(on_event, tracer)
+
+    def task_runner(task, cancelled=None):
+        return run_task(task, execute, run_cache, evaluate, on_event, cancelled)
+
+    try:
+        while next_plan(state, on_event):
+            runner = task_runner
+            if checkpointer is not None:
+                checkpointer.record_plan(state)
+                runner = checkpointer.wrap(state, task_runner)
+
+            # Execute every task whose dependencies are done, in parallel
+            outcomes = execute_plan(state["plan"], state["dependencies"], runner, max_workers)
+            apply_and_report(state, outcomes, on_event)
 
+            if checkpointer is not None:
+                checkpointer.record_applied(state)
+
+        if checkpointer is not None:
+            checkpointer.record_final(state)
+    finally:
+        state.close()
+        if checkpointer is not None:
+            checkpointer.close()
+
+    record_cache_stats(state, run_cache, cache)
+    record_evaluator_stats(state, evaluate)
+    record_trace(state, tracer)
+    emit(on_event, "final", state=state)
     return state
 
 
+async def run_async(goal: str, execute=None, max_workers: int = MAX_PARALLEL_TASKS,
+                    cache: TaskCache | None = None, checkpoint_dir: str | None = None,
+                    resume_from: str | None = None, evaluate=None, on_event=None,
+                    tracer: Tracer | None = None):
+    """
+    Async form of run: tasks run concurrently in the current event loop,
+    so many goals can share one loop (and one executor's connection pool)
+
+        async with AsyncExecutor() as llm:
+            states = await asyncio.gather(*(run_async(g, llm.execute_task) for g in goals))
+
+    Without an executor, the local execute_task runs in a worker thread.
+    """
+    if execute is None:
+        @functools.wraps(execute_task)
+        async def execute(task):
+            return await asyncio.to_thread(execute_task, task)
+
+    state, checkpointer = open_run(goal, checkpoint_dir, resume_from)
+    cache = cache if cache is not None else shared_cache()
+    run_cache = cache.for_run(state["goal"], execute)
+    evaluate = evaluate or make_evaluator(state["goal"])
+    tracer = tracer if tracer is not None else (Tracer() if TRACING_ENABLED else None)
+    on_event = observe(on_event, tracer)
+
+    async def task_runner(task):
+        return await run_task_async(task, execute, run_cache, evaluate, on_event)
+
+    try:
+        while next_plan(state, on_event):
+            runner = task_runner
+            if checkpointer is not None:
+                checkpointer.record_plan(state)
+                runner = checkpointer.wrap_async(state, task_runner)
+
+            outcomes = await execute_plan_async(state["plan"], state["dependencies"], runner, max_workers)
+            apply_and_report(state, outcomes, on_event)
+
+            if checkpointer is not None:
+                checkpointer.record_applied(state)
+
+        if checkpointer is not None:
+            checkpointer.record_final(state)
+    finally:
+        state.close()
+        if checkpointer is not None:
+            checkpointer.close()
+
+    record_cache_stats(state, run_cache, cache)
+    record_evaluator_stats(state, evaluate)
+    record_trace(state, tracer)
+    emit(on_event, "final", state=state)
+    return state
+
+
+def run_events(goal: str, **kwargs):
+    """
+    Generator form of run: yields each event as it happens, ending with
+    {"type": "final", "state": final_state}. Events:
+    - plan: plan, dependencies, replan_count, seconds spent planning
+    - task_started: task, attempt
+    - task_result: task, attempt, result, success, cached, seconds
+    - evaluation: task, attempt, decision, seconds
+    - replan: the failed task and the new replan_count
+    Every event has "type" and "time". Takes the same keyword arguments as run.
+    """
+    events = queue.Queue()
+
+    def worker():
+        try:
+            run(goal, on_event=events.put, **kwargs)
+        except BaseException as e:
+            events.put(e)
+
+    thread = threading.Thread(target=worker, name="planner-run", daemon=True)
+    thread.start()
+
+    while True:
+        event = events.get()
+
+        if isinstance(event, BaseException):
+            raise event
+
+        yield event
+
+        if event["type"] == "final":
+            break
+
+    thread.join()
+
+
+async def run_events_async(goal: str, **kwargs):
+    """
+    Async-iterator form of run_async, yielding the same events as run_events
+    """
+    events = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    # Events can come from worker threads (the default executor, the evaluator)
+    def on_event(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    running = asyncio.ensure_future(run_async(goal, on_event=on_event, **kwargs))
+
+    try:
+        while True:
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({getter, running}, return_when=asyncio.FIRST_COMPLETED)
+
+            if getter not in done:
+                getter.cancel()
+                running.result()  # Raises if the run failed
+                continue
+
+            event = getter.result()
+            yield event
+
+            if event["type"] == "final":
+                break
+    finally:
+        if not running.done():
+            running.cancel()
+
+
 if __name__ == "__main__":
     goal = "Prepare a 2-week Python interview plan"
     final_state = run(goal)
 
     print("Final Status:", final_state["status"])
     print("Completed Tasks:", final_state["completed_tasks"])
+
+    if final_state["trace"]:
+        print()
+        print(format_summary(final_state["trace"]))
@@ -0,0 +1,113 @@
+"""
+Compares the keyword evaluator with the semantic evaluator on a recorded workload.
+
+Usage:
+    python measure_evaluator.py [--workload FILE] [--fit]
+
+Each workload line is {"goal", "task", "result", "label"} where label is the
+right decision. Every result wrongly sent to retry or replan costs another
+executor call; every bad result accepted is a quality miss. The semantic
+evaluator is scored with 2-fold cross-validation (calibrated on one half,
+measured on the other); --fit prints CALIBRATION fitted on the whole file.
+"""
+
+import json
+import argparse
+
+import numpy as np
+
+from evaluator import evaluate_task
+from semantic_evaluator import features, evaluate_batch
+
+DEFAULT_WORKLOAD = "workloads/evaluator_workload.jsonl"
+
+
+def load_workload(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fit_calibration(matrix: np.ndarray, accepted: np.ndarray, l2: float = 0.1, steps: int = 50) -> np.ndarray:
+    """
+    Logistic regression (Newton's method, L2-regularized) of accept vs not
+    """
+    weights = np.zeros(matrix.shape[1], dtype=np.float64)
+    x = matrix.astype(np.float64)
+
+    for _ in range(steps):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights)))
+        gradient = x.T @ (p - accepted) + l2 * weights
+        hessian = (x * (p * (1 - p))[:, None]).T @ x + l2 * np.eye(len(weights))
+        weights -= np.linalg.solve(hessian, gradient)
+
+    return weights.astype(np.float32)
+
+
+def score(rows: list[dict], decisions: list[str]) -> dict:
+    wasted = sum(row["label"] == "accept" and d != "accept" for row, d in zip(rows, decisions))
+    false_accepts = sum(row["label"] != "accept" and d == "accept" for row, d in zip(rows, decisions))
+    correct = sum(row["label"] == d for row, d in zip(rows, decisions))
+    return {"wasted_calls": wasted, "false_accepts": false_accepts, "accuracy": correct / len(rows)}
+
+
+def calibration_error(probabilities: np.ndarray, accepted: np.ndarray, bins: int = 5) -> float:
+    edges = np.linspace(0, 1, bins + 1)
+    error = 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        mask = (probabilities >= lo) & ((probabilities < hi) | (hi == 1))
+        if mask.any():
+            error += mask.mean() * abs(probabilities[mask].mean() - accepted[mask].mean())
+    return float(error)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD)
+    parser.add_argument("--fit", action="store_true", help="print calibration fitted on the whole workload")
+    args = parser.parse_args()
+
+    rows = load_workload(args.workload)
+    goals = [row["goal"] for row in rows]
+    tasks = [row["task"] for row in rows]
+    results = [row["result"] for row in rows]
+    accepted = np.array([row["label"] == "accept" for row in rows], dtype=np.float64)
+    matrix = features(goals, tasks, results)
+
+    keyword = [evaluate_task(task, result) for task, result in zip(tasks, results)]
+
+    # 2-fold cross-validation: calibrate on one half, decide on the other
+    semantic = [None] * len(rows)
+    probabilities = np.zeros(len(rows))
+    folds = np.arange(len(rows)) % 2
+    for fold in (0, 1):
+        train, test = folds != fold, np.flatnonzero(folds == fold)
+        weights = fit_calibration(matrix[train], accepted[train])
+        outcomes = evaluate_batch([tasks[i] for i in test], [results[i] for i in test],
+                                  [goals[i] for i in test], weights)
+        for i, (decision, probability) in zip(test, outcomes):
+            semantic[i] = decision
+            probabilities[i] = probability
+
+    good = int(accepted.sum())
+    print(f"Workload: {len(rows)} results ({good} should be accepted)\n")
+    print(f"{'evaluator':<10} {'wasted calls':>13} {'false accepts':>14} {'accuracy':>9}")
+    print("-" * 49)
+    for name, decisions in (("keyword", keyword), ("semantic", semantic)):
+        s = score(rows, decisions)
+        print(f"{name:<10} {s['wasted_calls']:>13} {s['false_accepts']:>14} {s['accuracy']:>9.2f}")
+
+    before = score(rows, keyword)["wasted_calls"]
+    after = score(rows, semantic)["wasted_calls"]
+    if before:
+        print(f"\nWasted retries/replans reduced by {(before - after) / before:.0%} ({before} -> {after})")
+
+    brier = float(np.mean((probabilities - accepted) ** 2))
+    print(f"Semantic confidence: Brier score {brier:.3f}, expected calibration error {calibration_error(probabilities, accepted):.3f}")
+
+    if args.fit:
+        weights = fit_calibration(matrix, accepted)
+        print("\nCALIBRATION = np.array([" + ", ".join(f"{w:.2f}" for w in weights) + "], dtype=np.float32)")
+
+
+if __name__ == "__main__":
+    main()
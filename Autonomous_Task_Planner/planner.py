@@ -39,3 +39,25 @@ def plan_tasks(state: dict) -> list[str]:
     ])
 
     return tasks
+
+
+def plan_dependencies(tasks: list[str]) -> dict[str, list[str]]:
+    """
+    Dependency edges for a plan:
+    - Re-evaluation, refinement and content generation are independent
+    - A re-check or final review waits for every task before it
+    - Anything else follows the task before it
+    """
+    dependencies = {}
+
+    for i, task in enumerate(tasks):
+        task_lower = task.lower()
+
+        if i == 0 or task_lower.startswith(("re-evaluate", "refine", "generate")):
+            dependencies[task] = []
+        elif "check" in task_lower or "review" in task_lower or "final" in task_lower:
+            dependencies[task] = tasks[:i]
+        else:
+            dependencies[task] = [tasks[i - 1]]
+
+    return dependencies
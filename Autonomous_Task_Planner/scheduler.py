@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from config import MAX_PARALLEL_TASKS
+
+
+def ready_tasks(plan: list[str], dependencies: dict, outcomes: dict, started: set, limit: int) -> list[str]:
+    """
+    Tasks in plan order whose dependencies have all been accepted
+    """
+    position = {task: i for i, task in enumerate(plan)}
+    ready = []
+
+    for i, task in enumerate(plan[:limit]):
+        if task in started:
+            continue
+
+        # Only edges to earlier tasks count, so a bad edge cannot deadlock the plan
+        deps = [dep for dep in dependencies.get(task, []) if position.get(dep, i) < i]
+
+        if all(outcomes.get(dep, ("",))[0] == "accept" for dep in deps):
+            ready.append(task)
+
+    return ready
+
+
+def execute_plan(plan: list[str], dependencies: dict, run_task, max_workers: int = MAX_PARALLEL_TASKS) -> list[tuple]:
+    """
+    Scheduler:
+    - Runs every task whose dependencies were accepted, up to max_workers at a time
+    - run_task(task, cancelled) returns (decision, result) after its own
+      retries; it should stop between attempts once the cancelled event is set
+    - Returns (task, decision, result) in plan order, up to and including
+      the first task that was not accepted
+
+    Outcomes are reported in plan order whatever order the tasks finish in,
+    so the final state matches a serial run. Once a task fails, tasks after
+    it are no longer started (a serial run would have replanned there), and
+    those already running are cancelled: they finish the attempt in progress
+    and make no more.
+    """
+    max_workers = max(1, max_workers)
+    position = {task: i for i, task in enumerate(plan)}
+    outcomes = {}
+    started = set()
+    running = {}
+    cancelled = {}
+    limit = len(plan)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            for task in ready_tasks(plan, dependencies, outcomes, started, limit):
+                if len(running) >= max_workers:
+                    break
+                started.add(task)
+                cancelled[task] = threading.Event()
+                running[pool.submit(run_task, task, cancelled[task])] = task
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            limit = record_outcomes(done, running, outcomes, position, limit)
+
+            for task in running.values():
+                if position[task] > limit:
+                    cancelled[task].set()
+
+    return in_plan_order(plan, outcomes)
+
+
+async def execute_plan_async(plan: list[str], dependencies: dict, run_task,
+                             max_workers: int = MAX_PARALLEL_TASKS) -> list[tuple]:
+    """
+    Async Scheduler:
+    - Same as execute_plan, with run_task(task) a coroutine function
+    - Tasks run concurrently in the current event loop
+    - Once a task fails, tasks after it still in flight are cancelled
+    - If the run is cancelled, tasks still in flight are cancelled too
+    """
+    max_workers = max(1, max_workers)
+    position = {task: i for i, task in enumerate(plan)}
+    outcomes = {}
+    started = set()
+    running = {}
+    limit = len(plan)
+
+    try:
+        while True:
+            for task in ready_tasks(plan, dependencies, outcomes, started, limit):
+                if len(running) >= max_workers:
+                    break
+                started.add(task)
+                running[asyncio.ensure_future(run_task(task))] = task
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            limit = record_outcomes(done, running, outcomes, position, limit)
+
+            for future, task in running.items():
+                if position[task] > limit:
+                    future.cancel()
+    finally:
+        for future in running:
+            future.cancel()
+
+    return in_plan_order(plan, outcomes)
+
+
+def record_outcomes(done, running: dict, outcomes: dict, position: dict, limit: int) -> int:
+    """
+    Stores finished tasks' outcomes and returns the new start limit
+    """
+    for future in done:
+        task = running.pop(future)
+        outcomes[task] = ("cancelled", "") if future.cancelled() else future.result()
+
+        if outcomes[task][0] != "accept":
+            limit = min(limit, position[task])
+
+    return limit
+
+
+def in_plan_order(plan: list[str], outcomes: dict) -> list[tuple]:
+    """
+    (task, decision, result) in plan order, up to the first task not accepted
+    """
+    ordered = []
+    for task in plan:
+        if task not in outcomes:
+            break
+
+        decision, result = outcomes[task]
+        ordered.append((task, decision, result))
+
+        if decision != "accept":
+            break
+
+    return ordered
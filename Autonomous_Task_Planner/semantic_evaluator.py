@@ -0,0 +1,186 @@
+import re
+import hashlib
+import threading
+
+import numpy as np
+
+from config import (
+    EVALUATOR_EMBEDDING_MODEL, EVALUATOR_ACCEPT_CONFIDENCE, EVALUATOR_REPLAN_RELEVANCE,
+    EVALUATOR_BATCH_WAIT_SECONDS, MAX_PARALLEL_TASKS
+)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "based", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "the", "to", "with", "what", "that", "this", "goal", "task", "steps", "output",
+}
+HASH_DIMENSION = 4096
+
+# Logistic calibration of P(result should be accepted) over
+# [relevance, length, structure, error, 1]; fitted on
+# workloads/evaluator_workload.jsonl with measure_evaluator.py --fit
+CALIBRATION = np.array([4.24, 5.02, 3.37, -2.45, -4.42], dtype=np.float32)
+
+
+def hashing_embed(texts: list[str], dimension: int = HASH_DIMENSION) -> np.ndarray:
+    """
+    Local bag-of-features embedding: content words and, at half weight,
+    their character 4-grams (so "evaluate" and "evaluation" overlap) hashed
+    into signed buckets, L2-normalized, one row per text
+    """
+    matrix = np.zeros((len(texts), dimension), dtype=np.float32)
+
+    for row, text in enumerate(texts):
+        for word in TOKEN.findall((text or "").lower()):
+            if word in STOPWORDS:
+                continue
+
+            padded = f"#{word}#"
+            grams = [(padded[i:i + 4], 0.5) for i in range(len(padded) - 3)]
+            for feature, weight in [(word, 1.0)] + grams:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                matrix[row, digest % dimension] += weight if digest >> 63 else -weight
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+_model = None
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """
+    Unit-length embeddings from EVALUATOR_EMBEDDING_MODEL (a
+    sentence-transformers model) if set, else from hashing_embed
+    """
+    global _model
+
+    if not EVALUATOR_EMBEDDING_MODEL:
+        return hashing_embed(texts)
+
+    if _model is None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EVALUATOR_EMBEDDING_MODEL needs sentence-transformers: pip install sentence-transformers"
+            ) from e
+        _model = SentenceTransformer(EVALUATOR_EMBEDDING_MODEL)
+
+    return _model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def features(goals: list[str], tasks: list[str], results: list[str]) -> np.ndarray:
+    """
+    Feature matrix for a batch: relevance of each result to its task and
+    goal, length, structure and error marker, plus a bias column
+    """
+    n = len(results)
+    vectors = embed([f"{task} {goal}" for goal, task in zip(goals, tasks)] + list(results))
+    relevance = np.einsum("ij,ij->i", vectors[:n], vectors[n:])
+
+    words = np.array([len(result.split()) for result in results], dtype=np.float32)
+    length = np.minimum(np.log1p(words) / np.log(60.0), 1.0)
+    structure = np.array(
+        [min(len(re.findall(r"(?m)^\s*(?:[-*]|\d+[.)])|\b(?:day|week)\s*\d+|[;:]", result.lower())), 5) / 5
+         for result in results],
+        dtype=np.float32
+    )
+    error = np.array([result.strip().lower().startswith("execution error") for result in results], dtype=np.float32)
+
+    return np.column_stack([relevance, length, structure, error, np.ones(n, dtype=np.float32)])
+
+
+def confidence(feature_matrix: np.ndarray, weights: np.ndarray = CALIBRATION) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-(feature_matrix @ weights)))
+
+
+def evaluate_batch(tasks: list[str], results: list[str], goals: list[str] | None = None,
+                   weights: np.ndarray = CALIBRATION) -> list[tuple[str, float]]:
+    """
+    Semantic Evaluator:
+    Scores all results of a batch at once and returns (decision, confidence)
+    per result, confidence being the calibrated probability that it should
+    be accepted.
+    - Confident enough -> accept
+    - Empty, too short or an execution error -> retry
+    - Not about the task or goal -> replan
+    - Otherwise -> retry
+    """
+    if not results:
+        return []
+
+    goals = goals or [""] * len(results)
+    matrix = features(goals, tasks, results)
+    scores = confidence(matrix, weights)
+    outcomes = []
+
+    for result, row, score in zip(results, matrix, scores):
+        if score >= EVALUATOR_ACCEPT_CONFIDENCE:
+            decision = "accept"
+        elif not result or len(result.strip()) < 40 or row[3]:
+            decision = "retry"
+        elif row[0] < EVALUATOR_REPLAN_RELEVANCE:
+            decision = "replan"
+        else:
+            decision = "retry"
+        outcomes.append((decision, float(score)))
+
+    return outcomes
+
+
+class SemanticEvaluator:
+    """
+    Thread-safe evaluate_task(task, result) for one goal that batches calls
+    arriving together (the parallel tasks of a plan) into one scoring pass
+    """
+
+    def __init__(self, goal: str = "", max_batch: int = MAX_PARALLEL_TASKS,
+                 wait_seconds: float = EVALUATOR_BATCH_WAIT_SECONDS):
+        self.goal = goal
+        self.max_batch = max_batch
+        self.wait_seconds = wait_seconds
+        self.confidences = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+
+    def evaluate(self, task: str, result: str) -> tuple[str, float]:
+        slot = {"task": task, "result": result, "done": threading.Event()}
+
+        with self._lock:
+            self._pending.append(slot)
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+
+        if leader:
+            # The first call of a batch waits briefly for the others, then scores them all
+            self._full.wait(self.wait_seconds)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._full.clear()
+
+            try:
+                outcomes = evaluate_batch(
+                    [s["task"] for s in batch], [s["result"] for s in batch], [self.goal] * len(batch)
+                )
+                for s, outcome in zip(batch, outcomes):
+                    s["outcome"] = outcome
+            except Exception as e:
+                for s in batch:
+                    s["error"] = e
+            finally:
+                for s in batch:
+                    s["done"].set()
+
+        slot["done"].wait()
+        if "error" in slot:
+            raise slot["error"]
+
+        self.confidences[task] = slot["outcome"][1]
+        return slot["outcome"]
+
+    def evaluate_task(self, task: str, result: str) -> str:
+        return self.evaluate(task, result)[0]
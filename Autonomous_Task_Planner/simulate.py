@@ -0,0 +1,329 @@
+"""
+Simulation benchmark for the Plan -> Execute -> Evaluate loop.
+
+Usage:
+    python simulate.py [--goals N] [--latency lognormal] [--mean-latency 1.5]
+                       [--failure-rate 0.1] [--short-rate 0.1] [--off-topic-rate 0.05]
+                       [--evaluator simulated] [--workers N] [--json FILE]
+
+Runs many goals through main.run (the real planner, scheduler, retries and
+replans) with a simulated executor in place of the LLM. Each call draws a
+latency from the chosen distribution and then fails, returns a too-short
+output, returns an off-topic output, or returns a good one. Latencies are
+slept scaled by --time-scale, so thousands of goals finish in seconds. The
+simulated evaluator judges outputs by what the executor produced, with
+configurable false accept / false reject rates; --evaluator keyword or
+semantic uses a real one instead.
+
+Loop overhead is the wall time of a run not spent inside executor or
+evaluator calls, divided by its planning iterations.
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+
+from main import run
+from task_cache import TaskCache
+from evaluator import evaluate_task
+from config import MAX_PARALLEL_TASKS
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+GOALS = [
+    "Prepare for a Python backend interview in four weeks",
+    "Plan a data structures and algorithms revision schedule",
+    "Build a study plan for system design interviews",
+    "Organise a month of SQL and database practice",
+    "Create a roadmap for learning asyncio and concurrency",
+]
+
+OFF_TOPIC = "Here is a summary of today's weather forecast and the local football results for the weekend."
+
+
+def call_rng(*key) -> random.Random:
+    """
+    Random generator seeded by key, so a simulated call draws the same
+    numbers whichever worker thread makes it
+    """
+    digest = hashlib.sha256(":".join(map(str, key)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "little"))
+
+
+def sample_latency(rng: random.Random, distribution: str, mean: float, sigma: float = 0.5) -> float:
+    """
+    Seconds for one call; every distribution has the given mean
+    """
+    if distribution == "fixed":
+        return mean
+    if distribution == "uniform":
+        return rng.uniform(0, 2 * mean)
+    if distribution == "exponential":
+        return rng.expovariate(1 / mean) if mean > 0 else 0.0
+    if distribution == "lognormal":
+        return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) if mean > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution {distribution!r}; expected one of {LATENCY_DISTRIBUTIONS}")
+
+
+class Timeline:
+    """
+    Intervals spent inside executor and evaluator calls. Overlapping
+    intervals (parallel tasks) are merged, so busy_seconds() is the time
+    at least one call was running.
+    """
+
+    def __init__(self):
+        self.intervals = []
+        self._lock = threading.Lock()
+
+    def add(self, started: float, ended: float):
+        with self._lock:
+            self.intervals.append((started, ended))
+
+    def busy_seconds(self) -> float:
+        busy = 0.0
+        current_start = current_end = None
+
+        for started, ended in sorted(self.intervals):
+            if current_end is None or started > current_end:
+                if current_end is not None:
+                    busy += current_end - current_start
+                current_start, current_end = started, ended
+            else:
+                current_end = max(current_end, ended)
+
+        if current_end is not None:
+            busy += current_end - current_start
+        return busy
+
+
+class SimulatedExecutor:
+    """
+    Stands in for the LLM executor:
+    - Each call sleeps a latency drawn from the distribution (times time_scale)
+    - Then fails, returns a short output, an off-topic output, or a good one
+    - Draws are seeded by (seed, task, call number), so runs are repeatable
+    """
+
+    version = "simulated"
+    deterministic = False
+
+    def __init__(self, latency: str = "lognormal", mean_latency: float = 1.5, failure_rate: float = 0.1,
+                 short_rate: float = 0.1, off_topic_rate: float = 0.05, time_scale: float = 0.001,
+                 seed: int = 0, timeline: Timeline | None = None):
+        sample_latency(random.Random(), latency, mean_latency)  # validate the distribution name
+        self.latency = latency
+        self.mean_latency = mean_latency
+        self.failure_rate = failure_rate
+        self.short_rate = short_rate
+        self.off_topic_rate = off_topic_rate
+        self.time_scale = time_scale
+        self.seed = seed
+        self.timeline = timeline
+        self.calls = 0
+        self.simulated_seconds = 0.0
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, task: str) -> tuple[str, bool]:
+        started = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts[task] = self._attempts.get(task, 0) + 1
+
+        rng = call_rng(self.seed, "execute", task, attempt)
+        latency = sample_latency(rng, self.latency, self.mean_latency)
+        if latency * self.time_scale > 0:
+            time.sleep(latency * self.time_scale)
+
+        draw = rng.random()
+        if draw < self.failure_rate:
+            result, success = "Execution error: simulated failure", False
+        elif draw < self.failure_rate + self.short_rate:
+            result, success = "Done.", True
+        elif draw < self.failure_rate + self.short_rate + self.off_topic_rate:
+            result, success = OFF_TOPIC, True
+        else:
+            result, success = f"{task}\n\nWeek 1: fundamentals and daily practice problems. " \
+                              f"Week 2: projects. Week 3: mock interviews. Week 4: revision.", True
+
+        with self._lock:
+            self.simulated_seconds += latency
+        if self.timeline is not None:
+            self.timeline.add(started, time.perf_counter())
+        return result, success
+
+
+class SimulatedEvaluator:
+    """
+    Judges simulated outputs by what they are: short -> retry, off-topic ->
+    replan, otherwise accept. A good output is wrongly retried with
+    probability false_reject, a bad one wrongly accepted with false_accept.
+    """
+
+    def __init__(self, false_accept: float = 0.02, false_reject: float = 0.05, seed: int = 0,
+                 timeline: Timeline | None = None):
+        self.false_accept = false_accept
+        self.false_reject = false_reject
+        self.seed = seed
+        self.timeline = timeline
+        self.calls = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, task: str, result: str) -> str:
+        started = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts[task] = self._attempts.get(task, 0) + 1
+
+        if not result or len(result.strip()) < 40:
+            decision = "retry"
+        elif result == OFF_TOPIC:
+            decision = "replan"
+        else:
+            decision = "accept"
+
+        draw = call_rng(self.seed, "evaluate", task, attempt).random()
+        if decision == "accept" and draw < self.false_reject:
+            decision = "retry"
+        elif decision != "accept" and draw < self.false_accept:
+            decision = "accept"
+
+        if self.timeline is not None:
+            self.timeline.add(started, time.perf_counter())
+        return decision
+
+
+class CountingEvaluator:
+    """
+    Wraps a real evaluate(task, result) to count and time its calls
+    """
+
+    def __init__(self, evaluate, timeline: Timeline):
+        self.evaluate = evaluate
+        self.timeline = timeline
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, task: str, result: str) -> str:
+        started = time.perf_counter()
+        decision = self.evaluate(task, result)
+        with self._lock:
+            self.calls += 1
+        self.timeline.add(started, time.perf_counter())
+        return decision
+
+
+def make_evaluator(kind: str, goal: str, args, seed: int, timeline: Timeline):
+    if kind == "simulated":
+        return SimulatedEvaluator(args.false_accept, args.false_reject, seed, timeline)
+    if kind == "semantic":
+        from semantic_evaluator import SemanticEvaluator  # needs numpy
+
+        return CountingEvaluator(SemanticEvaluator(goal).evaluate_task, timeline)
+    return CountingEvaluator(evaluate_task, timeline)
+
+
+def simulate_goal(goal: str, index: int, args) -> dict:
+    """
+    One goal through main.run with simulated components; returns its measurements
+    """
+    seed = f"{args.seed}:{index}"
+    timeline = Timeline()
+    execute = SimulatedExecutor(args.latency, args.mean_latency, args.failure_rate, args.short_rate,
+                                args.off_topic_rate, args.time_scale, seed, timeline)
+    evaluate = make_evaluator(args.evaluator, goal, args, seed, timeline)
+    iterations = 0
+
+    def on_event(event):
+        nonlocal iterations
+        if event["type"] == "plan":
+            iterations += 1
+
+    started = time.perf_counter()
+    state = run(goal, max_workers=args.workers, execute=execute, cache=TaskCache(policy="never"),
+                evaluate=evaluate, on_event=on_event)
+    wall = time.perf_counter() - started
+
+    return {
+        "status": state["status"],
+        "executor_calls": execute.calls,
+        "evaluator_calls": evaluate.calls,
+        "iterations": iterations,
+        "replans": state["replan_count"],
+        "wall_seconds": wall,
+        "overhead_seconds": max(0.0, wall - timeline.busy_seconds()),
+        "simulated_llm_seconds": execute.simulated_seconds,
+    }
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(runs: list[dict], seconds: float) -> dict:
+    goals = len(runs)
+    iterations = sum(r["iterations"] for r in runs)
+    walls = [r["wall_seconds"] for r in runs]
+
+    return {
+        "goals": goals,
+        "converged": sum(r["status"] == "completed" for r in runs),
+        "convergence_rate": sum(r["status"] == "completed" for r in runs) / goals if goals else 0.0,
+        "executor_calls_per_goal": sum(r["executor_calls"] for r in runs) / goals if goals else 0.0,
+        "evaluator_calls_per_goal": sum(r["evaluator_calls"] for r in runs) / goals if goals else 0.0,
+        "iterations_per_goal": iterations / goals if goals else 0.0,
+        "replans_per_goal": sum(r["replans"] for r in runs) / goals if goals else 0.0,
+        "simulated_llm_seconds_per_goal": sum(r["simulated_llm_seconds"] for r in runs) / goals if goals else 0.0,
+        "wall_seconds": seconds,
+        "goal_wall_p50_ms": percentile(walls, 0.5) * 1000,
+        "goal_wall_p95_ms": percentile(walls, 0.95) * 1000,
+        "overhead_ms_per_iteration": sum(r["overhead_seconds"] for r in runs) / iterations * 1000
+        if iterations else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--goals", type=int, default=2000, help="number of goals to simulate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--mean-latency", type=float, default=1.5, help="mean simulated LLM seconds per call")
+    parser.add_argument("--time-scale", type=float, default=0.001, help="fraction of simulated latency slept")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="probability a call errors")
+    parser.add_argument("--short-rate", type=float, default=0.1, help="probability of a too-short output")
+    parser.add_argument("--off-topic-rate", type=float, default=0.05, help="probability of an off-topic output")
+    parser.add_argument("--evaluator", choices=["simulated", "keyword", "semantic"], default="simulated")
+    parser.add_argument("--false-accept", type=float, default=0.02, help="simulated evaluator: bad output accepted")
+    parser.add_argument("--false-reject", type=float, default=0.05, help="simulated evaluator: good output retried")
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_TASKS, help="parallel tasks per goal")
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    runs = [simulate_goal(GOALS[i % len(GOALS)], i, args) for i in range(args.goals)]
+    stats = summarize(runs, time.perf_counter() - started)
+
+    print(f"Goals:                {stats['goals']}")
+    print(f"Convergence rate:     {stats['convergence_rate']:.1%} ({stats['converged']} completed)")
+    print(f"Executor calls/goal:  {stats['executor_calls_per_goal']:.2f}")
+    print(f"Evaluator calls/goal: {stats['evaluator_calls_per_goal']:.2f}")
+    print(f"Iterations/goal:      {stats['iterations_per_goal']:.2f} ({stats['replans_per_goal']:.2f} replans)")
+    print(f"Simulated LLM time:   {stats['simulated_llm_seconds_per_goal']:.2f}s per goal")
+    print(f"Wall time:            {stats['wall_seconds']:.2f}s "
+          f"(per goal p50 {stats['goal_wall_p50_ms']:.2f}ms, p95 {stats['goal_wall_p95_ms']:.2f}ms)")
+    print(f"Loop overhead:        {stats['overhead_ms_per_iteration']:.3f}ms per iteration")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,304 @@
-def initialize_state(goal: str) -> dict:
-    return {
-        "goal": goal,
-        "plan": [],
-        "current_task": None,
-        "completed_tasks": [],
-        "failed_tasks": [],
-        "results": {},
-        "status": "running",
-        "replan_count": 0
-    }
+import os
+import zlib
+import weakref
+import tempfile
+import threading
+from collections.abc import MutableMapping
+
+from config import MAX_REPLANS, MAX_EXECUTED_TASKS, RESULT_SPILL_BYTES
+
+
+class TaskList(list):
+    """
+    List of task names with a set index, so `task in tasks` is O(1)
+    """
+
+    __slots__ = ("_index",)
+
+    def __init__(self, tasks=()):
+        super().__init__(tasks)
+        self._index = set(self)
+
+    def __contains__(self, task) -> bool:
+        return task in self._index
+
+    def append(self, task: str):
+        super().append(task)
+        self._index.add(task)
+
+    def extend(self, tasks):
+        tasks = list(tasks)
+        super().extend(tasks)
+        self._index.update(tasks)
+
+    def __iadd__(self, tasks):
+        self.extend(tasks)
+        return self
+
+    def insert(self, i: int, task: str):
+        super().insert(i, task)
+        self._index.add(task)
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+
+    def remove(self, task: str):
+        super().remove(task)
+        self._index = set(self)
+
+    def pop(self, i: int = -1) -> str:
+        task = super().pop(i)
+        self._index = set(self)
+        return task
+
+    def __setitem__(self, i, value):
+        super().__setitem__(i, value)
+        self._index = set(self)
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._index = set(self)
+
+    def __reduce__(self):
+        return TaskList, (list(self),)
+
+
+class ResultStore(MutableMapping):
+    """
+    Task results, in the order they were stored:
+    - Results up to spill_bytes (UTF-8) are kept in memory as they are
+    - Larger ones are zlib-compressed into a temporary file and read back
+      on access, so memory stays flat however long the run is
+    - close() (called when the run ends) releases the file descriptor;
+      spilled results stay readable, and the file is removed once the
+      store is garbage collected
+    """
+
+    __slots__ = ("spill_bytes", "_entries", "_path", "_file", "_lock", "__weakref__")
+
+    def __init__(self, results=(), spill_bytes: int = RESULT_SPILL_BYTES):
+        self.spill_bytes = spill_bytes
+        self._entries = {}  # task -> result, or (offset, length) in the spill file
+        self._path = None
+        self._file = None
+        self._lock = threading.Lock()
+        self.update(results)
+
+    def _spill_file(self):
+        if self._file is None:
+            if self._path is None:
+                fd, self._path = tempfile.mkstemp(prefix="results-", suffix=".z")
+                self._file = os.fdopen(fd, "w+b")
+                weakref.finalize(self, _remove_spill_file, self._path)
+            else:
+                self._file = open(self._path, "r+b")
+        return self._file
+
+    def __setitem__(self, task: str, result):
+        encoded = result.encode("utf-8") if isinstance(result, str) else None
+
+        if encoded is None or len(encoded) <= self.spill_bytes:
+            self._entries[task] = result
+            return
+
+        data = zlib.compress(encoded)
+        with self._lock:
+            f = self._spill_file()
+            f.seek(0, os.SEEK_END)
+            self._entries[task] = (f.tell(), len(data))
+            f.write(data)
+
+    def __getitem__(self, task: str):
+        entry = self._entries[task]
+        if not isinstance(entry, tuple):
+            return entry
+
+        offset, length = entry
+        with self._lock:
+            if self._file is not None:
+                self._file.seek(offset)
+                data = self._file.read(length)
+            else:
+                with open(self._path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(length)
+        return zlib.decompress(data).decode("utf-8")
+
+    def __delitem__(self, task: str):
+        del self._entries[task]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task) -> bool:
+        return task in self._entries
+
+    def spilled(self) -> int:
+        return sum(isinstance(entry, tuple) for entry in self._entries.values())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __reduce__(self):
+        return _closed_store, (self.spill_bytes, list(self.items()))
+
+    def __repr__(self) -> str:
+        return f"ResultStore({len(self)} results, {self.spilled()} spilled)"
+
+
+def _remove_spill_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _closed_store(spill_bytes: int, items: list) -> ResultStore:
+    """Unpickles a ResultStore without holding its spill file open"""
+    store = ResultStore(items, spill_bytes)
+    store.close()
+    return store
+
+
+class RunState(MutableMapping):
+    """
+    State of one run: typed fields in __slots__, readable and writable as
+    state["field"] like the dict it replaces. Assigning a list to
+    completed_tasks or failed_tasks, or a dict to results, converts it.
+    Keys that are not fields are kept in extra.
+    """
+
+    __slots__ = ("goal", "plan", "dependencies", "current_task", "completed_tasks", "failed_tasks",
+                 "results", "status", "replan_count", "cache", "checkpoint", "confidence", "trace", "extra")
+
+    FIELDS = __slots__[:-1]
+
+    goal: str
+    plan: list
+    dependencies: dict
+    current_task: str | None
+    completed_tasks: TaskList
+    failed_tasks: TaskList
+    results: ResultStore
+    status: str
+    replan_count: int
+    cache: dict
+    checkpoint: str | None
+    confidence: dict
+    trace: dict | None
+    extra: dict
+
+    def __init__(self, goal: str):
+        self.goal = goal
+        self.plan = []
+        self.dependencies = {}
+        self.current_task = None
+        self.completed_tasks = TaskList()
+        self.failed_tasks = TaskList()
+        self.results = ResultStore()
+        self.status = "running"
+        self.replan_count = 0
+        self.cache = {"policy": None, "hits": 0, "misses": 0}
+        self.checkpoint = None
+        self.confidence = {}
+        self.trace = None
+        self.extra = {}
+
+    def __getitem__(self, key: str):
+        if key in RunState.FIELDS:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value):
+        if key in ("completed_tasks", "failed_tasks") and not isinstance(value, TaskList):
+            value = TaskList(value)
+        elif key == "results" and not isinstance(value, ResultStore):
+            value = ResultStore(value)
+
+        if key in RunState.FIELDS:
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in RunState.FIELDS:
+            raise KeyError(f"{key!r} is a state field and cannot be removed")
+        del self.extra[key]
+
+    def __iter__(self):
+        yield from RunState.FIELDS
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(RunState.FIELDS) + len(self.extra)
+
+    def __contains__(self, key) -> bool:
+        return key in RunState.FIELDS or key in self.extra
+
+    def to_dict(self) -> dict:
+        """
+        Plain dict of built-in types (spilled results read back), for JSON
+        """
+        data = {key: self[key] for key in self}
+        data["plan"] = list(self.plan)
+        data["completed_tasks"] = list(self.completed_tasks)
+        data["failed_tasks"] = list(self.failed_tasks)
+        data["results"] = dict(self.results)
+        return data
+
+    def close(self):
+        """Releases the resources held for results (see ResultStore.close)"""
+        self.results.close()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunState":
+        state = cls(data["goal"])
+        for key, value in data.items():
+            state[key] = value
+        return state
+
+    def __repr__(self) -> str:
+        return (f"RunState(goal={self.goal!r}, status={self.status!r}, plan={len(self.plan)}, "
+                f"completed={len(self.completed_tasks)}, failed={len(self.failed_tasks)})")
+
+
+def initialize_state(goal: str) -> RunState:
+    return RunState(goal)
+
+
+def apply_outcomes(state: dict, outcomes: list[tuple]):
+    """
+    Applies (task, decision, result) outcomes in plan order, as a serial run would
+    """
+    state["plan"] = []
+
+    for task, decision, result in outcomes:
+        state["current_task"] = task
+
+        if decision == "accept":
+            # ---- Global execution safety cap ----
+            if len(state["completed_tasks"]) >= MAX_EXECUTED_TASKS:
+                state["status"] = "failed"
+                return
+
+            state["completed_tasks"].append(task)
+            state["results"][task] = result
+            continue
+
+        # ----- Replan requested or retries exhausted -----
+        state["failed_tasks"].append(task)
+        state["replan_count"] += 1
+
+        if state["replan_count"] > MAX_REPLANS:
+            state["status"] = "failed"
+            return
+
+        # Force replanning
+        return
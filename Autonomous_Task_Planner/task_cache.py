@@ -0,0 +1,180 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config import TASK_CACHE_POLICY, TASK_CACHE_MAX_ENTRIES, TASK_CACHE_PATH
+
+CACHE_POLICIES = ("always", "deterministic", "never")
+
+
+def normalize_task(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".!?:; ")
+
+
+def executor_info(execute) -> tuple[str, bool]:
+    """
+    (version, deterministic) declared by an executor function or by the
+    object a bound executor method belongs to
+    """
+    owner = getattr(execute, "__self__", execute)
+    version = getattr(owner, "version", None) or f"{execute.__module__}.{execute.__qualname__}"
+    return version, bool(getattr(owner, "deterministic", False))
+
+
+class TaskCache:
+    """
+    Task Result Cache:
+    - Successful executor results keyed by goal, normalized task text and executor version
+    - In-memory LRU, optionally backed by a SQLite file that survives restarts
+    - Policy "always" reuses any executor's results, "deterministic" only
+      those of executors declaring deterministic = True, "never" disables it
+    """
+
+    def __init__(self, policy: str = TASK_CACHE_POLICY, max_entries: int = TASK_CACHE_MAX_ENTRIES,
+                 path: str | None = TASK_CACHE_PATH):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy {policy!r}; expected one of {CACHE_POLICIES}")
+
+        self.policy = policy
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS task_results (key TEXT PRIMARY KEY, result TEXT, created_at REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(goal: str, task: str, version: str) -> str:
+        payload = json.dumps([normalize_task(goal), normalize_task(task), version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def for_run(self, goal: str, execute):
+        """
+        A view of the cache for one run and executor, or None if the
+        policy does not allow caching this executor
+        """
+        version, deterministic = executor_info(execute)
+
+        if self.policy == "never" or (self.policy == "deterministic" and not deterministic):
+            return None
+
+        return RunCache(self, goal, version, deterministic)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            if self._db is None:
+                return None
+
+            row = self._db.execute("SELECT result FROM task_results WHERE key = ?", (key,)).fetchone()
+
+        if row is not None:
+            self._remember(key, row[0])
+            return row[0]
+
+        return None
+
+    def put(self, key: str, result: str):
+        self._remember(key, result)
+
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO task_results VALUES (?, ?, ?)", (key, result, time.time())
+                )
+                self._db.commit()
+
+    def discard(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+
+            if self._db is not None:
+                self._db.execute("DELETE FROM task_results WHERE key = ?", (key,))
+                self._db.commit()
+
+    def _remember(self, key: str, result: str):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class RunCache:
+    """
+    Task cache bound to one goal and executor, counting this run's hits
+    """
+
+    def __init__(self, cache: TaskCache, goal: str, version: str, deterministic: bool):
+        self.cache = cache
+        self.goal = goal
+        self.version = version
+        self.deterministic = deterministic
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, task: str) -> str:
+        return TaskCache.key(self.goal, task, self.version)
+
+    def get(self, task: str) -> str | None:
+        result = self.cache.get(self._key(task))
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return result
+
+    def put(self, task: str, result: str):
+        self.cache.put(self._key(task), result)
+
+    def reject(self, task: str):
+        """
+        Forgets a result the evaluator did not accept, so a retry of a
+        non-deterministic executor asks it again
+        """
+        if not self.deterministic:
+            self.cache.discard(self._key(task))
+
+    def stats(self) -> dict:
+        return {"policy": self.cache.policy, "hits": self.hits, "misses": self.misses}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> TaskCache:
+    """
+    Process-wide cache built from config, used when run() is given none
+    """
+    global _shared_cache
+
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TaskCache()
+
+    return _shared_cache
@@ -0,0 +1,120 @@
+"""
+Batch Runner Tests
+Goal loading, both run modes with the local executor, error states and the shared rate limit
+"""
+
+import json
+import time
+
+import pytest
+
+import main
+import batch
+from batch import SharedRateLimiter, load_goals, rate_limited, run_many, summarize
+
+GOALS = [
+    "Prepare for a Python interview",
+    "Learn SQL basics",
+    "Plan a 3-day trip to Rome",
+    "Write a blog post about testing",
+]
+
+
+def test_load_goals_skips_blank_lines_and_comments(tmp_path):
+    path = tmp_path / "goals.txt"
+    path.write_text("# goals for today\nLearn SQL basics\n\n    # indented comment\n  Plan a trip  \n")
+
+    assert load_goals(str(path)) == ["Learn SQL basics", "Plan a trip"]
+
+
+@pytest.mark.parametrize("mode", ["process", "async"])
+def test_run_many_returns_states_in_goal_order_and_streams_them(tmp_path, mode):
+    output = tmp_path / "states.jsonl"
+
+    states, stats = run_many(GOALS, workers=2, mode=mode, output=str(output))
+
+    assert [state["goal"] for state in states] == GOALS
+    assert all(state["status"] == "completed" for state in states)
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(line["goal"] for line in lines) == sorted(GOALS)
+    assert all(line["status"] == "completed" and line["results"] for line in lines)
+
+    assert stats["goals"] == 4 and stats["completed"] == 4
+    assert stats["failed"] == stats["errors"] == 0
+    assert stats["tasks_completed"] == sum(len(state["completed_tasks"]) for state in states)
+
+
+def test_run_many_appends_to_an_existing_output(tmp_path):
+    output = tmp_path / "states.jsonl"
+
+    run_many(GOALS[:2], workers=1, mode="async", output=str(output))
+    run_many(GOALS[2:], workers=1, mode="async", output=str(output))
+
+    assert [json.loads(line)["goal"] for line in output.read_text().splitlines()] == GOALS
+
+
+def test_failing_goal_becomes_an_error_state(tmp_path, monkeypatch):
+    run_async = main.run_async
+
+    async def failing_run_async(goal, execute=None):
+        if goal == GOALS[1]:
+            raise RuntimeError("planner crashed")
+        return await run_async(goal, execute)
+
+    monkeypatch.setattr(main, "run_async", failing_run_async)
+    output = tmp_path / "states.jsonl"
+
+    states, stats = run_many(GOALS, workers=2, mode="async", output=str(output))
+
+    assert states[1]["status"] == "error"
+    assert states[1]["error"] == "RuntimeError: planner crashed"
+    assert [state["status"] for i, state in enumerate(states) if i != 1] == ["completed"] * 3
+    assert stats["errors"] == 1 and stats["failed"] == 0
+    assert stats["failure_rate"] == 0.25
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["goal"] for line in lines if line["status"] == "error"] == [GOALS[1]]
+
+
+def test_run_many_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        run_many(GOALS, mode="threads")
+
+
+def test_summarize_counts_failures_and_errors():
+    states = [
+        {"status": "completed", "completed_tasks": ["a", "b"], "replan_count": 1},
+        {"status": "failed", "completed_tasks": ["a"], "replan_count": 3},
+        batch.error_state("broken", ValueError("bad goal")),
+    ]
+
+    stats = summarize(states, 2.0)
+
+    assert (stats["completed"], stats["failed"], stats["errors"]) == (1, 1, 1)
+    assert stats["failure_rate"] == pytest.approx(2 / 3)
+    assert stats["goals_per_second"] == 1.5
+    assert stats["tasks_completed"] == 3 and stats["replans"] == 4
+    assert summarize([], 0.0)["failure_rate"] == 0.0
+
+
+def test_shared_rate_limiter_spaces_calls():
+    limiter = SharedRateLimiter(requests_per_minute=600)  # one call per 0.1s
+    calls = []
+    execute = rate_limited(lambda task: calls.append(time.perf_counter()), limiter)
+
+    for task in "abcd":
+        execute(task)
+
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
+
+
+def test_rate_limiter_without_limit_never_waits():
+    limiter = SharedRateLimiter(requests_per_minute=0)
+
+    started = time.perf_counter()
+    for _ in range(100):
+        limiter.acquire()
+
+    assert time.perf_counter() - started < 0.05
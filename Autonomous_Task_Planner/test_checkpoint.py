@@ -0,0 +1,102 @@
+"""
+Checkpoint Tests
+Crashes a checkpointed run part-way through and resumes it
+"""
+
+import os
+import json
+import threading
+
+import main
+from task_cache import TaskCache
+from checkpoint import EVENTS_FILE, SNAPSHOT_FILE
+
+GOAL = "Prepare for a Python interview"
+
+
+class CountingExecutor:
+    """Local executor that records every task it runs"""
+
+    version = "test"
+    deterministic = True
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, task):
+        with self._lock:
+            self.calls.append(task)
+        return f"{task} - a complete answer with enough detail to be accepted.", True
+
+
+def replan_first(task, result):
+    """Sends the first plan back for replanning, accepts everything after it"""
+    return "replan" if task.startswith("Create") else "accept"
+
+
+def run(execute, **kwargs):
+    return main.run(GOAL, execute=execute, cache=TaskCache(policy="never"), evaluate=replan_first,
+                    max_workers=1, **kwargs)
+
+
+def comparable(state):
+    data = state.to_dict()
+    for key in ("checkpoint", "trace", "cache"):
+        data.pop(key)
+    return data
+
+
+def tear_last_task_event(path):
+    """
+    Cuts the log in the middle of its last task event, as a crash mid-write
+    would; a snapshot taken after that point could not exist yet
+    """
+    events_path = os.path.join(path, EVENTS_FILE)
+    with open(events_path, "rb") as f:
+        lines = f.readlines()
+
+    last_task = max(i for i, line in enumerate(lines) if json.loads(line)["event"] == "task")
+    with open(events_path, "wb") as f:
+        f.writelines(lines[:last_task])
+        f.write(lines[last_task][:len(lines[last_task]) // 2])
+
+    snapshot_path = os.path.join(path, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            if json.load(f)["offset"] > sum(map(len, lines[:last_task])):
+                os.remove(snapshot_path)
+
+    return [json.loads(line)["task"] for line in lines[:last_task] if json.loads(line)["event"] == "task"]
+
+
+def test_resume_after_torn_write_twice(tmp_path):
+    expected = run(CountingExecutor())
+
+    path = str(tmp_path / "run")
+    first = CountingExecutor()
+    run(first, checkpoint_dir=path)
+    logged = tear_last_task_event(path)
+
+    resumed = CountingExecutor()
+    state = run(resumed, resume_from=path)
+    assert comparable(state) == comparable(expected)
+    assert not set(resumed.calls) & set(logged[1:])  # finished tasks of the last plan are not run again
+    assert len(resumed.calls) < len(first.calls)
+
+    again = CountingExecutor()
+    state = run(again, resume_from=path)
+    assert again.calls == []
+    assert comparable(state) == comparable(expected)
+
+
+def test_torn_line_is_cut_from_the_log(tmp_path):
+    path = str(tmp_path / "run")
+    run(CountingExecutor(), checkpoint_dir=path)
+    tear_last_task_event(path)
+
+    run(CountingExecutor(), resume_from=path)
+
+    with open(os.path.join(path, EVENTS_FILE), "rb") as f:
+        events = [json.loads(line) for line in f]
+    assert events[-1]["event"] == "final"
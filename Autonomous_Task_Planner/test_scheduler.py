@@ -0,0 +1,206 @@
+"""
+Scheduler Tests
+Dependency planning, parallel execution and plan-order application
+"""
+
+import time
+import asyncio
+import threading
+
+import main
+from planner import plan_dependencies
+from task_cache import TaskCache
+from scheduler import ready_tasks, execute_plan, execute_plan_async, in_plan_order
+
+REPLAN = [
+    "Re-evaluate previous outputs and identify what is missing or incorrect",
+    "Refine the remaining steps to better satisfy the goal",
+    "Generate improved content based on feedback",
+    "Re-check final output for completeness and alignment with the goal",
+]
+
+
+class Recorder:
+    """run_task for execute_plan: fixed decisions and delays, records starts and attempts"""
+
+    def __init__(self, decisions=None, delays=None, attempts=3):
+        self.decisions = decisions or {}
+        self.delays = delays or {}
+        self.attempts = attempts
+        self.started = []
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, task, cancelled):
+        with self._lock:
+            self.started.append(task)
+
+        decision = self.decisions.get(task, "accept")
+        for _ in range(self.attempts if decision == "exhausted" else 1):
+            if cancelled.is_set():
+                return "cancelled", ""
+            with self._lock:
+                self.calls.append(task)
+            time.sleep(self.delays.get(task, 0.0))
+
+        return decision, f"result of {task}"
+
+
+# ----- planner.plan_dependencies -----
+
+def test_first_task_has_no_dependencies():
+    assert plan_dependencies(["Write the outline", "Write the body"]) == {
+        "Write the outline": [],
+        "Write the body": ["Write the outline"],
+    }
+
+
+def test_replan_tasks_are_independent_and_recheck_waits_for_all():
+    dependencies = plan_dependencies(REPLAN)
+
+    assert dependencies[REPLAN[0]] == []
+    assert dependencies[REPLAN[1]] == []
+    assert dependencies[REPLAN[2]] == []
+    assert dependencies[REPLAN[3]] == REPLAN[:3]
+
+
+def test_review_and_final_keywords_wait_for_everything_before():
+    tasks = ["Draft the plan", "Add exercises", "Review the plan", "Publish the final version"]
+    dependencies = plan_dependencies(tasks)
+
+    assert dependencies["Add exercises"] == ["Draft the plan"]
+    assert dependencies["Review the plan"] == tasks[:2]
+    assert dependencies["Publish the final version"] == tasks[:3]
+
+
+# ----- scheduler.ready_tasks / in_plan_order -----
+
+def test_ready_tasks_waits_for_accepted_dependencies():
+    plan = ["a", "b", "c"]
+    dependencies = {"a": [], "b": ["a"], "c": []}
+
+    assert ready_tasks(plan, dependencies, {}, set(), 3) == ["a", "c"]
+    assert ready_tasks(plan, dependencies, {"a": ("accept", "")}, {"a", "c"}, 3) == ["b"]
+    assert ready_tasks(plan, dependencies, {"a": ("replan", "")}, {"a", "c"}, 3) == []
+
+
+def test_ready_tasks_respects_limit_and_ignores_forward_edges():
+    plan = ["a", "b", "c"]
+    dependencies = {"a": ["c"], "b": [], "c": []}
+
+    assert ready_tasks(plan, dependencies, {}, set(), 2) == ["a", "b"]
+
+
+def test_in_plan_order_stops_at_first_failure_and_gaps():
+    plan = ["a", "b", "c", "d"]
+
+    outcomes = {"d": ("accept", "4"), "b": ("replan", "2"), "a": ("accept", "1"), "c": ("accept", "3")}
+    assert in_plan_order(plan, outcomes) == [("a", "accept", "1"), ("b", "replan", "2")]
+
+    assert in_plan_order(plan, {"a": ("accept", "1"), "c": ("accept", "3")}) == [("a", "accept", "1")]
+
+
+# ----- scheduler.execute_plan -----
+
+def test_execute_plan_reports_outcomes_in_plan_order():
+    plan = ["a", "b", "c"]
+    run_task = Recorder(delays={"a": 0.05, "b": 0.0, "c": 0.02})
+
+    outcomes = execute_plan(plan, {task: [] for task in plan}, run_task, max_workers=3)
+
+    assert [task for task, _, _ in outcomes] == plan
+
+
+def test_execute_plan_runs_independent_tasks_in_parallel():
+    plan = ["a", "b", "c", "d"]
+    run_task = Recorder(delays={task: 0.1 for task in plan})
+
+    started = time.perf_counter()
+    execute_plan(plan, {task: [] for task in plan}, run_task, max_workers=4)
+
+    assert time.perf_counter() - started < 0.3
+
+
+def test_execute_plan_does_not_start_tasks_after_a_failure():
+    plan = ["a", "b", "c"]
+    dependencies = {"a": [], "b": ["a"], "c": ["b"]}
+    run_task = Recorder(decisions={"b": "replan"})
+
+    outcomes = execute_plan(plan, dependencies, run_task, max_workers=4)
+
+    assert outcomes == [("a", "accept", "result of a"), ("b", "replan", "result of b")]
+    assert "c" not in run_task.started
+
+
+def test_execute_plan_cancels_running_tasks_after_a_failure():
+    plan = ["a", "b", "c", "d"]
+    run_task = Recorder(decisions={"a": "replan", "b": "exhausted", "c": "exhausted", "d": "exhausted"},
+                        delays={"a": 0.1, "b": 0.06, "c": 0.06, "d": 0.06})
+
+    outcomes = execute_plan(plan, {task: [] for task in plan}, run_task, max_workers=4)
+
+    assert outcomes == [("a", "replan", "result of a")]
+    # Each later task finishes the attempt in progress when "a" fails, then stops
+    for task in "bcd":
+        assert run_task.calls.count(task) == 2
+
+
+def test_execute_plan_async_cancels_running_tasks_after_a_failure():
+    plan = ["a", "b", "c"]
+    calls = []
+
+    async def run_task(task):
+        for _ in range(3):
+            calls.append(task)
+            await asyncio.sleep(0.1 if task == "a" else 0.06)
+            if task == "a":
+                return "replan", ""
+        return "exhausted", ""
+
+    outcomes = asyncio.run(execute_plan_async(plan, {task: [] for task in plan}, run_task, max_workers=3))
+
+    assert outcomes == [("a", "replan", "")]
+    assert calls.count("b") == 2 and calls.count("c") == 2
+
+
+# ----- main.run, parallel vs serial -----
+
+def evaluate(task, result):
+    """Replans the first plan, accepts every task of the second"""
+    return "replan" if task.startswith("Create") else "accept"
+
+
+def evaluate_with_failure(task, result):
+    """Also replans a task in the middle of the second plan"""
+    return "replan" if task.startswith(("Create", "Generate")) else "accept"
+
+
+def execute(task):
+    time.sleep(0.01 * (len(task) % 3))
+    return f"{task}: a complete and detailed answer for the task.", True
+
+
+def final_state(max_workers, evaluate=evaluate):
+    state = main.run("Prepare for a Python interview", max_workers=max_workers, execute=execute,
+                     cache=TaskCache(policy="never"), evaluate=evaluate)
+    data = state.to_dict()
+    data.pop("trace")
+    return data
+
+
+def test_parallel_run_matches_serial_run():
+    serial = final_state(1)
+
+    assert serial["status"] == "completed"
+    assert serial["completed_tasks"] == REPLAN
+    for _ in range(3):
+        assert final_state(4) == serial
+
+
+def test_parallel_run_matches_serial_run_after_a_failure():
+    serial = final_state(1, evaluate_with_failure)
+
+    assert serial["completed_tasks"] == REPLAN[:2]
+    assert serial["failed_tasks"][-1] == REPLAN[2]
+    for _ in range(3):
+        assert final_state(4, evaluate_with_failure) == serial
@@ -0,0 +1,131 @@
+"""
+Semantic Evaluator Tests
+Decisions of evaluate_batch and micro-batching of concurrent calls
+"""
+
+import time
+import threading
+
+import pytest
+
+import semantic_evaluator
+from semantic_evaluator import SemanticEvaluator, evaluate_batch
+
+GOAL = "Prepare for a Python backend interview"
+
+CASES = [
+    ("Create a 4-week Python interview study plan",
+     "Week 1: Python data structures, lists, dicts and sets with daily practice problems. "
+     "Week 2: algorithms. Week 3: system design. Week 4: mock interviews and revision."),
+    ("List common Python interview questions",
+     "Common Python interview questions cover generators, decorators, the GIL, "
+     "list comprehensions, mutable default arguments and exception handling."),
+    ("Review the study plan", ""),
+    ("Summarize Python testing tools", "Execution error: timeout"),
+]
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Records the size of every batch scored"""
+    sizes = []
+    real = semantic_evaluator.evaluate_batch
+
+    def recording(tasks, results, goals=None, *args, **kwargs):
+        sizes.append(len(tasks))
+        return real(tasks, results, goals, *args, **kwargs)
+
+    monkeypatch.setattr(semantic_evaluator, "evaluate_batch", recording)
+    return sizes
+
+
+def evaluate_concurrently(evaluator, cases):
+    """Starts all calls at once; returns their outcomes in case order"""
+    barrier = threading.Barrier(len(cases))
+    outcomes = [None] * len(cases)
+
+    def call(i, task, result):
+        barrier.wait()
+        outcomes[i] = evaluator.evaluate(task, result)
+
+    threads = [threading.Thread(target=call, args=(i, task, result)) for i, (task, result) in enumerate(cases)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return outcomes
+
+
+def test_evaluate_batch_decisions():
+    decisions = [decision for decision, _ in evaluate_batch(*zip(*CASES), [GOAL] * len(CASES))]
+
+    assert decisions[:2] == ["accept", "accept"]
+    assert decisions[2:] == ["retry", "retry"]
+
+
+def test_concurrent_calls_are_scored_in_one_batch(batches):
+    evaluator = SemanticEvaluator(GOAL, max_batch=len(CASES), wait_seconds=2.0)
+
+    started = time.perf_counter()
+    outcomes = evaluate_concurrently(evaluator, CASES)
+
+    assert batches == [len(CASES)]
+    assert time.perf_counter() - started < 1.0  # a full batch does not wait out wait_seconds
+    assert outcomes == evaluate_batch(*zip(*CASES), [GOAL] * len(CASES))
+
+
+def test_confidences_are_recorded_per_task(batches):
+    evaluator = SemanticEvaluator(GOAL, max_batch=len(CASES), wait_seconds=2.0)
+    outcomes = evaluate_concurrently(evaluator, CASES)
+
+    assert evaluator.confidences == {task: outcome[1] for (task, _), outcome in zip(CASES, outcomes)}
+
+
+def test_single_call_waits_at_most_wait_seconds(batches):
+    evaluator = SemanticEvaluator(GOAL, max_batch=4, wait_seconds=0.05)
+
+    started = time.perf_counter()
+    decision = evaluator.evaluate_task(*CASES[0])
+
+    assert decision == "accept"
+    assert batches == [1]
+    assert time.perf_counter() - started < 1.0
+
+
+def test_more_calls_than_max_batch_are_all_answered(batches):
+    cases = CASES * 3
+    evaluator = SemanticEvaluator(GOAL, max_batch=2, wait_seconds=0.05)
+
+    outcomes = evaluate_concurrently(evaluator, cases)
+
+    assert all(outcome is not None for outcome in outcomes)
+    assert sum(batches) == len(cases)
+    assert [decision for decision, _ in outcomes] == [decision for decision, _ in
+                                                      evaluate_batch(*zip(*cases), [GOAL] * len(cases))]
+
+
+def test_batch_errors_reach_every_caller(monkeypatch):
+    def failing(*args, **kwargs):
+        raise RuntimeError("scoring failed")
+
+    monkeypatch.setattr(semantic_evaluator, "evaluate_batch", failing)
+    evaluator = SemanticEvaluator(GOAL, max_batch=2, wait_seconds=2.0)
+    errors = []
+
+    def call(task, result):
+        try:
+            evaluator.evaluate(task, result)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, args=case) for case in CASES[:2]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(errors) == 2
+    # The evaluator is usable again after a failed batch
+    monkeypatch.undo()
+    evaluator.wait_seconds = 0.05
+    assert evaluator.evaluate_task(*CASES[1]) == "accept"
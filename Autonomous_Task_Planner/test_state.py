@@ -0,0 +1,145 @@
+"""
+Run State Tests
+TaskList index, ResultStore spilling and RunState dict compatibility
+"""
+
+import os
+import json
+import pickle
+
+import main
+from task_cache import TaskCache
+from state import TaskList, ResultStore, RunState, apply_outcomes
+
+LONG = "Week 1: arrays, strings and hashing with daily practice. " * 200
+
+
+# ----- TaskList -----
+
+def test_task_list_index_follows_every_mutation():
+    tasks = TaskList(["a", "b"])
+    tasks.append("c")
+    tasks.extend(["d", "d"])
+    tasks += ["e"]
+    tasks.insert(0, "z")
+    assert all(task in tasks for task in "abcdez")
+
+    tasks.remove("d")
+    assert "d" in tasks  # a second copy is still there
+    tasks.remove("d")
+    assert "d" not in tasks
+
+    assert tasks.pop() == "e" and "e" not in tasks
+    tasks[0] = "y"
+    assert "y" in tasks and "z" not in tasks
+    del tasks[0]
+    assert "y" not in tasks
+
+    tasks.clear()
+    assert "a" not in tasks and tasks == []
+
+
+def test_task_list_is_a_list():
+    tasks = TaskList(["a", "b"])
+
+    assert tasks == ["a", "b"]
+    assert json.dumps(tasks) == '["a", "b"]'
+    copy = pickle.loads(pickle.dumps(tasks))
+    assert isinstance(copy, TaskList) and "b" in copy
+
+
+# ----- ResultStore -----
+
+def test_result_store_spills_large_results_and_reads_them_back():
+    store = ResultStore(spill_bytes=100)
+    store["short"] = "done"
+    store["long"] = LONG
+    store["other"] = LONG.upper()
+
+    assert store.spilled() == 2
+    assert store["short"] == "done"
+    assert store["long"] == LONG
+    assert store["other"] == LONG.upper()
+    assert list(store) == ["short", "long", "other"]
+    assert os.path.getsize(store._path) < len(LONG)  # compressed
+
+
+def test_result_store_close_keeps_results_readable():
+    store = ResultStore({"long": LONG}, spill_bytes=100)
+    store.close()
+
+    assert store._file is None
+    assert store["long"] == LONG
+
+    store["more"] = LONG + "!"  # writing reopens the file
+    store.close()
+    assert store["more"] == LONG + "!" and store["long"] == LONG
+
+
+def test_result_store_file_removed_when_collected():
+    store = ResultStore({"long": LONG}, spill_bytes=100)
+    path = store._path
+    store.close()
+    del store
+
+    assert not os.path.exists(path)
+
+
+def test_result_store_pickles_closed():
+    store = ResultStore({"short": "done", "long": LONG}, spill_bytes=100)
+    copy = pickle.loads(pickle.dumps(store))
+
+    assert dict(copy) == dict(store)
+    assert copy.spilled() == 1 and copy._file is None
+
+
+# ----- RunState -----
+
+def filled_state():
+    state = RunState("Learn Python")
+    state["plan"] = ["a", "b"]
+    apply_outcomes(state, [("a", "accept", "short"), ("b", "accept", LONG)])
+    state["error"] = "extra keys are kept"
+    return state
+
+
+def test_run_state_reads_like_a_dict():
+    state = filled_state()
+
+    assert state["goal"] == state.goal == "Learn Python"
+    assert state.get("missing") is None
+    assert "a" in state["completed_tasks"]
+    assert dict(state["results"].items()) == {"a": "short", "b": LONG}
+    assert state["error"] == "extra keys are kept"
+    assert "error" in state and "results" in state
+
+
+def test_run_state_round_trips_through_dict_and_json():
+    state = filled_state()
+    data = json.loads(json.dumps(state.to_dict()))
+
+    assert data["results"]["b"] == LONG
+    restored = RunState.from_dict(data)
+    assert restored == state
+    assert isinstance(restored["completed_tasks"], TaskList)
+    assert isinstance(restored["results"], ResultStore)
+
+
+def test_run_state_pickles():
+    state = filled_state()
+    copy = pickle.loads(pickle.dumps(state))
+
+    assert copy == state
+    assert copy["results"]["b"] == LONG
+
+
+def test_run_closes_the_result_store():
+    def execute(task):
+        return f"{task}\n" + LONG, True
+
+    state = main.run("Learn Python", execute=execute, cache=TaskCache(policy="never"),
+                     evaluate=lambda task, result: "accept")
+
+    assert state["results"].spilled() == 1
+    assert state["results"]._file is None
+    assert state["results"][state["completed_tasks"][0]].endswith(LONG)
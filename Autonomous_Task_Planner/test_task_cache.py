@@ -0,0 +1,144 @@
+"""
+Task Cache Tests
+Policies, LRU bound, SQLite persistence and rejection of results
+"""
+
+import pytest
+
+import main
+from task_cache import TaskCache, executor_info
+
+GOAL = "Prepare for a Python interview"
+
+
+def deterministic_execute(task):
+    return f"{task}: a complete answer with enough detail to be accepted.", True
+
+
+deterministic_execute.version = "rules-test"
+deterministic_execute.deterministic = True
+
+
+def llm_execute(task):
+    return f"{task}: a sampled answer with enough detail to be accepted.", True
+
+
+llm_execute.version = "llm-test"
+llm_execute.deterministic = False
+
+
+def test_executor_info_reads_declared_attributes():
+    assert executor_info(deterministic_execute) == ("rules-test", True)
+    assert executor_info(lambda task: ("", True))[1] is False
+
+
+@pytest.mark.parametrize("policy,execute,cached", [
+    ("always", deterministic_execute, True),
+    ("always", llm_execute, True),
+    ("deterministic", deterministic_execute, True),
+    ("deterministic", llm_execute, False),
+    ("never", deterministic_execute, False),
+    ("never", llm_execute, False),
+])
+def test_policy_decides_which_executors_are_cached(policy, execute, cached):
+    cache = TaskCache(policy=policy)
+    assert (cache.for_run(GOAL, execute) is not None) == cached
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        TaskCache(policy="sometimes")
+
+
+def test_keys_normalize_text_and_separate_versions():
+    assert TaskCache.key(GOAL, "Review the plan.", "v1") == TaskCache.key(GOAL.upper(), "  review  the PLAN", "v1")
+    assert TaskCache.key(GOAL, "Review the plan", "v1") != TaskCache.key(GOAL, "Review the plan", "v2")
+    assert TaskCache.key(GOAL, "Review the plan", "v1") != TaskCache.key("Other goal", "Review the plan", "v1")
+
+
+def test_run_cache_counts_hits_and_misses():
+    run_cache = TaskCache(policy="always").for_run(GOAL, llm_execute)
+
+    assert run_cache.get("task") is None
+    run_cache.put("task", "result")
+    assert run_cache.get("task") == "result"
+    assert run_cache.stats() == {"policy": "always", "hits": 1, "misses": 1}
+
+
+def test_lru_keeps_at_most_max_entries():
+    cache = TaskCache(policy="always", max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # a is now the most recently used
+    cache.put("c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_sqlite_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    cache = TaskCache(policy="always", max_entries=1, path=path)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # evicted from memory, read back from disk
+    cache.close()
+
+    reopened = TaskCache(policy="always", path=path)
+    assert reopened.get("a") == "1" and reopened.get("b") == "2"
+    reopened.discard("a")
+    reopened.close()
+
+    assert TaskCache(policy="always", path=path).get("a") is None
+
+
+def test_reject_drops_only_non_deterministic_results():
+    cache = TaskCache(policy="always")
+    llm = cache.for_run(GOAL, llm_execute)
+    rules = cache.for_run(GOAL, deterministic_execute)
+    llm.put("task", "sampled")
+    rules.put("task", "computed")
+
+    llm.reject("task")
+    rules.reject("task")
+
+    assert llm.get("task") is None
+    assert rules.get("task") == "computed"
+
+
+def test_rejected_results_are_executed_again_on_retry():
+    calls = []
+    decisions = iter(["retry", "accept"])
+
+    def execute(task):
+        calls.append(task)
+        return llm_execute(task)
+
+    execute.version = "llm-test"
+    execute.deterministic = False
+
+    decision, _ = main.run_task("task", execute, TaskCache(policy="always").for_run(GOAL, execute),
+                                lambda task, result: next(decisions))
+
+    assert decision == "accept"
+    assert calls == ["task", "task"]
+
+
+def test_second_run_reuses_cached_results():
+    cache = TaskCache(policy="deterministic")
+    calls = []
+
+    def execute(task):
+        calls.append(task)
+        return deterministic_execute(task)
+
+    execute.version = "rules-test"
+    execute.deterministic = True
+
+    main.run(GOAL, execute=execute, cache=cache)
+    first = len(calls)
+    state = main.run(GOAL, execute=execute, cache=cache)
+
+    assert len(calls) == first
+    assert state["cache"]["hits"] == first and state["cache"]["misses"] == 0
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+
+from config import TRACE_DIR
+
+_usage = contextvars.ContextVar("token_usage", default=None)
+
+
+def record_usage(prompt_tokens: int, completion_tokens: int):
+    """
+    Called by an executor after an LLM call; picked up by the task's span
+    """
+    _usage.set({"prompt": prompt_tokens, "completion": completion_tokens,
+                "total": prompt_tokens + completion_tokens})
+
+
+def take_usage() -> dict | None:
+    usage = _usage.get()
+    _usage.set(None)
+    return usage
+
+
+class Tracer:
+    """
+    Tracing Layer:
+    - Consumes run events (pass it as on_event) and turns them into spans
+      for planning, every execution attempt and every evaluation
+    - Spans carry durations, token usage and decisions
+    - Exports to JSON and to Chrome trace format (chrome://tracing, Perfetto)
+    - summary() gives per-phase and per-task totals for the final state
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.ended = None
+        self.spans = []
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def _lane(self, task: str | None) -> int:
+        # Planning gets lane 0, each task its own lane, so parallel tasks show side by side
+        if task is None:
+            return 0
+        return self._lanes.setdefault(task, len(self._lanes) + 1)
+
+    def _add(self, name: str, category: str, end: float, seconds: float, task: str | None = None, **args):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "category": category,
+                "task": task,
+                "lane": self._lane(task),
+                "start": end - seconds,
+                "seconds": seconds,
+                "args": args,
+            })
+
+    def __call__(self, event: dict):
+        kind = event["type"]
+
+        if kind == "plan":
+            self._add("plan", "planning", event["time"], event["seconds"],
+                      tasks=len(event["plan"]), replan_count=event["replan_count"])
+
+        elif kind == "task_result":
+            self._add("execute", "execution", event["time"], event["seconds"], event["task"],
+                      attempt=event["attempt"], success=event["success"], cached=event["cached"],
+                      tokens=event.get("tokens"))
+
+        elif kind == "evaluation":
+            self._add("evaluate", "evaluation", event["time"], event["seconds"], event["task"],
+                      attempt=event["attempt"], decision=event["decision"])
+
+        elif kind == "replan":
+            self._add("replan", "planning", event["time"], 0.0, replan_count=event["replan_count"])
+
+        elif kind == "final":
+            self.ended = event["time"]
+
+    # ----- Export -----
+
+    def to_json(self) -> dict:
+        return {"started": self.started, "ended": self.ended, "spans": list(self.spans)}
+
+    def to_chrome_trace(self) -> dict:
+        events = []
+        for span in self.spans:
+            args = dict(span["args"])
+            if span["task"]:
+                args["task"] = span["task"]
+            events.append({
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X" if span["seconds"] else "i",
+                "ts": round((span["start"] - self.started) * 1e6),
+                "dur": round(span["seconds"] * 1e6),
+                "pid": 1,
+                "tid": span["lane"],
+                "args": args,
+            })
+
+        names = {0: "planner"} | {lane: task[:60] for task, lane in self._lanes.items()}
+        for lane, name in names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def export_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    # ----- Summary -----
+
+    def summary(self) -> dict:
+        """
+        Seconds per phase, wall time, tokens, and one row per task with its
+        attempts, execution and evaluation time, tokens and last decision
+        """
+        phases = {"planning": 0.0, "execution": 0.0, "evaluation": 0.0}
+        tasks = {}
+        tokens = 0
+
+        for span in self.spans:
+            phases[span["category"]] += span["seconds"]
+
+            if span["task"] is None:
+                continue
+
+            row = tasks.setdefault(span["task"], {
+                "task": span["task"], "attempts": 0, "execute_seconds": 0.0,
+                "evaluate_seconds": 0.0, "tokens": 0, "cached": 0, "decision": None,
+            })
+
+            if span["name"] == "execute":
+                row["attempts"] += 1
+                row["execute_seconds"] += span["seconds"]
+                row["cached"] += bool(span["args"]["cached"])
+                used = (span["args"]["tokens"] or {}).get("total", 0)
+                row["tokens"] += used
+                tokens += used
+            else:
+                row["evaluate_seconds"] += span["seconds"]
+                row["decision"] = span["args"]["decision"]
+
+        ended = self.ended or time.time()
+        return {
+            "wall_seconds": ended - self.started,
+            "phases": phases,
+            "tokens": tokens,
+            "tasks": list(tasks.values()),
+        }
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Plain-text table of a trace summary
+    """
+    lines = [
+        f"{'task':<50} {'attempts':>8} {'exec s':>8} {'eval s':>8} {'tokens':>7}  decision",
+        "-" * 95,
+    ]
+    for row in summary["tasks"]:
+        lines.append(
+            f"{row['task'][:50]:<50} {row['attempts']:>8} {row['execute_seconds']:>8.3f} "
+            f"{row['evaluate_seconds']:>8.3f} {row['tokens']:>7}  {row['decision'] or '-'}"
+        )
+    phases = summary["phases"]
+    lines.append("-" * 95)
+    lines.append(
+        f"wall {summary['wall_seconds']:.3f}s | planning {phases['planning']:.3f}s | "
+        f"execution {phases['execution']:.3f}s | evaluation {phases['evaluation']:.3f}s | "
+        f"tokens {summary['tokens']}"
+    )
+    return "\n".join(lines)
+
+
+def export_run(tracer: Tracer, state: dict, directory: str | None = TRACE_DIR) -> dict:
+    """
+    Writes trace.json and trace.chrome.json for a run into directory,
+    returning their paths (nothing is written without a directory)
+    """
+    if not directory:
+        return {}
+
+    run_dir = os.path.join(directory, f"trace-{int(tracer.started)}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(run_dir, exist_ok=True)
+    paths = {"json": os.path.join(run_dir, "trace.json"), "chrome": os.path.join(run_dir, "trace.chrome.json")}
+    tracer.export_json(paths["json"])
+    tracer.export_chrome_trace(paths["chrome"])
+    return paths
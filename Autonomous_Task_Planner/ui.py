@@ -1,5 +1,7 @@
 import streamlit as st
-from main import run
+from main import run_events
+
+DECISION_ICONS = {"accept": "✅", "retry": "🔁", "replan": "🔀"}
 
 st.set_page_config(page_title="Autonomous Task Planner", layout="centered")
 
@@ -17,13 +19,54 @@ goal = st.text_input(
 
 run_button = st.button("Run Agent System")
 
+
+def render_event(event, log):
+    """
+    Shows one planner event as it happens
+    """
+    kind = event["type"]
+
+    if kind == "plan":
+        title = "🗺️ Plan created" if event["replan_count"] == 0 else f"🗺️ New plan (replan {event['replan_count']})"
+        log.markdown(f"**{title}**")
+        for task in event["plan"]:
+            log.markdown(f"- {task}")
+
+    elif kind == "task_started":
+        attempt = f" (attempt {event['attempt']})" if event["attempt"] > 1 else ""
+        log.markdown(f"▶️ Running: *{event['task']}*{attempt}")
+
+    elif kind == "task_result":
+        label = "cached result" if event["cached"] else f"{event['seconds']:.1f}s"
+        if event["success"]:
+            with log.expander(f"📄 Output: {event['task'][:60]} ({label})"):
+                st.write(event["result"])
+        else:
+            log.error(f"Execution failed: {event['result']}")
+
+    elif kind == "evaluation":
+        icon = DECISION_ICONS.get(event["decision"], "")
+        log.markdown(f"{icon} Evaluator: **{event['decision']}**")
+
+    elif kind == "replan":
+        log.warning(f"Replanning after: {event['task']}")
+
+
 # ---- Run System ----
 if run_button:
     if not goal.strip():
         st.warning("Please enter a goal before running the system.")
     else:
+        st.subheader("⏱️ Live Progress")
+        log = st.container()
+        final_state = None
+
         with st.spinner("Running autonomous agent system..."):
-            final_state = run(goal)
+            for event in run_events(goal):
+                if event["type"] == "final":
+                    final_state = event["state"]
+                else:
+                    render_event(event, log)
 
         st.subheader("📊 Execution Result")
 
@@ -0,0 +1,81 @@
+"""
+Chunker Throughput Benchmark
+Compares TextChunker with LangChain's RecursiveCharacterTextSplitter
+
+Usage:
+    python benchmarks/chunker_benchmark.py [--repeat N] [--scale N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.chunker import TextChunker
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP, DOCUMENTS_DIR
+from src.utils import get_documents_from_folder, print_section
+
+
+def build_corpora(documents, scale):
+    """Benchmark corpora: the real documents plus line- and word-heavy variants"""
+    text = "\n\n".join(content for _, content in documents) * scale
+    return {
+        "documents": text,
+        "single lines": text.replace("\n\n", "\n"),
+        "no newlines": text.replace("\n", " "),
+    }
+
+
+def time_per_run(func, text, repeat):
+    """Best-of-N wall time for one call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark and print a comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--scale", type=int, default=50, help="times to repeat the corpus")
+    parser.add_argument("--folder", default=DOCUMENTS_DIR, help="documents folder")
+    args = parser.parse_args()
+
+    documents = get_documents_from_folder(args.folder)
+    if not documents:
+        print(f"⚠ No documents found in {args.folder}")
+        return
+
+    chunker = TextChunker(CHUNK_SIZE, CHUNK_OVERLAP)
+
+    def langchain_split(text):
+        # Mirrors the old load_documents: a fresh splitter per document
+        return RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+        ).split_text(text)
+
+    print_section(f"Chunker Benchmark (CHUNK_SIZE={CHUNK_SIZE}, CHUNK_OVERLAP={CHUNK_OVERLAP})")
+    print(f"{'corpus':<14} {'MB':>6} {'langchain MB/s':>15} {'chunker MB/s':>13} {'speedup':>8}  identical")
+    print("-" * 70)
+
+    for name, text in build_corpora(documents, args.scale).items():
+        megabytes = len(text.encode("utf-8")) / 1e6
+        baseline = time_per_run(langchain_split, text, args.repeat)
+        native = time_per_run(chunker.split_text, text, args.repeat)
+        identical = langchain_split(text) == chunker.split_text(text)
+        print(
+            f"{name:<14} {megabytes:>6.2f} {megabytes / baseline:>15.1f} "
+            f"{megabytes / native:>13.1f} {baseline / native:>7.2f}x  {'yes' if identical else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Embedding Buffer Benchmark
+Compares embeddings kept as Python lists of floats with aligned float32 / float16 NumPy buffers
+
+Usage:
+    python benchmarks/embedding_benchmark.py [--chunks N] [--dimension D] [--batch-size B]
+                                             [--repeat N] [--skip-chroma]
+
+Three things are measured:
+- memory: bytes held per million chunk embeddings in each representation
+  (measured with tracemalloc on --chunks vectors and scaled up)
+- ingestion: the path from model output to a Chroma upsert. The model is
+  simulated by a fixed float32 batch, as sentence-transformers returns;
+  the list path converts it with .tolist() the way embed_documents does,
+  the buffer path copies it into one aligned matrix. The hashing embedder
+  is also timed end to end through embed_documents and embed_matrix.
+- similarity: scoring a query against every stored vector
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+import tracemalloc
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.offline import HashingEmbeddings
+from src.utils import print_section
+from src.vectors import aligned_empty, embed_matrix, cosine_similarity
+
+MILLION = 1_000_000
+
+
+class SimulatedModel:
+    """
+    Stands in for HuggingFaceEmbeddings: its client returns float32
+    batches instantly, so only the handling of the output is timed
+    """
+
+    def __init__(self, dimension, seed=0):
+        self.client = self
+        rng = np.random.default_rng(seed)
+        self.block = rng.standard_normal((4096, dimension)).astype(np.float32)
+        self.block /= np.linalg.norm(self.block, axis=1, keepdims=True)
+
+    def encode(self, texts, **kwargs):
+        rows = np.arange(len(texts)) % len(self.block)
+        return self.block[rows]
+
+    def embed_documents(self, texts):
+        # What HuggingFaceEmbeddings does with the model output
+        return self.encode(texts).tolist()
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def held_bytes(build):
+    """Bytes still allocated by the object build() returns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del value
+    return held
+
+
+def measure_memory(model, texts):
+    return {
+        "list of floats": held_bytes(lambda: model.embed_documents(texts)),
+        "float32 buffer": held_bytes(lambda: embed_matrix(model, texts, dtype="float32")),
+        "float16 buffer": held_bytes(lambda: embed_matrix(model, texts, dtype="float16")),
+    }
+
+
+def list_pipeline(model, texts, batch_size):
+    vectors = []
+    for lo in range(0, len(texts), batch_size):
+        vectors.extend(model.embed_documents(texts[lo:lo + batch_size]))
+    return vectors
+
+
+def buffer_pipeline(model, texts, batch_size, dtype):
+    return embed_matrix(model, texts, dtype=dtype, batch_size=batch_size)
+
+
+def upsert_seconds(client, texts, vectors):
+    """Time to add vectors (lists or an array) to a fresh in-memory collection"""
+    collection = client.create_collection(f"bench_{uuid.uuid4().hex}")
+    ids = [str(i) for i in range(len(texts))]
+    start = time.perf_counter()
+    for lo in range(0, len(texts), 1000):
+        collection.upsert(ids=ids[lo:lo + 1000], embeddings=vectors[lo:lo + 1000])
+    seconds = time.perf_counter() - start
+    client.delete_collection(collection.name)
+    return seconds
+
+
+def main():
+    """Run the benchmark and print the comparison tables"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=20000, help="vectors per measurement")
+    parser.add_argument("--dimension", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--batch-size", type=int, default=64, help="texts per model call")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--skip-chroma", action="store_true", help="skip the Chroma upsert timing")
+    args = parser.parse_args()
+
+    model = SimulatedModel(args.dimension)
+    texts = [f"chunk {i}" for i in range(args.chunks)]
+
+    print_section(f"Memory per {MILLION:,} chunks ({args.dimension} dimensions)")
+    memory = measure_memory(model, texts)
+    baseline = memory["list of floats"]
+    print(f"{'representation':<16} {'MB / 1M chunks':>15} {'vs lists':>9}")
+    print("-" * 42)
+    for name, held in memory.items():
+        print(f"{name:<16} {held / args.chunks * MILLION / 1e6:>15,.0f} {baseline / held:>8.1f}x")
+
+    print_section(f"Ingestion ({args.chunks:,} chunks, batches of {args.batch_size})")
+    list_s = best_time(lambda: list_pipeline(model, texts, args.batch_size), args.repeat)
+    rows = [("lists (embed_documents)", list_s)]
+    for dtype in ("float32", "float16"):
+        seconds = best_time(lambda: buffer_pipeline(model, texts, args.batch_size, dtype), args.repeat)
+        rows.append((f"{dtype} buffer", seconds))
+
+    hashing = HashingEmbeddings(args.dimension)
+    sample = [f"sample chunk {i} about embeddings and buffers" for i in range(min(args.chunks, 5000))]
+    hash_list = best_time(lambda: hashing.embed_documents(sample), args.repeat)
+    hash_buffer = best_time(lambda: embed_matrix(hashing, sample, dtype="float32"), args.repeat)
+
+    print(f"{'model output -> vectors':<28} {'seconds':>8} {'chunks/s':>11} {'speedup':>8}")
+    print("-" * 58)
+    for name, seconds in rows:
+        print(f"{name:<28} {seconds:>8.3f} {args.chunks / seconds:>11,.0f} {list_s / seconds:>7.1f}x")
+    print(f"{'hashing embedder, lists':<28} {hash_list:>8.3f} {len(sample) / hash_list:>11,.0f} {1.0:>7.1f}x")
+    print(f"{'hashing embedder, buffer':<28} {hash_buffer:>8.3f} {len(sample) / hash_buffer:>11,.0f} "
+          f"{hash_list / hash_buffer:>7.1f}x")
+
+    if not args.skip_chroma:
+        import chromadb
+        from chromadb.config import Settings
+
+        client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+        as_lists = list_pipeline(model, texts, args.batch_size)
+        as_array = buffer_pipeline(model, texts, args.batch_size, "float32")
+        upsert_lists = upsert_seconds(client, texts, as_lists)
+        upsert_array = upsert_seconds(client, texts, as_array)
+        total_lists = list_s + upsert_lists
+        total_array = rows[1][1] + upsert_array
+        print(f"\n{'with Chroma upsert':<28} {'seconds':>8} {'chunks/s':>11} {'speedup':>8}")
+        print("-" * 58)
+        print(f"{'lists':<28} {total_lists:>8.3f} {args.chunks / total_lists:>11,.0f} {1.0:>7.1f}x")
+        print(f"{'float32 buffer':<28} {total_array:>8.3f} {args.chunks / total_array:>11,.0f} "
+              f"{total_lists / total_array:>7.1f}x")
+
+    print_section(f"Similarity (one query against {args.chunks:,} vectors)")
+    query = model.block[1]
+    as_lists = list_pipeline(model, texts, args.batch_size)
+    list_score = best_time(lambda: cosine_similarity(np.asarray(as_lists, dtype=np.float32), query), args.repeat)
+    print(f"{'stored as':<16} {'ms':>8} {'speedup':>8}")
+    print("-" * 34)
+    print(f"{'lists':<16} {list_score * 1000:>8.2f} {1.0:>7.1f}x")
+    for dtype in ("float32", "float16"):
+        matrix = buffer_pipeline(model, texts, args.batch_size, dtype)
+        seconds = best_time(lambda: cosine_similarity(matrix, query), args.repeat)
+        print(f"{dtype + ' buffer':<16} {seconds * 1000:>8.2f} {list_score / seconds:>7.1f}x")
+
+    aligned = aligned_empty((2, args.dimension), "float32")
+    print(f"\nBuffer start offset mod 64: {aligned.ctypes.data % 64}, row stride {aligned.strides[0]} bytes")
+
+
+if __name__ == "__main__":
+    main()
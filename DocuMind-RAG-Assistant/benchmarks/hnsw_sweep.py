@@ -0,0 +1,235 @@
+"""
+HNSW Parameter Sweep
+Builds Chroma indexes over a corpus with different HNSW settings and compares them with exact search
+
+Usage:
+    python benchmarks/hnsw_sweep.py [--questions FILE] [--m 8,16,32] [--ef-construction 50,100,200]
+                                    [--ef-search 10,50,100,200] [--k 3] [--min-recall 0.95]
+
+The corpus is chunked and embedded once. For every (M, ef_construction)
+pair an index is built; every ef_search value is then queried against it.
+Reported per combination: build time, on-disk size, p95 query latency and
+recall@k against brute-force search. Pareto-optimal settings are marked,
+and the fastest one meeting --min-recall is suggested for src/config.py.
+
+Questions are read one per line from --questions (held out from the
+corpus). Without a file, sentences are sampled from the corpus instead,
+which overestimates recall for real questions.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import itertools
+import tempfile
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import chromadb
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings
+
+from src.backends import create_embeddings
+from src.chunker import TextChunker
+from src.config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, DOCUMENTS_DIR, NUM_RETRIEVED_DOCS,
+    HNSW_SPACE, HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH
+)
+from src.extractive import split_sentences
+from src.hnsw import hnsw_configuration, SPACES
+from src.utils import get_documents_from_folder, print_section
+from src.vectors import embed_matrix
+
+BATCH_SIZE = 1000
+
+
+def int_list(value):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def load_questions(path, chunks, count, seed):
+    """Held-out questions from a file, or sentences sampled from the corpus"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    sentences = [sentence for chunk in chunks for sentence in split_sentences(chunk)]
+    random.Random(seed).shuffle(sentences)
+    return sentences[:count]
+
+
+def exact_neighbours(corpus, queries, k, space):
+    """Brute-force top-k chunk indices, using Chroma's distance for the space"""
+    if space == "l2":
+        distances = (
+            (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ corpus.T + (corpus ** 2).sum(axis=1)[None, :]
+        )
+    elif space == "cosine":
+        corpus_unit = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+        query_unit = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        distances = 1.0 - query_unit @ corpus_unit.T
+    else:
+        distances = 1.0 - queries @ corpus.T
+    return [set(row[:k]) for row in np.argsort(distances, axis=1, kind="stable")]
+
+
+def directory_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+def open_client(path):
+    return chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+
+
+def reopen_with_ef_search(path, ef_search):
+    """
+    Set ef_search and reload the index
+
+    Chroma reads ef_search when it loads the index, so the client
+    cache is cleared to make the new value take effect.
+    """
+    open_client(path).get_collection("sweep").modify(configuration={"hnsw": {"ef_search": ef_search}})
+    SharedSystemClient.clear_system_cache()
+    return open_client(path).get_collection("sweep")
+
+
+def build_index(path, corpus, space, m, ef_construction):
+    """Create a collection with the given settings and add the corpus"""
+    client = open_client(path)
+    collection = client.create_collection(
+        "sweep", configuration=hnsw_configuration(space, m, ef_construction, HNSW_EF_SEARCH)
+    )
+    start = time.perf_counter()
+    for lo in range(0, len(corpus), BATCH_SIZE):
+        batch = corpus[lo:lo + BATCH_SIZE]
+        collection.add(ids=[str(i) for i in range(lo, lo + len(batch))], embeddings=batch)
+    build_seconds = time.perf_counter() - start
+    return build_seconds
+
+
+def measure_queries(collection, queries, truth, k):
+    """p95 latency (ms) and mean recall@k for one ef_search setting"""
+    collection.query(query_embeddings=queries[:1], n_results=k, include=[])  # warm up
+    latencies = []
+    recalls = []
+    for vector, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=vector[None, :], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        found = {int(i) for i in result["ids"][0]}
+        recalls.append(len(found & expected) / max(len(expected), 1))
+    return float(np.percentile(latencies, 95)) * 1000, float(np.mean(recalls))
+
+
+def pareto_front(rows):
+    """Rows not dominated on (recall up, p95 down, build time down, size down)"""
+    def objectives(row):
+        return (-row["recall"], row["p95_ms"], row["build_seconds"], row["bytes"])
+
+    front = []
+    for row in rows:
+        mine = objectives(row)
+        dominated = any(
+            all(a <= b for a, b in zip(objectives(other), mine)) and objectives(other) != mine
+            for other in rows
+        )
+        if not dominated:
+            front.append(row)
+    return front
+
+
+def main():
+    """Run the sweep and print the comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--folder", default=DOCUMENTS_DIR, help="documents folder")
+    parser.add_argument("--questions", help="held-out questions, one per line")
+    parser.add_argument("--num-questions", type=int, default=200, help="sampled questions without a file")
+    parser.add_argument("--space", default=HNSW_SPACE, choices=SPACES, help="distance function")
+    parser.add_argument("--m", type=int_list, default=[8, 16, 32], help="comma-separated M values")
+    parser.add_argument("--ef-construction", type=int_list, default=[50, 100, 200])
+    parser.add_argument("--ef-search", type=int_list, default=[10, 50, 100, 200])
+    parser.add_argument("--k", type=int, default=NUM_RETRIEVED_DOCS, help="results per query")
+    parser.add_argument("--min-recall", type=float, default=0.95, help="recall required for the suggestion")
+    parser.add_argument("--embedding-backend", help="huggingface or hashing (default: config)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    documents = get_documents_from_folder(args.folder)
+    if not documents:
+        print(f"⚠ No documents found in {args.folder}")
+        return
+
+    chunker = TextChunker(CHUNK_SIZE, CHUNK_OVERLAP)
+    chunks = [chunk for _, content in documents for chunk in chunker.split_text(content)]
+    questions = load_questions(args.questions, chunks, args.num_questions, args.seed)
+    if not questions:
+        print("⚠ No questions to evaluate")
+        return
+
+    embeddings = create_embeddings(args.embedding_backend)
+    print(f"Embedding {len(chunks)} chunks and {len(questions)} questions...")
+    corpus = embed_matrix(embeddings, chunks, dtype="float32")
+    queries = embed_matrix(embeddings, questions, dtype="float32")
+    k = min(args.k, len(chunks))
+    truth = exact_neighbours(corpus, queries, k, args.space)
+
+    rows = []
+    for m, ef_construction in itertools.product(args.m, args.ef_construction):
+        path = tempfile.mkdtemp(prefix="hnsw_sweep_")
+        try:
+            build_seconds = build_index(path, corpus, args.space, m, ef_construction)
+            size = directory_bytes(path)
+            for ef_search in args.ef_search:
+                collection = reopen_with_ef_search(path, ef_search)
+                p95_ms, recall = measure_queries(collection, queries, truth, k)
+                rows.append({
+                    "m": m, "ef_construction": ef_construction, "ef_search": ef_search,
+                    "build_seconds": build_seconds, "bytes": size,
+                    "p95_ms": p95_ms, "recall": recall,
+                })
+        finally:
+            SharedSystemClient.clear_system_cache()
+            shutil.rmtree(path, ignore_errors=True)
+
+    front = pareto_front(rows)
+    print_section(
+        f"HNSW Sweep ({len(chunks)} chunks, {len(questions)} questions, "
+        f"space={args.space}, recall@{k} vs exact)"
+    )
+    print(f"{'M':>4} {'ef_constr':>9} {'ef_search':>9} {'build s':>8} {'size MB':>8} "
+          f"{'p95 ms':>7} {'recall':>7}  pareto")
+    print("-" * 70)
+    for row in rows:
+        print(
+            f"{row['m']:>4} {row['ef_construction']:>9} {row['ef_search']:>9} "
+            f"{row['build_seconds']:>8.2f} {row['bytes'] / 1e6:>8.2f} "
+            f"{row['p95_ms']:>7.2f} {row['recall']:>7.3f}  {'*' if any(row is r for r in front) else ''}"
+        )
+
+    eligible = [row for row in front if row["recall"] >= args.min_recall]
+    if eligible:
+        best = min(eligible, key=lambda row: (row["p95_ms"], row["bytes"], row["build_seconds"]))
+        reason = f"fastest Pareto setting with recall@{k} >= {args.min_recall}"
+    else:
+        best = max(front, key=lambda row: (row["recall"], -row["p95_ms"]))
+        reason = f"no setting reached recall@{k} >= {args.min_recall}; highest recall shown"
+
+    print(f"\nSuggested ({reason}):")
+    print(f"  HNSW_SPACE = \"{args.space}\"")
+    print(f"  HNSW_M = {best['m']}")
+    print(f"  HNSW_EF_CONSTRUCTION = {best['ef_construction']}")
+    print(f"  HNSW_EF_SEARCH = {best['ef_search']}")
+    if (best["m"], best["ef_construction"], args.space) != (HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_SPACE):
+        print("  (rebuild existing collections with load_documents(force_reload=True) to apply)")
+
+
+if __name__ == "__main__":
+    main()
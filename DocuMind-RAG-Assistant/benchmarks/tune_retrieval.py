@@ -0,0 +1,273 @@
+"""
+Retrieval Auto-Tuner
+Evaluates CHUNK_SIZE, CHUNK_OVERLAP and k against a golden question set and recommends a config
+
+Usage:
+    python benchmarks/tune_retrieval.py [--golden FILE] [--chunk-sizes 300,500,800]
+                                        [--overlaps 0,50,100] [--k 1,3,5] [--cache FILE]
+
+The golden set is JSON lines: {"question": ..., "sources": [filenames],
+"evidence": optional phrase}. A retrieved chunk is relevant if it comes
+from one of the sources and, when evidence is given, contains it.
+
+For each (chunk size, overlap) the corpus is re-chunked and indexed in an
+in-memory Chroma collection. Chunk embeddings are cached by text, so
+chunks that coincide between settings (and between runs, with --cache)
+are embedded only once. For each k it reports:
+- hit rate: questions with a relevant chunk in the top k
+- MRR: mean reciprocal rank of the first relevant chunk
+- prompt tokens: estimated size of the prompt query() would send, after
+  context compression when CONTEXT_COMPRESSION_ENABLED
+- p95 search latency and the time to embed and index the setting
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import itertools
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import chromadb
+from chromadb.config import Settings
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.backends import create_embeddings
+from src.chunker import TextChunker
+from src.compression import compress_documents
+from src.config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, NUM_RETRIEVED_DOCS, DOCUMENTS_DIR, SYSTEM_PROMPT,
+    EMBEDDING_BACKEND, EMBEDDING_MODEL, CONTEXT_COMPRESSION_ENABLED
+)
+from src.governor import estimate_prompt_tokens
+from src.hnsw import hnsw_configuration
+from src.utils import get_documents_from_folder, print_section
+from src.vectors import embed_matrix
+
+DEFAULT_GOLDEN = os.path.join(os.path.dirname(__file__), "golden_questions.jsonl")
+
+
+def int_list(value):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+class EmbeddingCache:
+    """
+    Chunk embeddings keyed by text hash, optionally saved between runs
+
+    The cache file is an .npz holding the keys and one matrix; it is tied
+    to the embedding backend and model it was built with.
+    """
+
+    def __init__(self, embeddings, model_key, path=None):
+        self.embeddings = embeddings
+        self.model_key = model_key
+        self.path = path
+        self.vectors = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            data = np.load(path, allow_pickle=False)
+            if str(data["model"]) == model_key:
+                self.vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, texts):
+        """Embeddings for texts, computing only the ones not cached yet"""
+        keys = [self.key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.vectors and key not in missing:
+                missing[key] = text
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        if missing:
+            vectors = embed_matrix(self.embeddings, list(missing.values()), dtype="float32")
+            for key, vector in zip(missing, vectors):
+                self.vectors[key] = vector
+        return np.stack([self.vectors[key] for key in keys])
+
+    def save(self):
+        if not self.path or not self.vectors:
+            return
+        keys = list(self.vectors)
+        np.savez(self.path, model=self.model_key, keys=np.array(keys),
+                 vectors=np.stack([self.vectors[key] for key in keys]))
+
+
+def load_golden(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    for row in rows:
+        if not row.get("question") or not row.get("sources"):
+            raise ValueError(f"Golden entry needs a question and sources: {row}")
+    return rows
+
+
+def is_relevant(metadata, text, expected):
+    if metadata["source"] not in expected["sources"]:
+        return False
+    evidence = expected.get("evidence")
+    return not evidence or evidence.lower() in text.lower()
+
+
+def prompt_tokens(question, documents, question_vector, embeddings, sentence_cache=None):
+    """
+    Estimated tokens of the prompt query() builds from these chunks
+
+    Like query(), the chunks are first compressed to their relevant
+    sentences when CONTEXT_COMPRESSION_ENABLED, keeping them whole if
+    compression keeps nothing.
+    """
+    if CONTEXT_COMPRESSION_ENABLED and documents:
+        compressed = compress_documents(question_vector, documents, embeddings, cache=sentence_cache)
+        documents = compressed["documents"] or documents
+    context = "\n\n".join(f"[Source: {doc.metadata['source']}]\n{doc.page_content}" for doc in documents)
+    prompt = f"Document Context:\n{context}\n\nQuestion: {question}\n\nAnswer based ONLY on the context above:"
+    return estimate_prompt_tokens([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=prompt)])
+
+
+def evaluate_setting(client, cache, documents, golden, question_vectors, chunk_size, overlap, ks):
+    """Index the corpus with one chunking setting and score every k"""
+    start = time.perf_counter()
+    chunker = TextChunker(chunk_size, overlap)
+    texts, metadatas = [], []
+    for filename, content in documents:
+        for i, chunk in enumerate(chunker.split_text(content)):
+            texts.append(chunk)
+            metadatas.append({"source": filename, "chunk_id": i})
+
+    collection = client.create_collection(f"tune_{uuid.uuid4().hex}", configuration=hnsw_configuration())
+    collection.add(
+        ids=[str(i) for i in range(len(texts))],
+        embeddings=cache.embed(texts),
+        documents=texts,
+        metadatas=metadatas
+    )
+    index_seconds = time.perf_counter() - start
+
+    max_k = min(max(ks), len(texts))
+    ranked, latencies = [], []
+    for vector in question_vectors:
+        query_start = time.perf_counter()
+        result = collection.query(query_embeddings=vector[None, :], n_results=max_k,
+                                  include=["documents", "metadatas"])
+        latencies.append(time.perf_counter() - query_start)
+        ranked.append(list(zip(result["metadatas"][0], result["documents"][0])))
+    client.delete_collection(collection.name)
+    p95_ms = float(np.percentile(latencies, 95)) * 1000
+
+    rows = []
+    sentence_cache = {}  # Chunk sentences are embedded once for all questions and k
+    for k in ks:
+        hits, reciprocal_ranks, tokens = 0, [], []
+        for expected, results, vector in zip(golden, ranked, question_vectors):
+            top = results[:k]
+            rank = next((i for i, (meta, text) in enumerate(top, 1) if is_relevant(meta, text, expected)), None)
+            hits += rank is not None
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+            documents = [
+                Document(page_content=text, metadata=meta, id=f"{meta['source']}::{meta['chunk_id']}")
+                for meta, text in top
+            ]
+            tokens.append(prompt_tokens(expected["question"], documents, vector, cache.embeddings, sentence_cache))
+        rows.append({
+            "chunk_size": chunk_size, "chunk_overlap": overlap, "k": k, "chunks": len(texts),
+            "hit_rate": hits / len(golden), "mrr": float(np.mean(reciprocal_ranks)),
+            "prompt_tokens": float(np.mean(tokens)), "p95_ms": p95_ms, "index_seconds": index_seconds,
+        })
+    return rows
+
+
+def recommend(rows, tolerance):
+    """
+    Cheapest setting whose hit rate and MRR are within tolerance of the best
+
+    Ties are broken by fewer prompt tokens, then lower latency.
+    """
+    best_hit = max(row["hit_rate"] for row in rows)
+    best_mrr = max(row["mrr"] for row in rows if row["hit_rate"] >= best_hit - tolerance)
+    candidates = [
+        row for row in rows
+        if row["hit_rate"] >= best_hit - tolerance and row["mrr"] >= best_mrr - tolerance
+    ]
+    return min(candidates, key=lambda row: (row["prompt_tokens"], row["p95_ms"], -row["mrr"]))
+
+
+def main():
+    """Run the evaluation grid and print the recommended config"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--folder", default=DOCUMENTS_DIR, help="documents folder")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN, help="golden questions (JSON lines)")
+    parser.add_argument("--chunk-sizes", type=int_list, default=[300, 500, 800, 1200])
+    parser.add_argument("--overlaps", type=int_list, default=[0, 50, 100])
+    parser.add_argument("--k", type=int_list, default=[1, 2, 3, 5])
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="hit rate / MRR loss accepted for a cheaper setting")
+    parser.add_argument("--cache", help="file to keep chunk embeddings in between runs (.npz)")
+    parser.add_argument("--embedding-backend", help="huggingface or hashing (default: config)")
+    parser.add_argument("--output", help="write all results as JSON to this file")
+    args = parser.parse_args()
+
+    documents = get_documents_from_folder(args.folder)
+    if not documents:
+        print(f"⚠ No documents found in {args.folder}")
+        return
+    golden = load_golden(args.golden)
+
+    backend = args.embedding_backend or EMBEDDING_BACKEND
+    embeddings = create_embeddings(backend)
+    cache = EmbeddingCache(embeddings, f"{backend}:{EMBEDDING_MODEL}", args.cache)
+    question_vectors = embed_matrix(embeddings, [row["question"] for row in golden], dtype="float32")
+    client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+    rows = []
+    for chunk_size, overlap in itertools.product(args.chunk_sizes, args.overlaps):
+        if overlap >= chunk_size:
+            continue
+        rows.extend(evaluate_setting(
+            client, cache, documents, golden, question_vectors, chunk_size, overlap, args.k
+        ))
+    cache.save()
+
+    print_section(f"Retrieval Tuning ({len(golden)} golden questions, {len(documents)} documents)")
+    print(f"{'size':>5} {'overlap':>7} {'k':>3} {'chunks':>6} {'hit rate':>8} {'MRR':>6} "
+          f"{'tokens':>7} {'p95 ms':>7} {'index s':>8}")
+    print("-" * 70)
+    for row in rows:
+        current = (row["chunk_size"], row["chunk_overlap"], row["k"]) == (CHUNK_SIZE, CHUNK_OVERLAP, NUM_RETRIEVED_DOCS)
+        print(
+            f"{row['chunk_size']:>5} {row['chunk_overlap']:>7} {row['k']:>3} {row['chunks']:>6} "
+            f"{row['hit_rate']:>8.2f} {row['mrr']:>6.3f} {row['prompt_tokens']:>7.0f} "
+            f"{row['p95_ms']:>7.2f} {row['index_seconds']:>8.2f}{'  (current)' if current else ''}"
+        )
+    print(f"\nEmbedding cache: {cache.hits} reused, {cache.misses} computed")
+
+    best = recommend(rows, args.tolerance)
+    print(f"\nRecommended (hit rate {best['hit_rate']:.2f}, MRR {best['mrr']:.3f}, "
+          f"~{best['prompt_tokens']:.0f} prompt tokens):")
+    print(f"  CHUNK_SIZE = {best['chunk_size']}")
+    print(f"  CHUNK_OVERLAP = {best['chunk_overlap']}")
+    print(f"  NUM_RETRIEVED_DOCS = {best['k']}")
+    if (best["chunk_size"], best["chunk_overlap"]) != (CHUNK_SIZE, CHUNK_OVERLAP):
+        print("  (re-index with load_documents(force_reload=True) after changing chunking)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"results": rows, "recommended": best}, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
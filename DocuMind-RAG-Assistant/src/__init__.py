@@ -3,5 +3,6 @@ Package initialization for src
 """
 
 from .rag_system import RAGAssistant
+from .tenants import MultiTenantAssistant
 
-__all__ = ['RAGAssistant']
+__all__ = ['RAGAssistant', 'MultiTenantAssistant']
@@ -0,0 +1,336 @@
+"""
+Persistent answer cache for RAG Assistant
+Keeps generated answers in SQLite so they survive restarts
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from .config import (
+    LLM_BACKEND, LLM_BASE_URL, LLM_MODEL, ANSWER_CACHE_PATH, ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_MEMORY_ENTRIES, ANSWER_CACHE_WARM_QUERIES,
+    ANSWER_CACHE_LOG_FLUSH_EVERY, ANSWER_CACHE_QUERY_LOG_ENTRIES
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    question TEXT NOT NULL,
+    index_version INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used_at);
+CREATE INDEX IF NOT EXISTS answers_question ON answers (namespace, question);
+CREATE TABLE IF NOT EXISTS query_log (
+    namespace TEXT NOT NULL,
+    question TEXT NOT NULL,
+    asked INTEGER NOT NULL,
+    last_asked_at REAL NOT NULL,
+    PRIMARY KEY (namespace, question)
+);
+"""
+
+
+def normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+def chunk_ids_of(documents):
+    """Sorted ids of retrieved chunks"""
+    ids = []
+    for doc in documents:
+        doc_id = getattr(doc, "id", None)
+        if not doc_id:
+            doc_id = f"{doc.metadata.get('source')}::{doc.metadata.get('chunk_id')}"
+        ids.append(doc_id)
+    return sorted(set(ids))
+
+
+def model_identity(llm=None):
+    """
+    Identity of the model that writes answers: its class, model name and
+    API base URL (the configured backend if llm is None), so answers of an
+    offline or stand-in model are never served as another model's
+    """
+    if llm is None:
+        return f"{LLM_BACKEND}:{LLM_MODEL}@{LLM_BASE_URL or ''}"
+    inner = getattr(llm, "llm", llm)  # Unwrap a GovernedLLM
+    model = getattr(inner, "model_name", None) or getattr(inner, "model", None) or ""
+    base_url = getattr(inner, "groq_api_base", None) or getattr(inner, "base_url", None) or ""
+    return f"{type(inner).__module__}.{type(inner).__qualname__}:{model}@{base_url}"
+
+
+def cache_key(namespace, question, chunk_ids, index_version, model=None):
+    """
+    Cache key for an answer
+
+    The answer depends on the question, the chunks it was generated from,
+    the index they came from and the model that wrote it (model_identity()).
+    """
+    payload = json.dumps([
+        namespace, model if model is not None else model_identity(),
+        normalize_question(question), list(chunk_ids), index_version
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    Answer store backed by SQLite with an in-memory LRU in front
+
+    Entries expire after ttl_seconds; beyond max_entries the least
+    recently used are evicted. Every lookup is counted in a query log,
+    and on startup the answers to the most frequently asked questions
+    are loaded into memory. Lookups only touch memory (and read SQLite on
+    a memory miss); their counts and hit times are written in one batch
+    every flush_every lookups, and the query log keeps the
+    query_log_entries most asked questions.
+    """
+
+    def __init__(self, path=ANSWER_CACHE_PATH, ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, memory_entries=ANSWER_CACHE_MEMORY_ENTRIES,
+                 warm_queries=ANSWER_CACHE_WARM_QUERIES, flush_every=ANSWER_CACHE_LOG_FLUSH_EVERY,
+                 query_log_entries=ANSWER_CACHE_QUERY_LOG_ENTRIES):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache)
+            ttl_seconds: Age after which an answer is no longer served (None keeps forever)
+            max_entries: Maximum answers kept on disk
+            memory_entries: Maximum answers kept in memory
+            warm_queries: Number of most frequent questions loaded on startup
+            flush_every: Lookups counted in memory before they are written
+            query_log_entries: Maximum questions kept in the query log
+        """
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.flush_every = flush_every
+        self.query_log_entries = query_log_entries
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (answer, created_at), coldest first
+        self._asked = {}               # (namespace, question) -> [times asked, last asked at]
+        self._used = {}                # key -> [hits, last used at]
+        self._unflushed = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "warmed": 0}
+
+        self.purge_expired()
+        self.warm(warm_queries)
+
+    def get(self, namespace, question, documents, index_version, model=None):
+        """
+        Look up the answer for a question and its retrieved chunks
+
+        Args:
+            model: model_identity() of the model answering (configured one if None)
+
+        Returns:
+            Cached answer text, or None
+        """
+        key = cache_key(namespace, question, chunk_ids_of(documents), index_version, model)
+        now = time.time()
+        with self._lock:
+            self._count(self._asked, (namespace, normalize_question(question)), now)
+
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                entry = tuple(row) if row else None
+
+            if entry is not None and self._expired(entry[1], now):
+                self._forget(key)
+                self._conn.commit()
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+            else:
+                self._remember(key, entry)
+                self._count(self._used, key, now)
+                self.stats["hits"] += 1
+
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush_usage()
+                self._conn.commit()
+
+            return entry[0] if entry is not None else None
+
+    def put(self, namespace, question, documents, index_version, answer, model=None):
+        """Store an answer, evicting the least recently used beyond max_entries"""
+        key = cache_key(namespace, question, chunk_ids_of(documents), index_version, model)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers "
+                "(key, namespace, question, index_version, answer, created_at, last_used_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, namespace, normalize_question(question), index_version, answer, now, now)
+            )
+            self._remember(key, (answer, now))
+            self.stats["stores"] += 1
+            self._used.pop(key, None)
+            self._flush_usage()  # Eviction goes by last use
+            self._evict_over_capacity()
+            self._conn.commit()
+
+    def warm(self, limit):
+        """
+        Load answers to the most frequently asked questions into memory
+
+        Returns:
+            Number of answers loaded
+        """
+        if not limit:
+            return 0
+        with self._lock:
+            self._flush_usage()
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT a.key, a.answer, a.created_at FROM query_log q "
+                "JOIN answers a ON a.namespace = q.namespace AND a.question = q.question "
+                "ORDER BY q.asked DESC, a.last_used_at DESC LIMIT ?",
+                (min(limit, self.memory_entries),)
+            ).fetchall()
+            now = time.time()
+            # Load coldest first so the most frequent end up most recent
+            for key, answer, created_at in reversed(rows):
+                if not self._expired(created_at, now):
+                    self._remember(key, (answer, created_at))
+            self.stats["warmed"] = len(self._memory)
+        if rows:
+            logger.info(f"✓ Answer cache warmed with {self.stats['warmed']} frequent answers")
+        return self.stats["warmed"]
+
+    def purge_expired(self):
+        """
+        Delete answers older than the TTL and prune the query log
+
+        Questions not asked within the TTL are dropped from the log, and
+        only the query_log_entries most asked are kept.
+
+        Returns:
+            Number of answers removed
+        """
+        with self._lock:
+            self._flush_usage()
+            removed = 0
+            if self.ttl_seconds is not None:
+                cutoff = time.time() - self.ttl_seconds
+                removed = self._conn.execute(
+                    "DELETE FROM answers WHERE created_at < ?", (cutoff,)
+                ).rowcount
+                self._conn.execute("DELETE FROM query_log WHERE last_asked_at < ?", (cutoff,))
+                for key in [key for key, (_, created_at) in self._memory.items() if created_at < cutoff]:
+                    del self._memory[key]
+                self.stats["evictions"] += removed
+            self._conn.execute(
+                "DELETE FROM query_log WHERE rowid NOT IN "
+                "(SELECT rowid FROM query_log ORDER BY asked DESC, last_asked_at DESC LIMIT ?)",
+                (self.query_log_entries,)
+            )
+            self._conn.commit()
+        return removed
+
+    def clear(self, namespace=None):
+        """Drop all answers, or only those of one namespace"""
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM answers")
+            else:
+                self._conn.execute("DELETE FROM answers WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+            self._memory.clear()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def flush(self):
+        """Write counted lookups to SQLite now"""
+        with self._lock:
+            self._flush_usage()
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_usage()
+            self._conn.commit()
+            self._conn.close()
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    @staticmethod
+    def _count(counts, key, now):
+        entry = counts.get(key)
+        if entry is None:
+            counts[key] = [1, now]
+        else:
+            entry[0] += 1
+            entry[1] = now
+
+    def _flush_usage(self):
+        """Write counted lookups and hits in one batch (caller holds the lock and commits)"""
+        if self._asked:
+            self._conn.executemany(
+                "INSERT INTO query_log (namespace, question, asked, last_asked_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (namespace, question) DO UPDATE "
+                "SET asked = asked + excluded.asked, last_asked_at = excluded.last_asked_at",
+                [(namespace, question, asked, at) for (namespace, question), (asked, at) in self._asked.items()]
+            )
+        if self._used:
+            self._conn.executemany(
+                "UPDATE answers SET hits = hits + ?, last_used_at = max(last_used_at, ?) WHERE key = ?",
+                [(hits, at, key) for key, (hits, at) in self._used.items()]
+            )
+        self._asked = {}
+        self._used = {}
+        self._unflushed = 0
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, key):
+        self._memory.pop(key, None)
+        self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+        self.stats["evictions"] += 1
+
+    def _evict_over_capacity(self):
+        excess = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        keys = [row[0] for row in self._conn.execute(
+            "SELECT key FROM answers ORDER BY last_used_at ASC LIMIT ?", (excess,)
+        )]
+        self._conn.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key in keys])
+        for key in keys:
+            self._memory.pop(key, None)
+        self.stats["evictions"] += len(keys)
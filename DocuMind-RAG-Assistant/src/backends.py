@@ -0,0 +1,83 @@
+"""
+Backend selection for RAG Assistant
+Builds the chat model and embedder named in the config
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+from .config import (
+    LLM_BACKEND, LLM_BASE_URL, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS,
+    EMBEDDING_BACKEND, EMBEDDING_MODEL
+)
+from .governor import GovernedLLM, RequestGovernor
+
+# Offline models have no quota; keep the governor's retries but not its limits
+UNLIMITED_RATE_PER_MINUTE = 1e9
+
+
+def create_llm(backend=None, base_url=None):
+    """
+    Create the governed chat model for a backend
+
+    Args:
+        backend: "groq" (Groq API, or any compatible server at base_url)
+            or "echo" (offline, answers from the prompt's context);
+            defaults to LLM_BACKEND
+        base_url: API base URL for "groq" (defaults to LLM_BASE_URL)
+
+    Returns:
+        GovernedLLM
+    """
+    backend = backend or LLM_BACKEND
+    if backend == "echo":
+        from .offline import EchoLLM
+        return GovernedLLM(EchoLLM(), governor=RequestGovernor(
+            requests_per_minute=UNLIMITED_RATE_PER_MINUTE,
+            tokens_per_minute=UNLIMITED_RATE_PER_MINUTE
+        ))
+
+    if backend != "groq":
+        raise ValueError(f"Unknown LLM backend: {backend!r}")
+
+    from langchain_groq import ChatGroq
+
+    load_dotenv()
+    base_url = base_url or LLM_BASE_URL
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        if not base_url:
+            raise ValueError("❌ GROQ_API_KEY not found in .env file")
+        api_key = "offline"  # Local stand-in servers do not check keys
+
+    # Retries are handled by the governor
+    llm = ChatGroq(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        max_tokens=LLM_MAX_TOKENS,
+        max_retries=0,
+        api_key=api_key,
+        base_url=base_url
+    )
+    return GovernedLLM(llm)
+
+
+def create_embeddings(backend=None):
+    """
+    Create the embedder for a backend
+
+    Args:
+        backend: "huggingface" (EMBEDDING_MODEL) or "hashing" (offline,
+            deterministic); defaults to EMBEDDING_BACKEND
+    """
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "hashing":
+        from .offline import HashingEmbeddings
+        return HashingEmbeddings()
+
+    if backend != "huggingface":
+        raise ValueError(f"Unknown embedding backend: {backend!r}")
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
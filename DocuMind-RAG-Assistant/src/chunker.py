@@ -0,0 +1,205 @@
+"""
+High-throughput text chunker for RAG Assistant
+Drop-in replacement for RecursiveCharacterTextSplitter.split_text
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+from .config import CHUNK_SIZE, CHUNK_OVERLAP
+
+# Same defaults as LangChain's RecursiveCharacterTextSplitter
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+class TextChunker:
+    """
+    Recursive character chunker that works on offsets instead of substrings
+
+    Produces exactly the chunks RecursiveCharacterTextSplitter produces with
+    its default settings (keep_separator=True, strip_whitespace=True,
+    len() as the length function), but:
+    - separator positions are located once per document with a single scan
+    - splitting and merging work on (start, end) spans of the original text
+    - only the final chunks are materialised as strings
+    - chunks are yielded lazily, so callers can stream them
+
+    A chunker holds no per-document state, so one instance can be reused
+    for every file.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=None):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators) if separators is not None else list(DEFAULT_SEPARATORS)
+        self._patterns = [re.compile(re.escape(sep)) if sep else None for sep in self.separators]
+
+    def split_text(self, text):
+        """
+        Split text into chunks
+
+        Args:
+            text: str, or a bytes-like/memoryview object holding UTF-8 text
+
+        Returns:
+            List of chunk strings
+        """
+        return list(self.iter_chunks(text))
+
+    def iter_chunks(self, text):
+        """
+        Lazily yield chunks of text in document order
+
+        Bytes-like input (e.g. a memoryview over an mmap'd file) is decoded
+        once up front; chunk boundaries are character offsets, matching the
+        len()-based semantics of CHUNK_SIZE.
+
+        Args:
+            text: str, or a bytes-like/memoryview object holding UTF-8 text
+
+        Yields:
+            Chunk strings
+        """
+        text = _as_text(text)
+        for start, end, strip in self.iter_spans(text):
+            chunk = self._text_for_span(text, start, end, strip)
+            if chunk:
+                yield chunk
+
+    def iter_spans(self, text):
+        """
+        Lazily yield chunk boundaries as (start, end, strip) tuples
+
+        strip is False only for oversized pieces that no separator could
+        break up, which LangChain emits verbatim.
+        """
+        text = _as_text(text)
+        if not text:
+            return
+        offsets = _SeparatorIndex(text, self.separators, self._patterns)
+        yield from self._split(text, offsets, 0, len(text), 0)
+
+    def _text_for_span(self, text, start, end, strip):
+        if not strip:
+            return text[start:end]
+        # Trim whitespace by moving the span bounds before slicing
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return text[start:end]
+
+    def _split(self, text, offsets, start, end, level):
+        """Span-based equivalent of RecursiveCharacterTextSplitter._split_text"""
+        separators = self.separators
+
+        # Pick the first separator present in this span
+        sep_level = len(separators) - 1
+        next_level = None
+        for i in range(level, len(separators)):
+            if not separators[i]:
+                sep_level = i
+                break
+            if offsets.contains(i, start, end):
+                sep_level = i
+                next_level = i + 1 if i + 1 < len(separators) else None
+                break
+
+        good = []
+        for piece_start, piece_end in offsets.pieces(sep_level, start, end):
+            if piece_end - piece_start < self.chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+
+            if good:
+                yield from self._merge(good)
+                good = []
+            if next_level is None:
+                yield (piece_start, piece_end, False)
+            else:
+                yield from self._split(text, offsets, piece_start, piece_end, next_level)
+
+        if good:
+            yield from self._merge(good)
+
+    def _merge(self, pieces):
+        """
+        Span-based equivalent of TextSplitter._merge_splits
+
+        With keep_separator=True the join separator is empty, so adjacent
+        pieces are contiguous and a merged chunk is a single span.
+        """
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        first = 0  # index of the first piece in the current window
+        total = 0
+        for i, (piece_start, piece_end) in enumerate(pieces):
+            length = piece_end - piece_start
+            if total + length > chunk_size and first < i:
+                yield (pieces[first][0], pieces[i - 1][1], True)
+                while total > chunk_overlap or (total + length > chunk_size and total > 0):
+                    total -= pieces[first][1] - pieces[first][0]
+                    first += 1
+            total += length
+
+        if first < len(pieces):
+            yield (pieces[first][0], pieces[-1][1], True)
+
+
+class _SeparatorIndex:
+    """Sorted match offsets of each separator, computed on first use"""
+
+    def __init__(self, text, separators, patterns):
+        self.text = text
+        self.separators = separators
+        self.patterns = patterns
+        self._offsets = {}
+
+    def _all(self, level):
+        if level not in self._offsets:
+            pattern = self.patterns[level]
+            self._offsets[level] = [m.start() for m in pattern.finditer(self.text)]
+        return self._offsets[level]
+
+    def _matches(self, level, start, end):
+        """Start offsets of non-overlapping separator matches inside [start, end)"""
+        width = len(self.separators[level])
+        if width == 1 or (start == 0 and end == len(self.text)):
+            # Precomputed offsets are exact for single characters and for
+            # the whole document
+            offsets = self._all(level)
+            return offsets[bisect_left(offsets, start):bisect_right(offsets, end - width)]
+        # Multi-character separators inside a sub-span can align
+        # differently, so rescan that span (still without slicing)
+        return [m.start() for m in self.patterns[level].finditer(self.text, start, end)]
+
+    def contains(self, level, start, end):
+        width = len(self.separators[level])
+        if width == 1:
+            offsets = self._all(level)
+            i = bisect_left(offsets, start)
+            return i < len(offsets) and offsets[i] < end
+        return self.patterns[level].search(self.text, start, end) is not None
+
+    def pieces(self, level, start, end):
+        """Split [start, end) before each separator match, dropping empty pieces"""
+        if not self.separators[level]:
+            return [(i, i + 1) for i in range(start, end)]
+
+        bounds = self._matches(level, start, end)
+        if not bounds or bounds[0] != start:
+            bounds.insert(0, start)
+        bounds.append(end)
+        return list(zip(bounds, bounds[1:]))
+
+
+def _as_text(text):
+    if isinstance(text, str):
+        return text
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        return str(text, 'utf-8')
+    raise TypeError(f"Expected str or bytes-like object, got {type(text).__name__}")
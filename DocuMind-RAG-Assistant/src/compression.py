@@ -0,0 +1,86 @@
+"""
+Extractive context compression for RAG Assistant
+Keeps only the query-relevant sentences of retrieved chunks before prompting the LLM
+"""
+
+from langchain_core.documents import Document
+
+from .config import (
+    COMPRESSION_RELEVANCE_CUTOFF, COMPRESSION_NEIGHBOURS, COMPRESSION_MIN_SENTENCES
+)
+from .extractive import score_sentences
+
+
+def compress_documents(query_vector, documents, embeddings,
+                       cutoff=COMPRESSION_RELEVANCE_CUTOFF,
+                       neighbours=COMPRESSION_NEIGHBOURS,
+                       min_sentences=COMPRESSION_MIN_SENTENCES,
+                       scored=None, cache=None):
+    """
+    Reduce retrieved chunks to their query-relevant sentences
+
+    Sentences from all chunks are embedded in one batch. A sentence is
+    kept if its similarity to the query reaches the cutoff, or if it is
+    among the min_sentences best overall; the neighbours on either side
+    of each kept sentence are kept too so the text stays readable.
+
+    Args:
+        query_vector: Query embedding
+        documents: Retrieved LangChain documents
+        embeddings: Embedding model used for the index
+        cutoff: Minimum cosine similarity for a sentence to be kept
+        neighbours: Sentences kept on each side of a relevant sentence
+        min_sentences: Best sentences kept regardless of the cutoff
+        scored: Optional precomputed result of score_sentences
+        cache: Optional sentence vector cache shared across calls
+
+    Returns:
+        Dict with:
+        - documents: compressed Documents (original metadata and id kept),
+          only for chunks that still contribute text
+        - sources: the original Documents those came from
+        - scored: the (sentences, scores) pair, for reuse
+        - original_chars / compressed_chars / ratio
+    """
+    sentences, scores = scored if scored is not None else score_sentences(
+        query_vector, documents, embeddings, cache
+    )
+    original_chars = sum(len(doc.page_content) for doc in documents)
+
+    keep = {i for i, score in enumerate(scores) if score >= cutoff}
+    keep.update(int(i) for i in scores.argsort()[::-1][:min_sentences])
+
+    # Positions of each chunk's sentences, to expand within chunk bounds
+    by_document = {}
+    for i, (doc_index, _, _) in enumerate(sentences):
+        by_document.setdefault(doc_index, []).append(i)
+
+    compressed = []
+    sources = []
+    for doc_index, positions in sorted(by_document.items()):
+        selected = set()
+        for offset, i in enumerate(positions):
+            if i in keep:
+                lo = max(0, offset - neighbours)
+                selected.update(positions[lo:offset + neighbours + 1])
+        if not selected:
+            continue
+
+        original = documents[doc_index]
+        text = " ".join(sentences[i][2] for i in sorted(selected))
+        compressed.append(Document(
+            page_content=text,
+            metadata=dict(original.metadata),
+            id=getattr(original, "id", None)
+        ))
+        sources.append(original)
+
+    compressed_chars = sum(len(doc.page_content) for doc in compressed)
+    return {
+        "documents": compressed,
+        "sources": sources,
+        "scored": (sentences, scores),
+        "original_chars": original_chars,
+        "compressed_chars": compressed_chars,
+        "ratio": compressed_chars / original_chars if original_chars else 1.0,
+    }
@@ -2,13 +2,34 @@
 Configuration settings for RAG Assistant
 """
 
+import os
+
+# Backends: "groq" / "huggingface" in production, "echo" / "hashing" run fully offline
+LLM_BACKEND = os.getenv("DOCUMIND_LLM_BACKEND", "groq")
+LLM_BASE_URL = os.getenv("DOCUMIND_LLM_BASE_URL") or None
+EMBEDDING_BACKEND = os.getenv("DOCUMIND_EMBEDDING_BACKEND", "huggingface")
+HASHING_EMBEDDING_DIM = 384
+
 # LLM Configuration
 LLM_MODEL = "llama-3.3-70b-versatile"
 LLM_TEMPERATURE = 0.3
 LLM_MAX_TOKENS = 2048
 
+# LLM Request Governor (Groq free-tier limits for the default model)
+LLM_REQUESTS_PER_MINUTE = 30
+LLM_TOKENS_PER_MINUTE = 12000
+LLM_MAX_CONCURRENCY = 4
+LLM_MAX_RETRIES = 4
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 20.0
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+LLM_CIRCUIT_RECOVERY_SECONDS = 30.0
+
 # Embedding Configuration
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_DTYPE = "float32"   # "float16" halves in-memory vectors (sentence caches, tuning)
+VECTOR_ALIGNMENT = 64         # bytes; one cache line / AVX-512 register
 
 # Document Processing
 CHUNK_SIZE = 500
@@ -18,13 +39,71 @@ CHUNK_OVERLAP = 50
 NUM_RETRIEVED_DOCS = 3
 SIMILARITY_THRESHOLD = 0.0
 
+# Multi-Query Retrieval
+MULTI_QUERY_ENABLED = False
+MULTI_QUERY_USE_LLM = False
+MULTI_QUERY_VARIANTS = 3
+MULTI_QUERY_MAX_WORKERS = 4
+RRF_K = 60
+
+# Follow-up Retrieval (interactive chat)
+FOLLOWUP_SIMILARITY_THRESHOLD = 0.45
+FOLLOWUP_DELTA_K = 2
+
+# Context Compression
+CONTEXT_COMPRESSION_ENABLED = True
+COMPRESSION_RELEVANCE_CUTOFF = 0.3
+COMPRESSION_NEIGHBOURS = 1
+COMPRESSION_MIN_SENTENCES = 2
+
+# Latency SLO
+QUERY_TIME_BUDGET_SECONDS = 3.0
+FALLBACK_RESERVE_SECONDS = 0.3
+EXTRACTIVE_MAX_SENTENCES = 3
+
 # Vector Store
 VECTOR_DB_PATH = "./chroma_data"
 COLLECTION_NAME = "rag_documents"
 
+# HNSW Index (Chroma defaults; space, M and ef_construction are fixed when a
+# collection is created, ef_search can change at any time)
+HNSW_SPACE = "l2"
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 100
+
 # Paths
 DOCUMENTS_DIR = "./data/sample_documents"
 
+# Multi-Tenancy
+TENANT_DOCUMENTS_ROOT = "./data/tenants"
+TENANT_MAX_OPEN = 32
+TENANT_MEMORY_BUDGET_MB = 512
+
+# Watch Mode
+WATCH_DEBOUNCE_SECONDS = 2.0
+WATCH_MAX_DELAY_SECONDS = 30.0
+WATCH_POLL_INTERVAL = 1.0
+
+# Deletes & Compaction
+COMPACTION_TOMBSTONE_RATIO = 0.2
+COMPACTION_MIN_TOMBSTONES = 100
+COMPACTION_BATCH_SIZE = 1000
+TOMBSTONE_OVERFETCH_FACTOR = 4
+
+# Index Snapshots
+SNAPSHOT_DIR = "./snapshots/latest"
+
+# Answer Cache
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_PATH = "./cache/answers.db"
+ANSWER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANSWER_CACHE_MAX_ENTRIES = 10000
+ANSWER_CACHE_MEMORY_ENTRIES = 256
+ANSWER_CACHE_WARM_QUERIES = 100
+ANSWER_CACHE_LOG_FLUSH_EVERY = 64       # Lookups counted in memory before one batched write
+ANSWER_CACHE_QUERY_LOG_ENTRIES = 10000  # Most asked questions kept for warm-up
+
 # System Prompt
 SYSTEM_PROMPT = """You are a helpful AI assistant. 
 Answer questions based ONLY on the provided document context.
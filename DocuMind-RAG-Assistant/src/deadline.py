@@ -0,0 +1,57 @@
+"""
+Request deadlines for RAG Assistant
+A time budget that is carried through retrieval and generation
+"""
+
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an operation cannot finish within its deadline"""
+
+
+class Deadline:
+    """
+    Absolute point in time by which a request must be answered
+
+    Created from a budget in seconds; each stage asks how much time is
+    left instead of using its own fixed timeout. A budget of None means
+    no deadline.
+    """
+
+    def __init__(self, budget_seconds=None):
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = None if budget_seconds is None else self.started_at + budget_seconds
+
+    def remaining(self):
+        """Seconds left (infinite if there is no deadline, never negative)"""
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self):
+        """Seconds since the deadline was created"""
+        return time.monotonic() - self.started_at
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def reserve(self, seconds):
+        """
+        A deadline that expires seconds earlier than this one
+
+        Used to keep time back for work that must happen afterwards,
+        e.g. computing a fallback answer.
+        """
+        child = Deadline()
+        child.started_at = self.started_at
+        if self.expires_at is not None:
+            child.expires_at = self.expires_at - seconds
+            child.budget_seconds = child.expires_at - child.started_at
+        return child
+
+    def check(self, stage):
+        """Raise DeadlineExceeded if no time is left for stage"""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
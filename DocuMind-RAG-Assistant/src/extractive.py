@@ -0,0 +1,160 @@
+"""
+Local extractive answers for RAG Assistant
+Sentence scoring against the query embedding, used when the LLM is unavailable
+"""
+
+import re
+
+import numpy as np
+
+from .config import EXTRACTIVE_MAX_SENTENCES
+from .vectors import embed_matrix, cosine_similarity
+
+# Sentence ends, blank lines and line breaks before list items / headings
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n+|\n(?=\s*(?:[-*#>]|\d+[.)])\s)")
+
+# Fragments shorter than this (headings, bullets) carry little information
+MIN_SENTENCE_CHARS = 20
+
+
+def split_sentences(text):
+    """
+    Split text into sentences
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        List of stripped, non-trivial sentences in document order
+    """
+    sentences = []
+    for part in SENTENCE_BOUNDARY.split(text or ""):
+        part = " ".join(part.split())
+        if part.startswith("#"):
+            continue  # Markdown headings are labels, not answers
+        part = part.lstrip("-*> ")
+        if len(part) >= MIN_SENTENCE_CHARS:
+            sentences.append(part)
+    return sentences
+
+
+def cosine_scores(query_vector, vectors):
+    """
+    Cosine similarity of each row of vectors to query_vector
+
+    Args:
+        query_vector: 1-D query embedding
+        vectors: 2-D array (float32 or float16) or list of lists of
+            sentence embeddings
+
+    Returns:
+        1-D numpy array of scores
+    """
+    matrix = vectors if isinstance(vectors, np.ndarray) else np.asarray(vectors, dtype=np.float32)
+    if matrix.size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return cosine_similarity(matrix, query_vector)
+
+
+def sentence_vectors(documents, embeddings, cache=None):
+    """
+    Split documents into sentences and embed them, reusing cached vectors
+
+    Sentences of all uncached documents are embedded in a single batch.
+
+    Args:
+        documents: LangChain documents
+        embeddings: Embedding model used for the index
+        cache: Optional dict of document id -> (sentences, vectors); hits
+            are reused and new entries added
+
+    Returns:
+        List with one (sentences, vectors) pair per document, vectors
+        being a 2-D numpy array
+    """
+    results = [None] * len(documents)
+    pending = []
+    for i, doc in enumerate(documents):
+        doc_id = getattr(doc, "id", None)
+        if cache is not None and doc_id and doc_id in cache:
+            results[i] = cache[doc_id]
+        else:
+            pending.append((i, split_sentences(doc.page_content)))
+
+    texts = [sentence for _, sentences in pending for sentence in sentences]
+    vectors = embed_matrix(embeddings, texts) if texts else None
+    offset = 0
+    for i, sentences in pending:
+        if sentences:
+            entry = (sentences, vectors[offset:offset + len(sentences)])
+        else:
+            entry = (sentences, np.zeros((0, 0), dtype=np.float32))
+        offset += len(sentences)
+        results[i] = entry
+        doc_id = getattr(documents[i], "id", None)
+        if cache is not None and doc_id:
+            cache[doc_id] = entry
+    return results
+
+
+def score_sentences(query_vector, documents, embeddings, cache=None):
+    """
+    Split retrieved chunks into sentences and score them against the query
+
+    All sentences are embedded in a single batch.
+
+    Args:
+        query_vector: Query embedding
+        documents: Retrieved LangChain documents
+        embeddings: Embedding model used for the index
+        cache: Optional sentence vector cache (see sentence_vectors)
+
+    Returns:
+        List of (document_index, sentence_index, sentence) tuples and a
+        numpy array with one score per sentence
+    """
+    sentences = []
+    matrices = []
+    for doc_index, (doc_sentences, vectors) in enumerate(sentence_vectors(documents, embeddings, cache)):
+        sentences.extend(
+            (doc_index, sentence_index, sentence) for sentence_index, sentence in enumerate(doc_sentences)
+        )
+        if doc_sentences:
+            matrices.append(vectors)
+    if not sentences:
+        return [], np.zeros(0, dtype=np.float32)
+
+    return sentences, cosine_scores(query_vector, np.concatenate(matrices))
+
+
+def extractive_answer(query_vector, documents, embeddings, max_sentences=EXTRACTIVE_MAX_SENTENCES,
+                      scored=None):
+    """
+    Build an answer from the retrieved sentences most similar to the query
+
+    The best sentences are returned in their original reading order, each
+    attributed to its source document.
+
+    Args:
+        query_vector: Query embedding
+        documents: Retrieved LangChain documents
+        embeddings: Embedding model used for the index
+        max_sentences: Number of sentences to include
+        scored: Optional precomputed result of score_sentences for documents
+
+    Returns:
+        Answer text (empty if the documents contain no usable sentences)
+    """
+    sentences, scores = scored if scored is not None else score_sentences(
+        query_vector, documents, embeddings
+    )
+    if not sentences:
+        return ""
+
+    best = sorted(np.argsort(-scores)[:max_sentences])
+    lines = []
+    for i in best:
+        doc_index, _, sentence = sentences[i]
+        source = documents[doc_index].metadata.get("source", "Unknown")
+        lines.append(f"- {sentence} [{source}]")
+    return "\n".join(lines)
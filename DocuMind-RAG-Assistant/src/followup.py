@@ -0,0 +1,126 @@
+"""
+Follow-up-aware retrieval for RAG Assistant
+Reuses the previous turn's chunks when a question continues the conversation
+"""
+
+import numpy as np
+
+from .config import FOLLOWUP_SIMILARITY_THRESHOLD, FOLLOWUP_DELTA_K
+from .extractive import sentence_vectors, cosine_scores
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SessionRetrievalCache:
+    """
+    Retrieval state carried from one chat turn to the next
+
+    A question is treated as a follow-up when its embedding is close to
+    the previous turn, represented by the previous question and the
+    centroid of the chunks retrieved for it. Follow-ups keep those chunks
+    and add the results of a small delta search; the union is re-ranked
+    by best sentence similarity. Sentence embeddings of chunks are kept
+    between turns, so reused chunks are not embedded again for context
+    compression.
+    """
+
+    def __init__(self, threshold=FOLLOWUP_SIMILARITY_THRESHOLD, delta_k=FOLLOWUP_DELTA_K):
+        """
+        Args:
+            threshold: Minimum cosine similarity to the previous turn
+            delta_k: Chunks fetched from the index for a follow-up
+        """
+        self.threshold = threshold
+        self.delta_k = delta_k
+        self.sentence_cache = {}   # chunk id -> (sentences, vectors)
+        self.previous = None
+        self.stats = {
+            "turns": 0,
+            "reused": 0,
+            "full_seconds": 0.0,
+            "reuse_seconds": 0.0,
+        }
+
+    def reset(self):
+        """Forget the previous turn (e.g. when the topic changes)"""
+        self.previous = None
+        self.sentence_cache = {}
+
+    def is_follow_up(self, query_vector, index_version):
+        """Whether the question continues the previous turn"""
+        previous = self.previous
+        if previous is None or previous["index_version"] != index_version:
+            return False
+        query = _unit(query_vector)
+        return max(float(query @ anchor) for anchor in previous["anchors"]) >= self.threshold
+
+    def merge(self, query_vector, delta_documents, k, embeddings):
+        """
+        Previous chunks plus delta search results, best first
+
+        Args:
+            query_vector: Embedding of the follow-up question
+            delta_documents: Results of the small delta search
+            k: Number of chunks to return
+            embeddings: Embedding model (for sentences of new chunks)
+        """
+        candidates = {}
+        for doc in list(self.previous["documents"]) + list(delta_documents):
+            candidates.setdefault(doc.id, doc)
+        documents = list(candidates.values())
+
+        scores = []
+        for doc_sentences, vectors in sentence_vectors(documents, embeddings, self.sentence_cache):
+            scores.append(float(cosine_scores(query_vector, vectors).max()) if doc_sentences else -1.0)
+        order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return [documents[i] for i in order[:k]]
+
+    def remember(self, query_vector, documents, index_version):
+        """Keep this turn's question and chunks for the next one"""
+        anchors = [_unit(query_vector)]
+        chunk_vectors = []
+        for doc in documents:
+            doc_sentences, vectors = self.sentence_cache.get(doc.id, ((), None))
+            if doc_sentences:
+                chunk_vectors.append(vectors.mean(axis=0))
+        if chunk_vectors:
+            anchors.append(_unit(np.mean(chunk_vectors, axis=0)))
+
+        self.previous = {
+            "documents": list(documents),
+            "anchors": anchors,
+            "index_version": index_version,
+        }
+        # Only the chunks that can still be reused are worth keeping
+        keep = {doc.id for doc in documents}
+        self.sentence_cache = {key: value for key, value in self.sentence_cache.items() if key in keep}
+
+    def record(self, reused, seconds):
+        """Count a turn and the time spent preparing its context"""
+        self.stats["turns"] += 1
+        if reused:
+            self.stats["reused"] += 1
+            self.stats["reuse_seconds"] += seconds
+        else:
+            self.stats["full_seconds"] += seconds
+
+    def summary(self):
+        """Reuse rate and estimated context-preparation time saved"""
+        turns = self.stats["turns"]
+        reused = self.stats["reused"]
+        full = turns - reused
+        avg_full = self.stats["full_seconds"] / full if full else None
+        avg_reuse = self.stats["reuse_seconds"] / reused if reused else None
+        saved = (avg_full - avg_reuse) * reused if avg_full is not None and avg_reuse is not None else 0.0
+        return {
+            "turns": turns,
+            "reused": reused,
+            "reuse_rate": reused / turns if turns else 0.0,
+            "avg_full_ms": avg_full * 1000 if avg_full is not None else None,
+            "avg_reuse_ms": avg_reuse * 1000 if avg_reuse is not None else None,
+            "saved_ms": saved * 1000,
+        }
@@ -0,0 +1,435 @@
+"""
+Client-side request governor for LLM calls
+Token-bucket rate limiting, retries with backoff, circuit breaking and concurrency control
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from email.utils import parsedate_to_datetime
+
+from .config import (
+    LLM_MAX_TOKENS, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS, LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RECOVERY_SECONDS
+)
+from .deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate used before the real usage is known
+CHARS_PER_TOKEN = 4
+
+
+class GovernorError(Exception):
+    """Base class for errors raised by the request governor"""
+
+
+class CircuitOpenError(GovernorError):
+    """Raised when the circuit breaker is rejecting calls"""
+
+
+class RetriesExhaustedError(GovernorError):
+    """Raised when a transient failure persists through every retry"""
+
+    def __init__(self, message, last_error):
+        super().__init__(message)
+        self.last_error = last_error
+        self.status_code = status_code_of(last_error)
+        self.timed_out = is_timeout(last_error)
+
+
+def status_code_of(error):
+    """HTTP status code carried by an API exception, if any"""
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_timeout(error):
+    """Whether an exception represents a request timeout"""
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+def is_transient(error):
+    """Whether an exception is worth retrying (429, 5xx, timeouts, connection drops)"""
+    code = status_code_of(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    return (
+        is_timeout(error)
+        or isinstance(error, ConnectionError)
+        or "Connection" in type(error).__name__
+    )
+
+
+def retry_after_seconds(error):
+    """Parse a Retry-After header (seconds or HTTP date) from an API exception"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at rate_per_minute up to capacity. A
+    caller reserves tokens up front and sleeps until they are available,
+    so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_minute = float(rate_per_minute)
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        rate = self.rate_per_minute / 60.0
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """
+        Take amount tokens, possibly going into debt
+
+        Returns:
+            Seconds the caller must wait before proceeding
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / (self.rate_per_minute / 60.0)
+
+    def refund(self, amount):
+        """Return unused tokens (e.g. when actual usage was below the estimate)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def set_rate(self, rate_per_minute):
+        """Change the refill rate, keeping tokens accrued so far"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate_per_minute = float(rate_per_minute)
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls fail fast. Once recovery_seconds have passed a single probe
+    call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=LLM_CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_seconds=LLM_CIRCUIT_RECOVERY_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.opened_count = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not proceed"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_seconds:
+                    raise CircuitOpenError("LLM circuit breaker is open")
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError("LLM circuit breaker is probing for recovery")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_count += 1
+                    logger.warning("LLM circuit breaker opened")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Give up a half-open probe slot without recording an outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class RequestGovernor:
+    """
+    Governs every call to a rate-limited API
+
+    - requests/min and tokens/min token buckets
+    - adaptive request rate: halved on 429, recovered gradually on success
+    - bounded concurrency
+    - retries of transient failures with jittered exponential backoff,
+      honouring Retry-After
+    - circuit breaker that fails fast during sustained outages
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE_SECONDS, backoff_max=LLM_BACKOFF_MAX_SECONDS,
+                 breaker=None):
+        self.requests_per_minute = requests_per_minute
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Calls with a deadline run here so the caller can stop waiting;
+        # an abandoned call keeps its concurrency slot until it finishes
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="llm-call")
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "deadline_exceeded": 0,
+            "circuit_rejections": 0,
+            "throttle_wait_seconds": 0.0,
+            "backoff_wait_seconds": 0.0,
+            "latency_seconds": 0.0,
+            "tokens_used": 0,
+            "in_flight": 0,
+        }
+
+    def metrics(self):
+        """Snapshot of governor counters"""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        snapshot["circuit_state"] = self.breaker.state
+        snapshot["circuit_opens"] = self.breaker.opened_count
+        snapshot["current_requests_per_minute"] = self.request_bucket.rate_per_minute
+        return snapshot
+
+    def _count(self, key, amount=1):
+        with self._metrics_lock:
+            self._metrics[key] += amount
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _adapt_rate(self, rate_limited):
+        """AIMD on the request rate: halve on 429, add back 1 rpm per success"""
+        current = self.request_bucket.rate_per_minute
+        if rate_limited:
+            new_rate = max(1.0, current / 2)
+        else:
+            new_rate = min(float(self.requests_per_minute), current + 1.0)
+        if new_rate != current:
+            self.request_bucket.set_rate(new_rate)
+
+    def _attempt(self, func):
+        """Run one attempt inside a concurrency slot; returns (result, error)"""
+        with self._slots:
+            self._count("in_flight")
+            self._count("attempts")
+            started = time.monotonic()
+            try:
+                return func(), None
+            except Exception as error:
+                return None, error
+            finally:
+                self._count("in_flight", -1)
+                self._count("latency_seconds", time.monotonic() - started)
+
+    def _give_up(self, message, cause=None):
+        self._count("deadline_exceeded")
+        self.breaker.release_probe()
+        raise DeadlineExceeded(message) from cause
+
+    def call(self, func, estimated_tokens=0, usage_of=None, deadline=None):
+        """
+        Run func under rate limits, retries and the circuit breaker
+
+        Args:
+            func: Zero-argument callable performing the request
+            estimated_tokens: Tokens to reserve from the tokens/min bucket
+            usage_of: Optional callable mapping func's result to tokens
+                actually used, so over-reservations can be refunded
+            deadline: Optional Deadline; throttling, backoff and the call
+                itself never wait past it
+
+        Returns:
+            func's return value
+
+        Raises:
+            CircuitOpenError: The circuit is open
+            RetriesExhaustedError: A transient failure outlasted all retries
+            DeadlineExceeded: The call could not complete before the deadline
+            Exception: Non-transient errors from func are re-raised as-is
+        """
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count("circuit_rejections")
+                raise
+
+            wait = max(
+                self.request_bucket.reserve(1),
+                self.token_bucket.reserve(estimated_tokens) if estimated_tokens else 0.0
+            )
+            if deadline is not None and wait >= deadline.remaining():
+                # Don't hold quota we are not going to use
+                self.request_bucket.refund(1)
+                if estimated_tokens:
+                    self.token_bucket.refund(estimated_tokens)
+                self._give_up(f"Rate limit wait of {wait:.1f}s exceeds the deadline")
+            if wait > 0:
+                self._count("throttle_wait_seconds", wait)
+                time.sleep(wait)
+
+            if deadline is None:
+                result, error = self._attempt(func)
+            else:
+                future = self._pool.submit(self._attempt, func)
+                try:
+                    result, error = future.result(timeout=deadline.remaining())
+                except FutureTimeoutError:
+                    self._give_up("LLM call did not finish before the deadline")
+
+            if error is None:
+                self.breaker.record_success()
+                self._adapt_rate(rate_limited=False)
+                self._count("successes")
+                if usage_of is not None and estimated_tokens:
+                    used = usage_of(result)
+                    if used is not None:
+                        self._count("tokens_used", used)
+                        if used < estimated_tokens:
+                            self.token_bucket.refund(estimated_tokens - used)
+                return result
+
+            # A failed request used no tokens; without the refund every
+            # retry of a throttled call would drain the bucket again
+            if estimated_tokens:
+                self.token_bucket.refund(estimated_tokens)
+
+            if not is_transient(error):
+                # Client errors say nothing about service health
+                self.breaker.release_probe()
+                self._count("failures")
+                raise error
+
+            self.breaker.record_failure()
+            rate_limited = status_code_of(error) == 429
+            if rate_limited:
+                self._count("rate_limited")
+                self._adapt_rate(rate_limited=True)
+
+            if attempt >= self.max_retries:
+                self._count("failures")
+                raise RetriesExhaustedError(
+                    f"LLM call failed after {attempt + 1} attempts: {error}", error
+                ) from error
+
+            delay = self._backoff(attempt, error)
+            if deadline is not None and delay >= deadline.remaining():
+                self._count("failures")
+                self._give_up(f"Retry backoff of {delay:.1f}s exceeds the deadline", error)
+            logger.warning(f"Transient LLM error ({error}); retrying in {delay:.1f}s")
+            self._count("retries")
+            self._count("backoff_wait_seconds", delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+def estimate_prompt_tokens(messages):
+    """Approximate prompt tokens for a list of chat messages"""
+    chars = sum(len(getattr(message, "content", "") or "") for message in messages)
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def usage_tokens(response):
+    """Total tokens reported on a LangChain AIMessage, if available"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class GovernedLLM:
+    """
+    Wraps a LangChain chat model so every invoke() goes through a governor
+
+    Everything other than invoke() is delegated to the wrapped model.
+    """
+
+    def __init__(self, llm, governor=None, max_tokens=LLM_MAX_TOKENS):
+        self.llm = llm
+        self.governor = governor or RequestGovernor()
+        self.max_tokens = max_tokens
+
+    def invoke(self, messages, deadline=None, **kwargs):
+        """
+        Invoke the wrapped model under the governor
+
+        Args:
+            messages: Chat messages
+            deadline: Optional Deadline the answer must arrive by
+        """
+        return self.governor.call(
+            lambda: self.llm.invoke(messages, **kwargs),
+            estimated_tokens=estimate_prompt_tokens(messages) + self.max_tokens,
+            usage_of=usage_tokens,
+            deadline=deadline
+        )
+
+    def metrics(self):
+        """Governor counters for this model"""
+        return self.governor.metrics()
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,73 @@
+"""
+HNSW index settings for RAG Assistant
+Builds Chroma collection configurations and keeps open collections in line with config
+"""
+
+import logging
+
+from .config import HNSW_SPACE, HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH
+
+logger = logging.getLogger(__name__)
+
+SPACES = ("l2", "cosine", "ip")
+
+# Settings baked into the graph when the collection is created
+STRUCTURAL_SETTINGS = ("space", "max_neighbors", "ef_construction")
+
+
+def hnsw_configuration(space=HNSW_SPACE, m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION,
+                       ef_search=HNSW_EF_SEARCH):
+    """
+    Chroma collection configuration for the given HNSW parameters
+
+    Args:
+        space: Distance function: "l2", "cosine" or "ip"
+        m: Graph neighbours per node (Chroma's max_neighbors)
+        ef_construction: Candidate list size while building
+        ef_search: Candidate list size while querying
+
+    Returns:
+        Dict accepted as Chroma's collection configuration
+    """
+    if space not in SPACES:
+        raise ValueError(f"Unknown HNSW space {space!r}; expected one of {SPACES}")
+    if min(m, ef_construction, ef_search) < 1:
+        raise ValueError("HNSW M, ef_construction and ef_search must be positive")
+    return {"hnsw": {
+        "space": space,
+        "max_neighbors": int(m),
+        "ef_construction": int(ef_construction),
+        "ef_search": int(ef_search),
+    }}
+
+
+def sync_hnsw_settings(collection, configuration):
+    """
+    Bring an existing collection in line with the configured HNSW settings
+
+    ef_search is updated in place and takes effect when Chroma next loads
+    the index (normally on the first query). Structural settings cannot change
+    after creation; mismatches are logged and returned so the caller can
+    rebuild the collection (load_documents(force_reload=True)).
+
+    Returns:
+        Dict of setting -> (current, configured) that could not be applied
+    """
+    wanted = configuration["hnsw"]
+    current = (collection.configuration_json or {}).get("hnsw") or {}
+
+    if current.get("ef_search") != wanted["ef_search"]:
+        collection.modify(configuration={"hnsw": {"ef_search": wanted["ef_search"]}})
+
+    mismatched = {
+        name: (current.get(name), wanted[name])
+        for name in STRUCTURAL_SETTINGS
+        if current.get(name) is not None and current.get(name) != wanted[name]
+    }
+    if mismatched:
+        details = ", ".join(f"{name}={old} (config {new})" for name, (old, new) in mismatched.items())
+        logger.warning(
+            f"Collection {collection.name} was built with {details}; "
+            "rebuild with load_documents(force_reload=True) to apply the new settings"
+        )
+    return mismatched
@@ -0,0 +1,125 @@
+"""
+Multi-query retrieval for RAG Assistant
+Query variants, batched embedding, concurrent search and reciprocal-rank fusion
+"""
+
+import re
+import logging
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .config import MULTI_QUERY_VARIANTS, RRF_K
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "do", "does", "did",
+    "what", "which", "who", "whom", "whose", "when", "where", "why", "how",
+    "can", "could", "would", "should", "will", "shall", "may", "might", "must",
+    "i", "me", "my", "we", "our", "you", "your", "it", "its", "they", "them", "their",
+    "this", "that", "these", "those", "of", "in", "on", "at", "to", "for", "from",
+    "by", "with", "about", "as", "into", "and", "or", "but", "if", "then", "so",
+    "please", "tell", "explain", "describe", "give", "show", "some", "any", "there",
+}
+
+# Leading phrases that turn a topic into a question
+QUESTION_PREFIX = re.compile(
+    r"^\s*(?:please\s+)?(?:what|who|which|how|why|when|where)\s+(?:is|are|was|were|do|does|did|can|could)\s+"
+    r"|^\s*(?:please\s+)?(?:can|could)\s+you\s+(?:explain|describe|tell\s+me\s+about)\s+"
+    r"|^\s*(?:please\s+)?(?:explain|describe|tell\s+me\s+about|define)\s+",
+    re.IGNORECASE
+)
+
+WORD = re.compile(r"[\w][\w'-]*")
+
+REWRITE_PROMPT = """Rewrite the user's question in {n} different ways that could match relevant passages in a document collection.
+Use different wording and, where helpful, more specific terms.
+Return one rewrite per line with no numbering or extra text."""
+
+
+def rule_based_variants(query, max_variants=MULTI_QUERY_VARIANTS):
+    """
+    Cheap query rewrites that need no model
+
+    - the question with its interrogative prefix removed ("what is X?" -> "X")
+    - keywords only, without stopwords and punctuation
+    - the keywords in singular/plural-insensitive form
+
+    Args:
+        query: User question
+        max_variants: Maximum number of variants to return
+
+    Returns:
+        List of distinct variants, excluding the original query
+    """
+    candidates = []
+
+    topic = QUESTION_PREFIX.sub("", query).strip().rstrip("?!. ")
+    candidates.append(topic)
+
+    keywords = [w for w in WORD.findall(query.lower()) if w not in STOPWORDS]
+    candidates.append(" ".join(keywords))
+
+    stems = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in keywords]
+    candidates.append(" ".join(stems))
+
+    seen = {query.strip().lower()}
+    variants = []
+    for candidate in candidates:
+        key = candidate.lower()
+        if candidate and key not in seen:
+            seen.add(key)
+            variants.append(candidate)
+    return variants[:max_variants]
+
+
+def llm_variants(llm, query, n=MULTI_QUERY_VARIANTS, deadline=None):
+    """
+    Ask the LLM for paraphrases of the query
+
+    Failures are logged and yield no variants, so retrieval never depends
+    on the rewrite call succeeding.
+    """
+    try:
+        response = llm.invoke(
+            [SystemMessage(content=REWRITE_PROMPT.format(n=n)), HumanMessage(content=query)],
+            deadline=deadline
+        )
+    except Exception as e:
+        logger.warning(f"LLM query rewriting failed: {e}")
+        return []
+
+    lines = [line.strip().lstrip("-*0123456789.) ").strip() for line in response.content.splitlines()]
+    return [line for line in lines if line][:n]
+
+
+def document_key(doc):
+    """Stable identity of a retrieved chunk"""
+    if getattr(doc, "id", None):
+        return doc.id
+    return (doc.metadata.get("source"), doc.metadata.get("chunk_id"), doc.page_content)
+
+
+def reciprocal_rank_fusion(result_lists, k=RRF_K):
+    """
+    Merge ranked result lists with reciprocal-rank fusion
+
+    score(d) = sum over lists of 1 / (k + rank of d in that list)
+
+    Args:
+        result_lists: Lists of documents, each ordered best first
+        k: RRF damping constant
+
+    Returns:
+        List of (document, score), best first
+    """
+    scores = {}
+    documents = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            key = document_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, doc)
+
+    ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [(documents[key], scores[key]) for key in ranked]
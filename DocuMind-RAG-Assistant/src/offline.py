@@ -0,0 +1,246 @@
+"""
+Offline backends for RAG Assistant
+Deterministic embedder, stub chat models and a local Groq/OpenAI-compatible server
+"""
+
+import re
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+from .config import HASHING_EMBEDDING_DIM
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embedder using the hashing trick
+
+    Each lowercased word and word bigram is hashed to a signed bucket; the
+    vector is L2-normalized. Texts sharing vocabulary get similar vectors,
+    which is enough for retrieval tests, with no model download.
+    """
+
+    def __init__(self, dimension=HASHING_EMBEDDING_DIM):
+        self.dimension = dimension
+
+    def _embed_into(self, text, vector):
+        vector[:] = 0.0
+        words = TOKEN.findall((text or "").lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+
+    def embed_array(self, texts, out=None):
+        """Embed texts into the rows of out (allocated as float32 if None)"""
+        if out is None:
+            out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        row = np.empty(self.dimension, dtype=np.float32)
+        for i, text in enumerate(texts):
+            self._embed_into(text, row)
+            out[i] = row
+        return out
+
+    def embed_documents(self, texts):
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_array([text])[0].tolist()
+
+
+def _last_user_text(messages):
+    for message in reversed(messages):
+        if getattr(message, "type", None) == "human":
+            return message.content
+        if isinstance(message, dict) and message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+def echo_answer(prompt):
+    """
+    Deterministic answer for a RAG prompt: the first context passage
+
+    Only document text is echoed, never the question, so answers stay
+    free of user-supplied markup.
+    """
+    context = prompt.split("Document Context:", 1)[-1].split("\nQuestion:", 1)[0]
+    passages = [line.strip() for line in context.splitlines()
+                if line.strip() and not line.startswith("[Source:")]
+    if not passages:
+        return "This information is not covered in the provided documents."
+    return "Based on the documents: " + " ".join(passages[0].split())[:300]
+
+
+class EchoLLM:
+    """
+    Offline chat model that answers from the prompt's own context
+
+    Records every call in self.calls for assertions.
+    """
+
+    def __init__(self, latency_seconds=0.0):
+        self.latency_seconds = latency_seconds
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def respond(self, prompt):
+        return echo_answer(prompt)
+
+    def invoke(self, messages, **kwargs):
+        prompt = _last_user_text(messages)
+        with self._lock:
+            self.calls.append(prompt)
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        content = self.respond(prompt)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        })
+
+
+class ScriptedLLM(EchoLLM):
+    """
+    Offline chat model that replays scripted responses in order
+
+    Each item is a string to return, an exception to raise, or a callable
+    taking the prompt. Once the script is used up, it echoes the context.
+    """
+
+    def __init__(self, responses=(), latency_seconds=0.0):
+        super().__init__(latency_seconds)
+        self._responses = list(responses)
+
+    def respond(self, prompt):
+        with self._lock:
+            item = self._responses.pop(0) if self._responses else None
+        if item is None:
+            return echo_answer(prompt)
+        if isinstance(item, BaseException):
+            raise item
+        return item(prompt) if callable(item) else item
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """Request handler for StubLLMServer"""
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        status, content, headers = self.server.stub.next_reply(request)
+        if status != 200:
+            self._send(status, {"error": {"message": content, "type": "stub_error"}}, headers)
+            return
+
+        prompt = _last_user_text(request.get("messages", []))
+        self._send(200, {
+            "id": f"chatcmpl-stub-{self.server.stub.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        })
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output clean
+
+
+class StubLLMServer:
+    """
+    Local stand-in for the Groq / OpenAI chat completions API
+
+    Serves POST .../chat/completions on 127.0.0.1, answering with the
+    echo of the prompt's context. Failures can be queued to exercise
+    retry and fallback paths. Point the assistant at it with
+    create_llm("groq", base_url=server.base_url) (or set DOCUMIND_LLM_BASE_URL).
+
+        with StubLLMServer() as server:
+            server.fail_next(429, retry_after=0)
+            ...
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_seconds=0.0):
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self._failures = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _ChatCompletionsHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, status, count=1, retry_after=None, message="Simulated failure"):
+        """Answer the next count requests with an HTTP error"""
+        headers = {} if retry_after is None else {"retry-after": str(retry_after)}
+        with self._lock:
+            self._failures.extend([(status, message, headers)] * count)
+
+    def next_reply(self, request):
+        """Status, content and headers for the next request"""
+        with self._lock:
+            self.requests += 1
+            failure = self._failures.pop(0) if self._failures else None
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if failure is not None:
+            return failure
+        return 200, echo_answer(_last_user_text(request.get("messages", []))), {}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-llm", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
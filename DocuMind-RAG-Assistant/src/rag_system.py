@@ -4,24 +4,46 @@ Production-ready version with functional rigor
 """
 
 import os
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
 
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import TextLoader
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 
 from .config import (
-    LLM_MODEL, LLM_TEMPERATURE, EMBEDDING_MODEL,
     CHUNK_SIZE, CHUNK_OVERLAP, NUM_RETRIEVED_DOCS,
     VECTOR_DB_PATH, COLLECTION_NAME, SYSTEM_PROMPT,
-    DOCUMENTS_DIR
+    DOCUMENTS_DIR, SNAPSHOT_DIR, WATCH_DEBOUNCE_SECONDS,
+    QUERY_TIME_BUDGET_SECONDS, FALLBACK_RESERVE_SECONDS,
+    CONTEXT_COMPRESSION_ENABLED, MULTI_QUERY_ENABLED, MULTI_QUERY_USE_LLM,
+    MULTI_QUERY_VARIANTS, MULTI_QUERY_MAX_WORKERS, ANSWER_CACHE_ENABLED,
+    COMPACTION_TOMBSTONE_RATIO, COMPACTION_MIN_TOMBSTONES, COMPACTION_BATCH_SIZE,
+    TOMBSTONE_OVERFETCH_FACTOR
 )
-from .utils import get_documents_from_folder, format_sources, print_section
+from .utils import (
+    get_documents_from_folder, format_sources, print_section,
+    is_supported_document, make_chunk_id, ReadWriteLock
+)
+from .snapshot import export_snapshot, import_snapshot
+from .chunker import TextChunker
+from .watcher import DocumentWatcher
+from .governor import GovernedLLM, CircuitOpenError, RetriesExhaustedError
+from .deadline import Deadline, DeadlineExceeded
+from .extractive import extractive_answer
+from .compression import compress_documents
+from .multi_query import rule_based_variants, llm_variants, reciprocal_rank_fusion
+from .followup import SessionRetrievalCache
+from .answer_cache import AnswerCache, model_identity
+from .backends import create_llm, create_embeddings
+from .hnsw import hnsw_configuration, sync_hnsw_settings
+from .vectors import embed_matrix
+
+# Metadata filter matching chunks that have not been deleted
+LIVE_CHUNKS = {"tombstoned": {"$ne": 1}}
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -38,37 +60,90 @@ class RAGAssistant:
     ✅ Quality controls
     """
     
-    def __init__(self, documents_folder=DOCUMENTS_DIR):
-        """Initialize DocuMind-RAG-Assistant with error handling"""
+    def __init__(self, documents_folder=DOCUMENTS_DIR, llm=None, embeddings=None,
+                 collection_name=COLLECTION_NAME, vector_db_path=VECTOR_DB_PATH,
+                 chroma_client=None, answer_cache=None):
+        """
+        Initialize DocuMind-RAG-Assistant with error handling
+        
+        Args:
+            documents_folder: Folder with documents to index
+            llm: Existing chat model to share (created for LLM_BACKEND if None);
+                wrapped in a GovernedLLM unless it already is one
+            embeddings: Existing embedding model to share (created for
+                EMBEDDING_BACKEND if None)
+            collection_name: Chroma collection holding this assistant's chunks
+            vector_db_path: Directory of the persistent Chroma database
+            chroma_client: Existing chromadb client to share (opened if None)
+            answer_cache: AnswerCache to share (opened if None and
+                ANSWER_CACHE_ENABLED; pass False to disable caching)
+        """
         try:
-            load_dotenv()
-            
-            # Validate API key
-            api_key = os.getenv("GROQ_API_KEY")
-            if not api_key:
-                raise ValueError("❌ GROQ_API_KEY not found in .env file")
-            
-            # Initialize LLM
-            self.llm = ChatGroq(
-                model=LLM_MODEL,
-                temperature=LLM_TEMPERATURE,
-                api_key=api_key
-            )
+            if llm is None:
+                # Initialize LLM for the configured backend (validates the API key)
+                llm = create_llm()
+            
+            # Rate limits, retries and circuit breaking for every LLM call
+            if not isinstance(llm, GovernedLLM):
+                llm = GovernedLLM(llm)
+            self.llm = llm
             
             # Initialize embeddings
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=EMBEDDING_MODEL
-            )
+            if embeddings is None:
+                embeddings = create_embeddings()
+            self.embeddings = embeddings
             
             # Initialize vector store
-            self.vectorstore = Chroma(
-                collection_name=COLLECTION_NAME,
-                embedding_function=self.embeddings,
-                persist_directory=VECTOR_DB_PATH
+            self.collection_name = collection_name
+            self.vector_db_path = vector_db_path
+            self._shared_client = chroma_client is not None
+            self.hnsw_config = hnsw_configuration()
+            if chroma_client is not None:
+                self.vectorstore = Chroma(
+                    collection_name=collection_name,
+                    embedding_function=self.embeddings,
+                    client=chroma_client,
+                    collection_configuration=self.hnsw_config
+                )
+            else:
+                self.vectorstore = Chroma(
+                    collection_name=collection_name,
+                    embedding_function=self.embeddings,
+                    persist_directory=vector_db_path,
+                    collection_configuration=self.hnsw_config
+                )
+            sync_hnsw_settings(self.vectorstore._collection, self.hnsw_config)
+            
+            # One chunker is shared by every document
+            self.chunker = TextChunker(
+                chunk_size=CHUNK_SIZE,
+                chunk_overlap=CHUNK_OVERLAP
             )
             
+            # Queries read the index under a shared lock; updates swap in
+            # fully embedded documents under an exclusive one
+            self._index_lock = ReadWriteLock()
+            self.index_version = self._stored_index_version()
+            self.watcher = None
+            self._search_pool = None
+            
+            # Deleted chunk ids are hidden from results at once and removed
+            # from storage later by a background compaction
+            self._tombstones = self._load_tombstones()
+            self._compaction_lock = threading.Lock()
+            self._compaction_thread = None
+            self.compaction_stats = {"compactions": 0, "reclaimed_chunks": 0, "last_seconds": None}
+            
+            # Generated answers survive restarts, keyed by the index version
+            if answer_cache is None and ANSWER_CACHE_ENABLED:
+                answer_cache = AnswerCache()
+            self.answer_cache = answer_cache if answer_cache is not False else None
+            self.model_identity = model_identity(self.llm)
+            
             self.documents_folder = documents_folder
             self.conversation_history = []
+            self.last_query_info = {}
+            self.session = SessionRetrievalCache()
             
             logger.info("✓ DocuMind-RAG-Assistant initialized successfully")
             print("✓ DocuMind-RAG-Assistant initialized")
@@ -80,9 +155,18 @@ class RAGAssistant:
     def load_documents(self, force_reload=False):
         """Load and index documents with error handling"""
         try:
-            if force_reload and os.path.exists(VECTOR_DB_PATH):
+            if force_reload and self._shared_client:
+                # Other collections live in the same database; only clear ours
+                with self._index_lock.write():
+                    self.vectorstore.reset_collection()
+                    self._tombstones = set()
+                    self._bump_index_version()
+                logger.info("Previous collection cleared")
+                print("✓ Previous collection cleared")
+            elif force_reload and os.path.exists(self.vector_db_path):
                 import shutil
-                shutil.rmtree(VECTOR_DB_PATH)
+                shutil.rmtree(self.vector_db_path)
+                self._tombstones = set()
                 logger.info("Previous database cleared")
                 print("✓ Previous database cleared")
             
@@ -115,27 +199,15 @@ class RAGAssistant:
                     logger.info(f"Processing: {filename}")
                     print(f"  Processing: {filename}...")
                     
-                    # Split into chunks
-                    splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=CHUNK_SIZE,
-                        chunk_overlap=CHUNK_OVERLAP
-                    )
-                    chunks = splitter.split_text(content)
+                    # Chunk and embed, then swap the chunks into the index
+                    update = self._prepare_document(filename, content)
+                    chunks = update["texts"]
                     
                     if not chunks:
                         logger.warning(f"No chunks created from {filename}")
                         continue
                     
-                    # Store chunks with metadata
-                    for i, chunk in enumerate(chunks):
-                        if chunk.strip():  # Only store non-empty chunks
-                            self.vectorstore.add_texts(
-                                texts=[chunk],
-                                metadatas=[{
-                                    "source": filename,
-                                    "chunk_id": i
-                                }]
-                            )
+                    self._apply_document_updates([update])
                     
                     total_chunks += len(chunks)
                     logger.info(f"✓ Split {filename} into {len(chunks)} chunks")
@@ -155,35 +227,518 @@ class RAGAssistant:
             print(f"❌ Error loading documents: {e}")
             raise
     
-    def retrieve_relevant(self, query, k=NUM_RETRIEVED_DOCS):
+    def _prepare_document(self, filename, content):
+        """
+        Chunk and embed a document without touching the index
+        
+        This is the slow part of indexing, so it runs outside the index
+        lock while queries continue against the current version.
+        
+        Returns:
+            Dict with source, ids, texts, metadatas and embeddings
+        """
+        chunks = self.chunker.split_text(content) if content and content.strip() else []
+        return {
+            "source": filename,
+            "ids": [make_chunk_id(filename, i, chunk) for i, chunk in enumerate(chunks)],
+            "texts": chunks,
+            "metadatas": [
+                {"source": filename, "chunk_id": i, "tombstoned": 0} for i in range(len(chunks))
+            ],
+            "embeddings": embed_matrix(self.embeddings, chunks, dtype="float32"),
+        }
+    
+    def _apply_document_updates(self, updates, removed_sources=()):
+        """
+        Atomically apply prepared documents and removals to the index
+        
+        Each source's previous chunks are replaced in one step under the
+        write lock, so queries see either the old or the new version of a
+        file, never a mix. Replaced and removed chunks are tombstoned, not
+        deleted; compaction reclaims their storage later.
+        
+        Args:
+            updates: Dicts returned by _prepare_document
+            removed_sources: Filenames whose chunks should be dropped
+        
+        Returns:
+            Number of chunks tombstoned
+        """
+        with self._index_lock.write():
+            collection = self.vectorstore._collection
+            stale = []
+            changed = False
+            for source in removed_sources:
+                stale.extend(self._live_ids(source))
+            
+            for update in updates:
+                live_ids = self._live_ids(update["source"])
+                if set(live_ids) == set(update["ids"]):
+                    continue  # Chunk ids are content hashes: nothing changed
+                changed = True
+                if update["ids"]:
+                    collection.upsert(
+                        ids=update["ids"],
+                        embeddings=update["embeddings"],
+                        documents=update["texts"],
+                        metadatas=update["metadatas"]
+                    )
+                    # Content that came back revives its old chunks
+                    self._tombstones.difference_update(update["ids"])
+                stale.extend(set(live_ids).difference(update["ids"]))
+            
+            if stale:
+                self._tombstone(stale)
+            if changed or stale:
+                self._bump_index_version()
+        
+        self._maybe_compact()
+        return len(stale)
+    
+    def _live_ids(self, source):
+        """Ids of a source's chunks that are not tombstoned"""
+        ids = self.vectorstore._collection.get(where={"source": source}, include=[])["ids"]
+        return [chunk_id for chunk_id in ids if chunk_id not in self._tombstones]
+    
+    def _load_tombstones(self):
+        """Tombstoned chunk ids persisted in the collection"""
+        return set(self.vectorstore._collection.get(where={"tombstoned": 1}, include=[])["ids"])
+    
+    def _tombstone(self, ids):
+        """Hide chunks from results; must be called under the write lock"""
+        ids = list(ids)
+        for lo in range(0, len(ids), COMPACTION_BATCH_SIZE):
+            batch = ids[lo:lo + COMPACTION_BATCH_SIZE]
+            self.vectorstore._collection.update(ids=batch, metadatas=[{"tombstoned": 1}] * len(batch))
+        self._tombstones.update(ids)
+    
+    def delete_source(self, filename):
+        """
+        Remove a document from the index
+        
+        Its chunks stop appearing in results immediately; their storage
+        is reclaimed by the next compaction.
+        
+        Returns:
+            Number of chunks removed
+        """
+        removed = self._apply_document_updates([], [filename])
+        logger.info(f"✓ Deleted {filename} ({removed} chunks tombstoned)")
+        return removed
+    
+    def update_source(self, filename, content=None):
+        """
+        Replace a document's chunks with a new version
+        
+        Args:
+            filename: Source name of the document
+            content: New text (read from the documents folder if None)
+        
+        Returns:
+            Number of chunks indexed
+        """
+        if content is None:
+            return self.reindex_files([filename])
+        update = self._prepare_document(filename, content)
+        self._apply_document_updates([update])
+        return len(update["ids"])
+    
+    def tombstone_ratio(self):
+        """Fraction of stored chunks that are tombstoned"""
+        total = self.vectorstore._collection.count()
+        return len(self._tombstones) / total if total else 0.0
+    
+    def _maybe_compact(self):
+        """Start a background compaction once enough chunks are tombstoned"""
+        if len(self._tombstones) < COMPACTION_MIN_TOMBSTONES:
+            return
+        if self.tombstone_ratio() < COMPACTION_TOMBSTONE_RATIO:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, name="compaction", daemon=True)
+        self._compaction_thread.start()
+    
+    def compact(self):
+        """
+        Rewrite the collection without tombstoned chunks
+        
+        Live chunks are copied into a fresh collection while queries and
+        updates continue against the current one. Changes made during the
+        copy are then replayed and the new collection is swapped in under
+        the write lock, which is held only for that final step.
+        
+        Returns:
+            Number of chunks reclaimed, or None if a compaction is already running
+        """
+        if not self._compaction_lock.acquire(blocking=False):
+            return None
+        try:
+            start = time.perf_counter()
+            client = self.vectorstore._client
+            old = self.vectorstore._collection
+            temp_name = f"{self.collection_name}-compacting"
+            if temp_name in {c.name for c in client.list_collections()}:
+                client.delete_collection(temp_name)
+            new = client.create_collection(temp_name, configuration=self.hnsw_config)
+            
+            with self._index_lock.read():
+                tombstones = set(self._tombstones)
+            offset = 0
+            while True:
+                batch = old.get(include=["embeddings", "documents", "metadatas"],
+                                limit=COMPACTION_BATCH_SIZE, offset=offset)
+                if not batch["ids"]:
+                    break
+                offset += len(batch["ids"])
+                self._copy_records(new, batch, tombstones)
+            
+            with self._index_lock.write():
+                # Replay updates that landed while copying
+                live = set(old.get(include=[])["ids"]) - self._tombstones
+                copied = set(new.get(include=[])["ids"])
+                missing = list(live - copied)
+                for lo in range(0, len(missing), COMPACTION_BATCH_SIZE):
+                    batch = old.get(ids=missing[lo:lo + COMPACTION_BATCH_SIZE],
+                                    include=["embeddings", "documents", "metadatas"])
+                    self._copy_records(new, batch, self._tombstones)
+                extra = list(copied - live)
+                if extra:
+                    new.delete(ids=extra)
+                
+                reclaimed = old.count() - new.count()
+                if old.metadata:
+                    new.modify(metadata=dict(old.metadata))
+                # Rename before deleting so the data is never without a copy
+                old.modify(name=f"{self.collection_name}-retired")
+                new.modify(name=self.collection_name)
+                client.delete_collection(f"{self.collection_name}-retired")
+                self.vectorstore = Chroma(
+                    collection_name=self.collection_name,
+                    embedding_function=self.embeddings,
+                    client=client,
+                    collection_configuration=self.hnsw_config
+                )
+                self._tombstones = set()
+            
+            seconds = time.perf_counter() - start
+            self.compaction_stats["compactions"] += 1
+            self.compaction_stats["reclaimed_chunks"] += reclaimed
+            self.compaction_stats["last_seconds"] = seconds
+            logger.info(f"✓ Compacted {self.collection_name}: reclaimed {reclaimed} chunks in {seconds:.2f}s")
+            return reclaimed
+        
+        except Exception as e:
+            logger.error(f"Compaction failed: {e}")
+            raise
+        finally:
+            self._compaction_lock.release()
+    
+    @staticmethod
+    def _copy_records(collection, batch, tombstones):
+        """Add the non-tombstoned records of a get() batch to a collection"""
+        keep = [i for i, chunk_id in enumerate(batch["ids"]) if chunk_id not in tombstones]
+        if keep:
+            collection.upsert(
+                ids=[batch["ids"][i] for i in keep],
+                embeddings=[batch["embeddings"][i] for i in keep],
+                documents=[batch["documents"][i] for i in keep],
+                metadatas=[batch["metadatas"][i] for i in keep]
+            )
+    
+    def _stored_index_version(self):
+        """Index version persisted in the collection metadata"""
+        metadata = self.vectorstore._collection.metadata or {}
+        return int(metadata.get("index_version", 0))
+    
+    def _bump_index_version(self):
+        """
+        Advance the index version and persist it with the collection
+        
+        Cached answers are keyed by this version, so it must keep
+        increasing across restarts and collection resets.
+        """
+        self.index_version = max(self.index_version, self._stored_index_version()) + 1
+        collection = self.vectorstore._collection
+        metadata = dict(collection.metadata or {})
+        metadata["index_version"] = self.index_version
+        collection.modify(metadata=metadata)
+    
+    def reindex_files(self, filenames):
+        """
+        Re-index only the given files from the documents folder
+        
+        Files that no longer exist are removed from the index.
+        
+        Args:
+            filenames: Names of files inside the documents folder
+        
+        Returns:
+            Number of chunks indexed
+        """
+        updates = []
+        removed = []
+        for filename in sorted(set(filenames)):
+            if not is_supported_document(filename):
+                continue
+            
+            file_path = os.path.join(self.documents_folder, filename)
+            if not os.path.exists(file_path):
+                removed.append(filename)
+                continue
+            
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                updates.append(self._prepare_document(filename, content))
+            except Exception as e:
+                logger.error(f"Error re-indexing {filename}: {e}")
+        
+        if not updates and not removed:
+            return 0
+        
+        self._apply_document_updates(updates, removed)
+        total_chunks = sum(len(update["ids"]) for update in updates)
+        logger.info(
+            f"✓ Re-indexed {len(updates)} file(s) ({total_chunks} chunks), "
+            f"removed {len(removed)}; index version {self.index_version}"
+        )
+        return total_chunks
+    
+    def start_watching(self, debounce_seconds=WATCH_DEBOUNCE_SECONDS):
+        """
+        Watch the documents folder and re-index changed files in the background
+        
+        Args:
+            debounce_seconds: Quiet period to wait for after the last change
+        
+        Returns:
+            The running DocumentWatcher
+        """
+        if self.watcher is None:
+            self.watcher = DocumentWatcher(
+                self.documents_folder,
+                on_change=self.reindex_files,
+                debounce_seconds=debounce_seconds
+            )
+            self.watcher.start()
+            print(f"✓ Watching {self.documents_folder} for changes ({self.watcher.backend_name})")
+        return self.watcher
+    
+    def stop_watching(self):
+        """Stop the background folder watcher if it is running"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def close(self):
+        """
+        Release background threads: the folder watcher and the search pool
+        
+        The collection stays on disk; shared components (LLM, embeddings,
+        Chroma client, answer cache) are left to their owner.
+        """
+        self.stop_watching()
+        pool, self._search_pool = self._search_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    def export_snapshot(self, output_path=SNAPSHOT_DIR):
+        """
+        Export the current index as a versioned, checksummed snapshot bundle
+
+        Args:
+            output_path: Directory to write the bundle to
+
+        Returns:
+            The snapshot manifest dict
+        """
+        try:
+            with self._index_lock.read():
+                manifest = export_snapshot(self.vectorstore, output_path)
+            print(f"✓ Exported {manifest['count']} chunks to {output_path}")
+            return manifest
+
+        except Exception as e:
+            logger.error(f"Failed to export snapshot: {e}")
+            print(f"❌ Error exporting snapshot: {e}")
+            raise
+
+    def import_snapshot(self, snapshot_path=SNAPSHOT_DIR):
+        """
+        Warm-start the index from a snapshot bundle without re-embedding
+
+        Refuses bundles built with a different embedding backend, model or
+        chunking settings than the current config.
+
+        Args:
+            snapshot_path: Directory containing the bundle
+
+        Returns:
+            Number of chunks imported
+        """
+        try:
+            with self._index_lock.write():
+                total_chunks = import_snapshot(self.vectorstore, snapshot_path)
+                self._tombstones = self._load_tombstones()
+                self._bump_index_version()
+            print(f"✓ Imported {total_chunks} chunks from {snapshot_path}")
+            return total_chunks
+
+        except Exception as e:
+            logger.error(f"Failed to import snapshot: {e}")
+            print(f"❌ Error importing snapshot: {e}")
+            raise
+
+    def retrieve_relevant(self, query, k=NUM_RETRIEVED_DOCS, multi_query=None):
         """Retrieve relevant documents with validation"""
+        documents, _ = self._retrieve(query, k, multi_query=multi_query)
+        return documents
+    
+    def _retrieve(self, query, k=NUM_RETRIEVED_DOCS, multi_query=None, deadline=None,
+                  follow_up=False):
+        """
+        Retrieve relevant documents and the query embedding used to find them
+        
+        Args:
+            query: User question
+            k: Number of documents to return
+            multi_query: Search with several query variants and fuse the
+                rankings (defaults to MULTI_QUERY_ENABLED)
+            deadline: Optional Deadline; LLM query rewriting is skipped
+                when too little time is left
+            follow_up: Reuse the previous turn's chunks if the query
+                continues it (see SessionRetrievalCache)
+        
+        Returns:
+            Tuple of (documents, query_vector); query_vector is None if the
+            query was rejected or retrieval failed
+        """
         try:
             # Validate query
             if not query or not query.strip():
                 logger.warning("Empty query received")
-                return []
+                return [], None
             
             if len(query) > 1000:
                 query = query[:1000]  # Truncate very long queries
                 logger.warning("Query truncated to 1000 characters")
             
+            # Embed outside the lock so index updates are not held up
+            query_vector = None
+            if follow_up:
+                query_vector = self.embeddings.embed_query(query)
+                if self.session.is_follow_up(query_vector, self.index_version):
+                    with self._index_lock.read():
+                        delta = self._search(query_vector, self.session.delta_k)
+                    results = self.session.merge(query_vector, delta, k, self.embeddings)
+                    self.last_query_info["follow_up"] = True
+                    logger.info(f"Follow-up: reused previous chunks, {len(delta)} from delta search")
+                    return results, query_vector
+            
+            if multi_query is None:
+                multi_query = MULTI_QUERY_ENABLED
+            if multi_query:
+                return self._multi_query_retrieve(query, k, deadline)
+            
             logger.info(f"Retrieving {k} documents for query: {query[:50]}...")
-            results = self.vectorstore.similarity_search(query, k=k)
+            if query_vector is None:
+                query_vector = self.embeddings.embed_query(query)
+            with self._index_lock.read():
+                results = self._search(query_vector, k)
             
             logger.info(f"Found {len(results)} relevant documents")
-            return results
+            return results, query_vector
             
         except Exception as e:
             logger.error(f"Error retrieving documents: {e}")
-            return []
+            return [], None
     
-    def query(self, user_query):
+    def _multi_query_retrieve(self, query, k, deadline=None):
+        """
+        Retrieve with query variants and reciprocal-rank fusion
+        
+        All variants are embedded in one batch and searched concurrently
+        against a single index version.
+        """
+        variants = rule_based_variants(query, MULTI_QUERY_VARIANTS)
+        if MULTI_QUERY_USE_LLM and (deadline is None or deadline.remaining() > FALLBACK_RESERVE_SECONDS * 2):
+            rewrite_deadline = None if deadline is None else deadline.reserve(deadline.remaining() / 2)
+            for variant in llm_variants(self.llm, query, MULTI_QUERY_VARIANTS, rewrite_deadline):
+                if variant.lower() not in {v.lower() for v in variants} and variant.lower() != query.lower():
+                    variants.append(variant)
+        queries = [query] + variants
+        
+        logger.info(f"Retrieving {k} documents for {len(queries)} query variants: {query[:50]}...")
+        vectors = embed_matrix(self.embeddings, queries, dtype="float32")
+        
+        if self._search_pool is None:
+            self._search_pool = ThreadPoolExecutor(
+                max_workers=MULTI_QUERY_MAX_WORKERS, thread_name_prefix="retrieval"
+            )
+        with self._index_lock.read():
+            result_lists = list(self._search_pool.map(
+                lambda vector: self._search(vector, k),
+                vectors
+            ))
+        
+        results = [doc for doc, _ in reciprocal_rank_fusion(result_lists)[:k]]
+        logger.info(f"Found {len(results)} relevant documents after rank fusion")
+        return results, vectors[0]
+    
+    def _search(self, vector, k):
+        """
+        Nearest live chunks to a vector; call under the read lock
+        
+        Tombstoned chunks are dropped from a slightly larger result set,
+        falling back to a metadata-filtered search (slower) if too many of
+        the nearest chunks were deleted.
+        """
+        tombstones = self._tombstones
+        if not tombstones:
+            return self.vectorstore.similarity_search_by_vector(vector, k=k)
+        
+        fetch = min(k + len(tombstones), k * TOMBSTONE_OVERFETCH_FACTOR)
+        results = [
+            doc for doc in self.vectorstore.similarity_search_by_vector(vector, k=fetch)
+            if doc.id not in tombstones
+        ]
+        if len(results) >= k or fetch == k + len(tombstones):
+            return results[:k]
+        return self.vectorstore.similarity_search_by_vector(vector, k=k, filter=LIVE_CHUNKS)
+    
+    def query(self, user_query, time_budget=QUERY_TIME_BUDGET_SECONDS, multi_query=None,
+              use_cache=True, follow_up=False):
         """
         Answer a question using RAG with full error handling
         
+        The time budget is shared by retrieval and generation. If the LLM
+        cannot answer within what is left of it (slow, rate limited or
+        down), a local extractive answer built from the retrieved chunks
+        is returned instead and flagged as degraded. Answers are cached
+        per question, retrieved chunks and index version, so asking again
+        after a restart does not call the LLM.
+        
+        Args:
+            user_query: Question to answer
+            time_budget: Seconds allowed for the whole request (None for no limit)
+            multi_query: Use multi-query retrieval (defaults to MULTI_QUERY_ENABLED)
+            use_cache: Serve and store answers through the answer cache
+            follow_up: Treat the query as a possible follow-up to the
+                previous one and reuse its retrieved chunks
+        
         Returns:
-            Tuple of (answer, source_documents)
+            Tuple of (answer, source_documents); details such as the
+            degraded flag are recorded in self.last_query_info
         """
+        deadline = Deadline(time_budget)
+        self.last_query_info = {
+            "degraded": False,
+            "fallback_reason": None,
+            "time_budget": time_budget,
+            "cache_hit": False,
+            "follow_up": False,
+        }
         try:
             # Input validation
             if not user_query or not user_query.strip():
@@ -197,15 +752,47 @@ class RAGAssistant:
             
             logger.info(f"Processing query: {user_query[:50]}...")
             
-            # Retrieve relevant documents
-            relevant_docs = self.retrieve_relevant(user_query)
+            # Retrieve relevant documents (nothing to fall back on without them)
+            try:
+                deadline.check("retrieval")
+            except DeadlineExceeded as e:
+                logger.warning(f"{e}; no time left to answer")
+                self.last_query_info["degraded"] = True
+                self.last_query_info["fallback_reason"] = type(e).__name__
+                return "⚠ Time budget exhausted before the documents could be searched. Please try again.", []
+            
+            index_version = self.index_version
+            context_start = time.perf_counter()
+            relevant_docs, query_vector = self._retrieve(
+                user_query, multi_query=multi_query, deadline=deadline, follow_up=follow_up
+            )
             
             if not relevant_docs:
                 logger.warning("No relevant documents found")
                 return "⚠ No relevant documents found. Try rephrasing your question.", []
             
-            # Build context from retrieved documents
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
+            cache = self.answer_cache if use_cache else None
+            if cache is not None:
+                answer = self._cached_answer(user_query, relevant_docs, index_version)
+                if answer is not None:
+                    if follow_up:
+                        self._end_follow_up_turn(query_vector, relevant_docs, index_version, context_start)
+                    self.conversation_history.append(("assistant", answer))
+                    logger.info(f"✓ Served cached answer with {len(relevant_docs)} sources")
+                    return answer, relevant_docs
+            
+            # Keep only the query-relevant sentences of each chunk
+            context_docs, scored = self._compress_context(
+                query_vector, relevant_docs, self.session.sentence_cache if follow_up else None
+            )
+            if follow_up:
+                self._end_follow_up_turn(query_vector, relevant_docs, index_version, context_start)
+            
+            # Build context from retrieved documents, labelled by source
+            context = "\n\n".join(
+                f"[Source: {doc.metadata.get('source', 'Unknown')}]\n{doc.page_content}"
+                for doc in context_docs
+            )
             
             # Build the prompt
             full_prompt = f"""Document Context:
@@ -221,22 +808,20 @@ Answer based ONLY on the context above:"""
                 HumanMessage(content=full_prompt)
             ]
             
-            # THIS IS THE FIX - Wrapped LLM call with error handling
+            # The governor retries transient failures within the remaining
+            # budget, keeping back enough time to build a fallback answer;
+            # if retrieval used that budget up, the LLM is not called at all
+            llm_deadline = None if time_budget is None else deadline.reserve(FALLBACK_RESERVE_SECONDS)
             try:
-                response = self.llm.invoke(messages)
+                if llm_deadline is not None:
+                    llm_deadline.check("generation")
+                response = self.llm.invoke(messages, deadline=llm_deadline)
                 answer = response.content
-            except Exception as llm_error:
-                # Handle Groq API server errors (500, timeouts, etc.)
-                error_msg = str(llm_error)
-                if "500" in error_msg or "Internal Server Error" in error_msg:
-                    logger.error(f"Groq API temporarily unavailable: {llm_error}")
-                    return "⚠️ The AI service is temporarily unavailable. Please try again in a few moments.", relevant_docs
-                elif "timeout" in error_msg.lower():
-                    logger.error(f"Groq API timeout: {llm_error}")
-                    return "⚠️ Request timed out. Please try again.", relevant_docs
-                else:
-                    logger.error(f"Unexpected LLM error: {llm_error}")
-                    raise
+                if cache is not None:
+                    self._store_answer(user_query, relevant_docs, index_version, answer)
+            except (DeadlineExceeded, CircuitOpenError, RetriesExhaustedError) as llm_error:
+                logger.warning(f"LLM unavailable within budget ({llm_error}); using extractive fallback")
+                answer = self._fallback_answer(query_vector, relevant_docs, llm_error, scored)
             
             # Add to conversation history
             self.conversation_history.append(("assistant", answer))
@@ -247,13 +832,109 @@ Answer based ONLY on the context above:"""
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             return f"❌ Error: {str(e)}", []
+        
+        finally:
+            self.last_query_info["elapsed_seconds"] = deadline.elapsed()
+    
+    def _end_follow_up_turn(self, query_vector, relevant_docs, index_version, context_start):
+        """Record the turn's context preparation time and keep its chunks for the next turn"""
+        self.session.record(self.last_query_info["follow_up"], time.perf_counter() - context_start)
+        self.session.remember(query_vector, relevant_docs, index_version)
+    
+    def _cached_answer(self, user_query, relevant_docs, index_version):
+        """Cached answer for this question and retrieval, or None"""
+        try:
+            answer = self.answer_cache.get(
+                self.collection_name, user_query, relevant_docs, index_version, self.model_identity
+            )
+        except Exception as e:
+            logger.error(f"Answer cache lookup failed: {e}")
+            return None
+        self.last_query_info["cache_hit"] = answer is not None
+        return answer
+    
+    def _store_answer(self, user_query, relevant_docs, index_version, answer):
+        """Cache a generated answer (degraded answers are never stored)"""
+        try:
+            self.answer_cache.put(
+                self.collection_name, user_query, relevant_docs, index_version, answer,
+                self.model_identity
+            )
+        except Exception as e:
+            logger.error(f"Answer cache store failed: {e}")
+    
+    def _compress_context(self, query_vector, relevant_docs, sentence_cache=None):
+        """
+        Compress retrieved chunks to their relevant sentences
+        
+        Records the compression ratio in last_query_info. Falls back to the
+        full chunks if compression is disabled, fails or keeps nothing.
+        
+        Returns:
+            Tuple of (documents for the prompt, sentence scores or None)
+        """
+        if not CONTEXT_COMPRESSION_ENABLED or query_vector is None:
+            return relevant_docs, None
+        
+        try:
+            compressed = compress_documents(
+                query_vector, relevant_docs, self.embeddings, cache=sentence_cache
+            )
+        except Exception as e:
+            logger.error(f"Context compression failed: {e}")
+            return relevant_docs, None
+        
+        if not compressed["documents"]:
+            return relevant_docs, compressed["scored"]
+        
+        self.last_query_info.update({
+            "context_chars_before": compressed["original_chars"],
+            "context_chars_after": compressed["compressed_chars"],
+            "compression_ratio": compressed["ratio"],
+        })
+        logger.info(
+            f"Context compressed to {compressed['ratio']:.0%} "
+            f"({compressed['original_chars']} → {compressed['compressed_chars']} chars)"
+        )
+        return compressed["documents"], compressed["scored"]
+    
+    def _fallback_answer(self, query_vector, relevant_docs, llm_error, scored=None):
+        """
+        Answer from the retrieved chunks alone when the LLM is unavailable
+        
+        Returns:
+            Degraded extractive answer, or a service-unavailable message if
+            nothing could be extracted
+        """
+        self.last_query_info["degraded"] = True
+        self.last_query_info["fallback_reason"] = type(llm_error).__name__
+        
+        try:
+            extract = extractive_answer(query_vector, relevant_docs, self.embeddings, scored=scored)
+        except Exception as e:
+            logger.error(f"Extractive fallback failed: {e}")
+            extract = ""
+        
+        if extract:
+            return (
+                "⚠️ [Degraded answer] The AI service did not respond in time, so these are "
+                "the most relevant passages from the documents:\n\n" + extract
+            )
+        
+        if isinstance(llm_error, RetriesExhaustedError) and llm_error.timed_out:
+            return "⚠️ Request timed out. Please try again."
+        if isinstance(llm_error, RetriesExhaustedError) and llm_error.status_code == 429:
+            return "⚠️ The AI service is busy. Please try again in a few moments."
+        return "⚠️ The AI service is temporarily unavailable. Please try again in a few moments."
     
     def interactive_chat(self):
         """Start interactive chat session with error handling"""
         print_section("Interactive Chat Mode")
         print("Type 'exit' or 'quit' to end conversation")
         print("Type 'history' to see conversation history")
-        print("Type 'save' to save conversation\n")
+        print("Type 'save' to save conversation")
+        print("Type 'stats' to see follow-up retrieval statistics")
+        print("Type 'new' to start a new topic\n")
         
         while True:
             try:
@@ -263,6 +944,7 @@ Answer based ONLY on the context above:"""
                     continue
                 
                 if user_input.lower() in ["exit", "quit"]:
+                    self._print_session_stats()
                     print("\nGoodbye!")
                     logger.info("Chat session ended")
                     break
@@ -280,9 +962,18 @@ Answer based ONLY on the context above:"""
                     self._save_conversation()
                     continue
                 
+                if user_input.lower() == "stats":
+                    self._print_session_stats()
+                    continue
+                
+                if user_input.lower() == "new":
+                    self.session.reset()
+                    print("✓ Started a new topic\n")
+                    continue
+                
                 # Get answer
                 print("\nThinking...")
-                answer, sources = self.query(user_input)
+                answer, sources = self.query(user_input, follow_up=True)
                 
                 print(f"\nAssistant: {answer}\n")
                 
@@ -303,6 +994,21 @@ Answer based ONLY on the context above:"""
                 logger.error(f"Chat error: {e}")
                 print(f"Error: {e}\n")
     
+    def _print_session_stats(self):
+        """Print how often follow-ups reused the previous turn's chunks"""
+        summary = self.session.summary()
+        if not summary["turns"]:
+            return
+        print(
+            f"\nFollow-up reuse: {summary['reused']}/{summary['turns']} turns "
+            f"({summary['reuse_rate']:.0%})"
+        )
+        if summary["avg_full_ms"] is not None and summary["avg_reuse_ms"] is not None:
+            print(
+                f"Context preparation: {summary['avg_full_ms']:.0f} ms full, "
+                f"{summary['avg_reuse_ms']:.0f} ms reused; ~{summary['saved_ms']:.0f} ms saved\n"
+            )
+    
     def _save_conversation(self):
         """Save conversation to file"""
         try:
@@ -0,0 +1,288 @@
+"""
+Index snapshot export/import for RAG Assistant
+Versioned, checksummed bundles that let new replicas warm-start without re-embedding
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .config import EMBEDDING_BACKEND, EMBEDDING_MODEL, HASHING_EMBEDDING_DIM, CHUNK_SIZE, CHUNK_OVERLAP
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes in an incompatible way
+SNAPSHOT_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+CONFIG_FILE = "config.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl"
+
+# Number of rows fetched from / written to Chroma per round trip
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot bundle is corrupt or incompatible"""
+
+
+def current_index_config():
+    """
+    Settings that determine the contents of the index
+
+    The embedding backend is included because the offline hashing
+    embedder and the HuggingFace model share EMBEDDING_MODEL and the
+    vector dimension, yet produce unrelated vectors.
+
+    Returns:
+        Dict of config values a snapshot must match to be importable
+    """
+    config = {
+        "EMBEDDING_BACKEND": EMBEDDING_BACKEND,
+        "EMBEDDING_MODEL": EMBEDDING_MODEL,
+        "CHUNK_SIZE": CHUNK_SIZE,
+        "CHUNK_OVERLAP": CHUNK_OVERLAP,
+    }
+    if EMBEDDING_BACKEND == "hashing":
+        config["HASHING_EMBEDDING_DIM"] = HASHING_EMBEDDING_DIM
+    return config
+
+
+def _sha256(file_path, block_size=1 << 20):
+    """Compute the SHA-256 digest of a file without reading it into memory"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_snapshot(vectorstore, output_path, batch_size=SNAPSHOT_BATCH_SIZE):
+    """
+    Export a Chroma vector store as a snapshot bundle
+
+    The bundle is written to a temporary directory and moved into place
+    only once complete, so readers never observe a half-written snapshot.
+
+    Args:
+        vectorstore: LangChain Chroma vector store to export
+        output_path: Directory to write the bundle to (replaced if it exists)
+        batch_size: Rows fetched from Chroma per request
+
+    Returns:
+        The manifest dict that was written
+    """
+    collection = vectorstore._collection
+    count = collection.count()
+    if count == 0:
+        raise SnapshotError("Cannot export an empty index")
+
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    try:
+        matrix = None
+        written = 0
+        with open(os.path.join(tmp_path, RECORDS_FILE), 'w', encoding='utf-8') as records:
+            for offset in range(0, count, batch_size):
+                batch = collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=batch_size,
+                    offset=offset
+                )
+                embeddings = np.asarray(batch["embeddings"], dtype=np.float32)
+                if len(embeddings) == 0:
+                    break
+
+                # Preallocate the on-disk matrix once the dimension is known
+                if matrix is None:
+                    matrix = np.lib.format.open_memmap(
+                        os.path.join(tmp_path, EMBEDDINGS_FILE),
+                        mode='w+',
+                        dtype=np.float32,
+                        shape=(count, embeddings.shape[1])
+                    )
+
+                matrix[written:written + len(embeddings)] = embeddings
+                for chunk_id, document, metadata in zip(
+                    batch["ids"], batch["documents"], batch["metadatas"]
+                ):
+                    records.write(json.dumps({
+                        "id": chunk_id,
+                        "document": document,
+                        "metadata": metadata or {}
+                    }, ensure_ascii=False) + "\n")
+                written += len(embeddings)
+
+        if written != count:
+            raise SnapshotError(f"Index changed during export ({written} of {count} rows read)")
+
+        matrix.flush()
+        dimension = matrix.shape[1]
+        del matrix
+
+        with open(os.path.join(tmp_path, CONFIG_FILE), 'w', encoding='utf-8') as f:
+            json.dump(current_index_config(), f, indent=2)
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "collection_name": collection.name,
+            "count": count,
+            "dimension": dimension,
+            "dtype": "float32",
+            "config": current_index_config(),
+            "files": {
+                name: {
+                    "sha256": _sha256(os.path.join(tmp_path, name)),
+                    "bytes": os.path.getsize(os.path.join(tmp_path, name))
+                }
+                for name in (EMBEDDINGS_FILE, RECORDS_FILE, CONFIG_FILE)
+            }
+        }
+        with open(os.path.join(tmp_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(output_path):
+            shutil.rmtree(output_path)
+        os.replace(tmp_path, output_path)
+
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    logger.info(f"✓ Exported {count} chunks to snapshot {output_path}")
+    return manifest
+
+
+class Snapshot:
+    """
+    A verified snapshot bundle opened for reading
+
+    The embedding matrix is memory-mapped, so opening a snapshot costs
+    almost nothing regardless of its size.
+    """
+
+    def __init__(self, path, manifest, embeddings, records):
+        self.path = path
+        self.manifest = manifest
+        self.embeddings = embeddings
+        self.records = records
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    def iter_batches(self, batch_size=SNAPSHOT_BATCH_SIZE):
+        """
+        Yield (ids, embeddings, documents, metadatas) batches
+
+        Embedding batches are views into the memory map, not copies.
+        """
+        for start in range(0, len(self), batch_size):
+            rows = self.records[start:start + batch_size]
+            yield (
+                [row["id"] for row in rows],
+                self.embeddings[start:start + len(rows)],
+                [row["document"] for row in rows],
+                [row["metadata"] or None for row in rows],
+            )
+
+
+def open_snapshot(snapshot_path, verify_checksums=True):
+    """
+    Open and validate a snapshot bundle
+
+    Args:
+        snapshot_path: Directory containing the bundle
+        verify_checksums: Recompute file digests and compare with the manifest
+
+    Returns:
+        Snapshot instance
+
+    Raises:
+        SnapshotError: If the bundle is missing files, corrupt, from an
+            unsupported format version, or built with different settings
+    """
+    manifest_path = os.path.join(snapshot_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise SnapshotError(f"No snapshot manifest found in {snapshot_path}")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    version = manifest.get("format_version")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format version {version} "
+            f"(expected {SNAPSHOT_FORMAT_VERSION})"
+        )
+
+    # Refuse bundles whose vectors or chunk boundaries would not match ours
+    expected = current_index_config()
+    mismatched = {
+        key: (manifest.get("config", {}).get(key), value)
+        for key, value in expected.items()
+        if manifest.get("config", {}).get(key) != value
+    }
+    if mismatched:
+        details = ", ".join(
+            f"{key}: snapshot={theirs!r} current={ours!r}"
+            for key, (theirs, ours) in mismatched.items()
+        )
+        raise SnapshotError(f"Snapshot settings do not match current config ({details})")
+
+    for name, info in manifest["files"].items():
+        file_path = os.path.join(snapshot_path, name)
+        if not os.path.exists(file_path):
+            raise SnapshotError(f"Snapshot file missing: {name}")
+        if os.path.getsize(file_path) != info["bytes"]:
+            raise SnapshotError(f"Snapshot file truncated: {name}")
+        if verify_checksums and _sha256(file_path) != info["sha256"]:
+            raise SnapshotError(f"Checksum mismatch for snapshot file: {name}")
+
+    embeddings = np.load(os.path.join(snapshot_path, EMBEDDINGS_FILE), mmap_mode='r')
+    if embeddings.shape != (manifest["count"], manifest["dimension"]):
+        raise SnapshotError(f"Unexpected embedding matrix shape {embeddings.shape}")
+
+    with open(os.path.join(snapshot_path, RECORDS_FILE), 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if len(records) != manifest["count"]:
+        raise SnapshotError(f"Snapshot has {len(records)} records, manifest says {manifest['count']}")
+
+    return Snapshot(snapshot_path, manifest, embeddings, records)
+
+
+def import_snapshot(vectorstore, snapshot_path, batch_size=SNAPSHOT_BATCH_SIZE, verify_checksums=True):
+    """
+    Load a snapshot bundle into a Chroma vector store without re-embedding
+
+    Args:
+        vectorstore: LangChain Chroma vector store to populate
+        snapshot_path: Directory containing the bundle
+        batch_size: Rows written to Chroma per request
+        verify_checksums: Recompute file digests before importing
+
+    Returns:
+        Number of chunks imported
+    """
+    snapshot = open_snapshot(snapshot_path, verify_checksums=verify_checksums)
+    collection = vectorstore._collection
+
+    for ids, embeddings, documents, metadatas in snapshot.iter_batches(batch_size):
+        collection.upsert(
+            ids=ids,
+            embeddings=np.ascontiguousarray(embeddings),
+            documents=documents,
+            metadatas=metadatas
+        )
+
+    logger.info(f"✓ Imported {len(snapshot)} chunks from snapshot {snapshot_path}")
+    return len(snapshot)
@@ -0,0 +1,240 @@
+"""
+Multi-tenant RAG Assistant
+Routes each tenant to its own collection while sharing the heavy components
+"""
+
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+
+import chromadb
+from chromadb.config import Settings
+
+from .config import (
+    CHUNK_SIZE, VECTOR_DB_PATH, COLLECTION_NAME, TENANT_DOCUMENTS_ROOT,
+    TENANT_MAX_OPEN, TENANT_MEMORY_BUDGET_MB, ANSWER_CACHE_ENABLED, HNSW_M
+)
+from .rag_system import RAGAssistant
+from .governor import GovernedLLM
+from .answer_cache import AnswerCache
+from .backends import create_llm, create_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Tenant ids: 1-64 chars of [a-zA-Z0-9._-], alphanumeric at both ends, so the
+# prefixed collection name is always a valid Chroma name (3-512 chars)
+TENANT_ID_PATTERN = re.compile(r"^[a-zA-Z0-9](?:[a-zA-Z0-9._-]{0,62}[a-zA-Z0-9])?$")
+
+# Fixed per-tenant cost of an open assistant (chunker, locks, history)
+TENANT_BASE_BYTES = 64 * 1024
+
+# HNSW graph links per vector: 2 * M neighbours * 4-byte ids
+HNSW_LINK_BYTES = 2 * HNSW_M * 4
+
+
+class MultiTenantAssistant:
+    """
+    Tenant-aware front end for many RAGAssistant collections
+
+    One rate-limited LLM client, one embedding model, one Chroma client and
+    one answer cache are shared by every tenant. Each tenant gets a lightweight RAGAssistant bound to
+    its own collection; only the most recently used ones are kept open,
+    evicting the least recently used when either the count limit or the
+    estimated memory budget is exceeded.
+    """
+
+    def __init__(self, max_open=TENANT_MAX_OPEN, memory_budget_mb=TENANT_MEMORY_BUDGET_MB,
+                 vector_db_path=VECTOR_DB_PATH, documents_root=TENANT_DOCUMENTS_ROOT,
+                 llm=None, embeddings=None, answer_cache=None):
+        """
+        Args:
+            max_open: Maximum number of tenant collections kept open
+            memory_budget_mb: Estimated memory allowed for open collections
+            vector_db_path: Directory of the shared persistent Chroma database
+            documents_root: Folder containing one documents folder per tenant
+            llm: Chat model to share (created for LLM_BACKEND if None)
+            embeddings: Embedding model to share (created for EMBEDDING_BACKEND if None)
+            answer_cache: AnswerCache to share (opened if None and
+                ANSWER_CACHE_ENABLED; pass False to disable caching)
+        """
+        try:
+            if llm is None:
+                llm = create_llm()
+
+            # One governor for all tenants: they share the same API quota
+            if not isinstance(llm, GovernedLLM):
+                llm = GovernedLLM(llm)
+            self.llm = llm
+            self.embeddings = embeddings or create_embeddings()
+
+            # Answers are namespaced by collection, so one store serves all tenants
+            if answer_cache is None and ANSWER_CACHE_ENABLED:
+                answer_cache = AnswerCache()
+            self.answer_cache = answer_cache if answer_cache is not None else False
+
+            self.max_open = max_open
+            self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+            self.vector_db_path = vector_db_path
+            self.documents_root = documents_root
+
+            # Let Chroma drop cold segments too, within the same budget
+            self.client = chromadb.PersistentClient(
+                path=vector_db_path,
+                settings=Settings(
+                    chroma_segment_cache_policy="LRU",
+                    chroma_memory_limit_bytes=self.memory_budget_bytes,
+                    anonymized_telemetry=False
+                )
+            )
+
+            dimension = len(self.embeddings.embed_query("dimension probe"))
+            self.bytes_per_chunk = dimension * 4 + HNSW_LINK_BYTES + CHUNK_SIZE
+
+            self._open = OrderedDict()   # tenant_id -> RAGAssistant, coldest first
+            self._sizes = {}             # tenant_id -> estimated bytes
+            self._opening = {}           # tenant_id -> lock held while it is being opened
+            self._lock = threading.Lock()
+            self.stats = {"hits": 0, "opens": 0, "evictions": 0}
+
+            logger.info("✓ Multi-tenant assistant initialized")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize multi-tenant assistant: {e}")
+            raise
+
+    def collection_name_for(self, tenant_id):
+        """Chroma collection name for a tenant"""
+        return f"{COLLECTION_NAME}_{tenant_id}"
+
+    def documents_folder_for(self, tenant_id):
+        """Documents folder for a tenant"""
+        return os.path.join(self.documents_root, tenant_id)
+
+    def get(self, tenant_id):
+        """
+        Return the tenant's assistant, opening it and evicting cold tenants as needed
+
+        Args:
+            tenant_id: Tenant identifier ([a-zA-Z0-9._-], max 64 chars)
+
+        Returns:
+            RAGAssistant bound to the tenant's collection
+        """
+        if not tenant_id or not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+
+        with self._lock:
+            assistant = self._hit(tenant_id)
+            if assistant is not None:
+                return assistant
+            guard = self._opening.setdefault(tenant_id, threading.Lock())
+
+        # Opening a collection is slow: only callers for the same tenant
+        # wait for it, hits on other tenants go through meanwhile
+        with guard:
+            with self._lock:
+                assistant = self._hit(tenant_id)
+                if assistant is not None:
+                    return assistant
+
+            try:
+                assistant = RAGAssistant(
+                    documents_folder=self.documents_folder_for(tenant_id),
+                    llm=self.llm,
+                    embeddings=self.embeddings,
+                    collection_name=self.collection_name_for(tenant_id),
+                    vector_db_path=self.vector_db_path,
+                    chroma_client=self.client,
+                    answer_cache=self.answer_cache
+                )
+                size = self._estimate_bytes(assistant)
+                with self._lock:
+                    self._open[tenant_id] = assistant
+                    self._sizes[tenant_id] = size
+                    self.stats["opens"] += 1
+                    evicted = self._evict_if_needed()
+            finally:
+                with self._lock:
+                    self._opening.pop(tenant_id, None)
+
+        self._close_all(evicted)
+        return assistant
+
+    def query(self, tenant_id, user_query):
+        """
+        Answer a question against one tenant's documents
+
+        Returns:
+            Tuple of (answer, source_documents)
+        """
+        return self.get(tenant_id).query(user_query)
+
+    def load_documents(self, tenant_id, force_reload=False):
+        """Index the tenant's documents folder into its collection"""
+        assistant = self.get(tenant_id)
+        total_chunks = assistant.load_documents(force_reload=force_reload)
+        size = self._estimate_bytes(assistant)
+        evicted = []
+        with self._lock:
+            if tenant_id in self._sizes:
+                self._sizes[tenant_id] = size
+                evicted = self._evict_if_needed()
+        self._close_all(evicted)
+        return total_chunks
+
+    def evict(self, tenant_id):
+        """Close a tenant's assistant; its collection stays on disk"""
+        with self._lock:
+            assistant = self._remove(tenant_id)
+        self._close_all([assistant] if assistant is not None else [])
+
+    def open_tenants(self):
+        """Open tenant ids, coldest first"""
+        with self._lock:
+            return list(self._open)
+
+    def memory_usage_bytes(self):
+        """Estimated memory held by open tenant collections"""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _estimate_bytes(self, assistant):
+        return TENANT_BASE_BYTES + assistant.vectorstore._collection.count() * self.bytes_per_chunk
+
+    def _hit(self, tenant_id):
+        """Open assistant for tenant_id marked most recently used, or None (caller holds the lock)"""
+        assistant = self._open.get(tenant_id)
+        if assistant is not None:
+            self._open.move_to_end(tenant_id)
+            self.stats["hits"] += 1
+        return assistant
+
+    def _evict_if_needed(self):
+        """
+        Evict least recently used tenants, always keeping the hottest one
+
+        Called with the lock held; the evicted assistants are returned so
+        the caller can close them after releasing it.
+        """
+        evicted = []
+        while len(self._open) > 1 and (
+            len(self._open) > self.max_open
+            or sum(self._sizes.values()) > self.memory_budget_bytes
+        ):
+            tenant_id = next(iter(self._open))
+            evicted.append(self._remove(tenant_id))
+            self.stats["evictions"] += 1
+            logger.info(f"Evicted tenant {tenant_id} from open collections")
+        return evicted
+
+    def _remove(self, tenant_id):
+        self._sizes.pop(tenant_id, None)
+        return self._open.pop(tenant_id, None)
+
+    @staticmethod
+    def _close_all(assistants):
+        """Stop the watchers and search pools of closed assistants"""
+        for assistant in assistants:
+            assistant.close()
@@ -3,8 +3,19 @@ Utility functions for RAG Assistant
 """
 
 import os
+import hashlib
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+# Document types picked up from the documents folder
+SUPPORTED_EXTENSIONS = ('.txt', '.md', '.markdown')
+
+
+def is_supported_document(filename):
+    """Check whether a file name has a supported document extension"""
+    return filename.endswith(SUPPORTED_EXTENSIONS)
+
 
 def get_documents_from_folder(folder_path):
     """
@@ -22,11 +33,8 @@ def get_documents_from_folder(folder_path):
         os.makedirs(folder_path)
         return documents
     
-    # Supported extensions
-    extensions = ['.txt', '.md', '.markdown']
-    
     for file in os.listdir(folder_path):
-        if any(file.endswith(ext) for ext in extensions):
+        if is_supported_document(file):
             file_path = os.path.join(folder_path, file)
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
@@ -38,6 +46,71 @@ def get_documents_from_folder(folder_path):
     return documents
 
 
+def make_chunk_id(source, index, text):
+    """
+    Build a deterministic id for a chunk
+    
+    The content digest makes ids change when a chunk's text changes, so
+    re-indexing a file only replaces the chunks that actually differ.
+    
+    Args:
+        source: Source document filename
+        index: Position of the chunk within the document
+        text: Chunk text
+    
+    Returns:
+        Chunk id string
+    """
+    digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+    return f"{source}::{index}::{digest}"
+
+
+class ReadWriteLock:
+    """
+    Many-readers / single-writer lock
+    
+    Writers are preferred: once a writer is waiting, new readers queue
+    behind it so index updates are never starved by a steady query load.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading"""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively"""
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
 def format_sources(documents):
     """
     Format retrieved documents for display
@@ -0,0 +1,110 @@
+"""
+Embedding buffers for RAG Assistant
+Keeps embeddings in contiguous, aligned NumPy matrices instead of lists of floats
+"""
+
+import numpy as np
+
+from .config import EMBEDDING_DTYPE, EMBEDDING_BATCH_SIZE, VECTOR_ALIGNMENT
+
+# Rows scored at a time when a float16 matrix is widened to float32
+SIMILARITY_BLOCK_ROWS = 16384
+
+
+def aligned_empty(shape, dtype=EMBEDDING_DTYPE, alignment=VECTOR_ALIGNMENT):
+    """
+    Uninitialized C-contiguous array whose data starts on an aligned address
+
+    With rows a multiple of the alignment wide (384 float32 = 1536 bytes),
+    every row starts on a cache-line / SIMD-register boundary.
+    """
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+    raw = np.empty(count * dtype.itemsize + alignment, dtype=np.uint8)
+    offset = (-raw.ctypes.data) % alignment
+    return raw[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+
+
+def _model_batch(embeddings, texts):
+    """
+    One batch of embeddings as a NumPy array
+
+    Uses an embed_array method if the model has one, the
+    sentence-transformers client of HuggingFace embeddings directly, and
+    embed_documents (lists of floats) only as a fallback.
+    """
+    if hasattr(embeddings, "embed_array"):
+        return embeddings.embed_array(texts)
+    client = getattr(embeddings, "client", None)
+    if client is not None and hasattr(client, "encode") and not getattr(embeddings, "multi_process", False):
+        kwargs = dict(getattr(embeddings, "encode_kwargs", None) or {})
+        kwargs.update(convert_to_numpy=True, show_progress_bar=False)
+        return client.encode([text.replace("\n", " ") for text in texts], **kwargs)
+    return np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def _encode_into(embeddings, texts, out):
+    """Write embeddings of texts into the rows of out"""
+    if hasattr(embeddings, "embed_array"):
+        embeddings.embed_array(texts, out=out)
+    else:
+        np.copyto(out, _model_batch(embeddings, texts), casting="same_kind")
+
+
+def embed_matrix(embeddings, texts, dtype=EMBEDDING_DTYPE, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Embed texts into one preallocated, aligned matrix
+
+    Each batch goes from the model straight into its rows, with no Python
+    lists of floats in between (unless the model only offers
+    embed_documents).
+
+    Args:
+        embeddings: Embedding model
+        texts: Texts to embed
+        dtype: "float32" or "float16" (storage only; scoring widens to float32)
+        batch_size: Texts encoded per model call
+
+    Returns:
+        Array of shape (len(texts), dimension)
+    """
+    texts = list(texts)
+    if not texts:
+        return aligned_empty((0, 0), dtype)
+
+    # The first batch tells us the dimension, so the matrix can be sized
+    head = _model_batch(embeddings, texts[:batch_size])
+    matrix = aligned_empty((len(texts), head.shape[1]), dtype)
+    np.copyto(matrix[:len(head)], head, casting="same_kind")
+    for lo in range(len(head), len(texts), batch_size):
+        batch = texts[lo:lo + batch_size]
+        _encode_into(embeddings, batch, matrix[lo:lo + len(batch)])
+    return matrix
+
+
+def cosine_similarity(matrix, query):
+    """
+    Cosine similarity of each row of matrix to query, computed on the buffer
+
+    float32 matrices are multiplied in place; float16 ones are widened a
+    block at a time so no full-size float32 copy is made.
+
+    Returns:
+        1-D float32 array of scores
+    """
+    query = np.asarray(query, dtype=np.float32)
+    query_norm = np.linalg.norm(query) or 1.0
+    if matrix.dtype == np.float32:
+        return _block_scores(matrix, query, query_norm)
+
+    scores = np.empty(len(matrix), dtype=np.float32)
+    for lo in range(0, len(matrix), SIMILARITY_BLOCK_ROWS):
+        block = matrix[lo:lo + SIMILARITY_BLOCK_ROWS].astype(np.float32)
+        scores[lo:lo + len(block)] = _block_scores(block, query, query_norm)
+    return scores
+
+
+def _block_scores(block, query, query_norm):
+    norms = np.linalg.norm(block, axis=1) * query_norm
+    norms[norms == 0] = 1.0
+    return block @ query / norms
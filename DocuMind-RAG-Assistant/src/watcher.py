@@ -0,0 +1,213 @@
+"""
+Folder watcher for RAG Assistant
+Detects document changes and triggers debounced incremental re-indexing
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+
+from .config import WATCH_DEBOUNCE_SECONDS, WATCH_MAX_DELAY_SECONDS, WATCH_POLL_INTERVAL
+from .utils import is_supported_document
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _list_documents(folder):
+    """Map supported file names in folder to (mtime_ns, size)"""
+    entries = {}
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and is_supported_document(entry.name):
+                    stat = entry.stat()
+                    entries[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+class PollingBackend:
+    """Detect changes by comparing file mtimes and sizes between polls"""
+
+    name = "polling"
+
+    def __init__(self, folder, poll_interval=WATCH_POLL_INTERVAL):
+        self.folder = folder
+        self.poll_interval = poll_interval
+        self._snapshot = _list_documents(folder)
+
+    def wait(self, timeout):
+        """Block for up to timeout seconds and return changed file names"""
+        time.sleep(min(timeout, self.poll_interval))
+        current = _list_documents(self.folder)
+        changed = {
+            name for name in current.keys() | self._snapshot.keys()
+            if current.get(name) != self._snapshot.get(name)
+        }
+        self._snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Linux inotify backend using libc through ctypes"""
+
+    name = "inotify"
+
+    def __init__(self, folder):
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout):
+        """Block for up to timeout seconds and return changed file names"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; treat every document as changed
+                changed.update(_list_documents(self.folder))
+            elif name and is_supported_document(name):
+                changed.add(name)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_backend(folder, poll_interval=WATCH_POLL_INTERVAL):
+    """Use inotify where available, otherwise fall back to mtime polling"""
+    try:
+        return InotifyBackend(folder)
+    except (OSError, AttributeError) as e:
+        logger.info(f"inotify unavailable ({e}), falling back to polling")
+        return PollingBackend(folder, poll_interval)
+
+
+class DocumentWatcher:
+    """
+    Background thread that watches a folder and reports changed files
+
+    Bursts of events are debounced: a batch is flushed once no new event
+    has arrived for debounce_seconds, or once the oldest pending change
+    has waited max_delay_seconds, whichever comes first.
+    """
+
+    def __init__(self, folder, on_change, debounce_seconds=WATCH_DEBOUNCE_SECONDS,
+                 max_delay_seconds=WATCH_MAX_DELAY_SECONDS, backend=None):
+        """
+        Args:
+            folder: Folder to watch
+            on_change: Callable receiving the set of changed file names
+            debounce_seconds: Quiet period before a batch is flushed
+            max_delay_seconds: Upper bound on how long a change may wait
+            backend: Change detection backend (auto-selected if None)
+        """
+        self.folder = folder
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.backend = backend or create_backend(folder)
+        self.batches_processed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def backend_name(self):
+        return self.backend.name
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="document-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.folder} using {self.backend_name}")
+
+    def stop(self, timeout=5.0):
+        """Stop the watcher thread and release the backend"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.backend.close()
+
+    def _run(self):
+        pending = set()
+        first_event = last_event = 0.0
+
+        while not self._stop.is_set():
+            timeout = self.debounce_seconds if not pending else max(
+                0.05, self.debounce_seconds - (time.monotonic() - last_event)
+            )
+            try:
+                changed = self.backend.wait(timeout)
+            except Exception as e:
+                logger.error(f"Watcher error: {e}")
+                self._stop.wait(self.debounce_seconds)
+                continue
+
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first_event = now
+                pending |= changed
+                last_event = now
+
+            if pending and (
+                now - last_event >= self.debounce_seconds
+                or now - first_event >= self.max_delay_seconds
+            ):
+                batch, pending = pending, set()
+                try:
+                    self.on_change(batch)
+                    self.batches_processed += 1
+                except Exception as e:
+                    logger.error(f"Error re-indexing changed files {sorted(batch)}: {e}")
@@ -0,0 +1,117 @@
+"""
+Answer Cache Tests
+Key invalidation, expiry, eviction, warm-up and the batched query log
+"""
+
+import time
+
+from langchain_core.documents import Document
+
+from src.answer_cache import AnswerCache
+
+DOCS = [
+    Document(page_content="A VAE learns a latent distribution.", metadata={"source": "vae.txt", "chunk_id": 0}),
+    Document(page_content="Its loss adds a KL term.", metadata={"source": "vae.txt", "chunk_id": 1}),
+]
+
+
+def make_cache(path=":memory:", **kwargs):
+    kwargs.setdefault("ttl_seconds", None)
+    kwargs.setdefault("warm_queries", 0)
+    return AnswerCache(path=str(path), **kwargs)
+
+
+def query_log(cache):
+    return cache._conn.execute(
+        "SELECT question, asked FROM query_log ORDER BY asked DESC, question"
+    ).fetchall()
+
+
+def test_hit_needs_same_question_chunks_index_version_and_model():
+    cache = make_cache()
+    cache.put("docs", "What is a VAE?", DOCS, 1, "An autoencoder.", model="echo")
+
+    assert cache.get("docs", "  what is a vae ", list(reversed(DOCS)), 1, model="echo") == "An autoencoder."
+    assert cache.get("docs", "What is a VAE?", DOCS, 2, model="echo") is None
+    assert cache.get("docs", "What is a VAE?", DOCS[:1], 1, model="echo") is None
+    assert cache.get("docs", "What is a VAE?", DOCS, 1, model="groq") is None
+    assert cache.get("other", "What is a VAE?", DOCS, 1, model="echo") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 4
+
+
+def test_expired_answers_are_not_served_or_kept(tmp_path):
+    cache = make_cache(tmp_path / "cache.db", ttl_seconds=0.05)
+    cache.put("docs", "What is a VAE?", DOCS, 1, "An autoencoder.")
+    assert cache.get("docs", "What is a VAE?", DOCS, 1) == "An autoencoder."
+
+    time.sleep(0.1)
+    assert cache.get("docs", "What is a VAE?", DOCS, 1) is None
+    assert len(cache) == 0
+
+    cache.put("docs", "What is a KL term?", DOCS, 1, "A divergence.")
+    time.sleep(0.1)
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0 and query_log(cache) == []
+    cache.close()
+
+
+def test_least_recently_used_answers_are_evicted():
+    cache = make_cache(max_entries=2, memory_entries=1, flush_every=1000)
+    cache.put("docs", "first", DOCS, 1, "1")
+    cache.put("docs", "second", DOCS, 1, "2")
+
+    # Served from SQLite; the hit is only counted in memory until the next put
+    assert cache.get("docs", "first", DOCS, 1) == "1"
+    cache.put("docs", "third", DOCS, 1, "3")
+
+    assert len(cache) == 2
+    assert cache.stats["evictions"] == 1
+    assert cache.get("docs", "second", DOCS, 1) is None
+    assert cache.get("docs", "first", DOCS, 1) == "1"
+    assert cache.get("docs", "third", DOCS, 1) == "3"
+
+
+def test_frequent_answers_are_warmed_after_reopen(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = make_cache(path)
+    for question, asked in (("rare", 1), ("common", 5), ("middle", 3)):
+        cache.put("docs", question, DOCS, 1, question.upper())
+        for _ in range(asked):
+            cache.get("docs", question, DOCS, 1)
+    cache.close()
+
+    cache = make_cache(path, warm_queries=2)
+
+    assert cache.stats["warmed"] == 2
+    assert list(cache._memory.values())[-1][0] == "COMMON"
+    assert {answer for answer, _ in cache._memory.values()} == {"COMMON", "MIDDLE"}
+    cache.close()
+
+
+def test_lookups_are_logged_in_batches():
+    cache = make_cache(flush_every=3)
+    cache.put("docs", "What is a VAE?", DOCS, 1, "An autoencoder.")
+
+    cache.get("docs", "What is a VAE?", DOCS, 1)
+    cache.get("docs", "What is a VAE", DOCS, 1)
+    assert query_log(cache) == []
+
+    cache.get("docs", "Unknown question", DOCS, 1)
+    assert query_log(cache) == [("what is a vae", 2), ("unknown question", 1)]
+    hits = cache._conn.execute("SELECT hits FROM answers").fetchone()[0]
+    assert hits == 2
+
+    cache.get("docs", "Unknown question", DOCS, 1)
+    cache.flush()
+    assert query_log(cache) == [("unknown question", 2), ("what is a vae", 2)]
+
+
+def test_query_log_keeps_the_most_asked_questions():
+    cache = make_cache(query_log_entries=2)
+    for question, asked in (("rare", 1), ("common", 4), ("middle", 2)):
+        for _ in range(asked):
+            cache.get("docs", question, DOCS, 1)
+
+    cache.purge_expired()
+
+    assert query_log(cache) == [("common", 4), ("middle", 2)]
@@ -0,0 +1,89 @@
+"""
+Chunker Equivalence Tests
+Checks TextChunker against LangChain's RecursiveCharacterTextSplitter
+"""
+
+import os
+import random
+
+import pytest
+
+from src.chunker import TextChunker
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP
+from src.utils import get_documents_from_folder
+
+text_splitters = pytest.importorskip("langchain_text_splitters")
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "data", "sample_documents")
+
+# Fragments chosen to exercise every separator level and whitespace stripping
+FRAGMENTS = ["word", "ab", "x", " ", "  ", "\t", "\n", "\n\n", "\n\n\n", " \n ", "émoji 🎉"]
+
+
+def langchain_chunks(text, chunk_size, chunk_overlap, separators=None):
+    """Reference chunks from the LangChain splitter"""
+    kwargs = {"separators": separators} if separators is not None else {}
+    splitter = text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs
+    )
+    return splitter.split_text(text)
+
+
+def test_sample_documents_match():
+    """Sample documents chunk identically with the configured settings"""
+    documents = get_documents_from_folder(SAMPLE_DIR)
+    assert documents, "Sample documents should be present"
+
+    chunker = TextChunker(CHUNK_SIZE, CHUNK_OVERLAP)
+    for filename, content in documents:
+        assert chunker.split_text(content) == langchain_chunks(content, CHUNK_SIZE, CHUNK_OVERLAP), filename
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(100, 0), (200, 20), (1000, 100), (50, 49)])
+def test_sample_documents_match_other_sizes(chunk_size, chunk_overlap):
+    """Equivalence holds for other size/overlap combinations"""
+    chunker = TextChunker(chunk_size, chunk_overlap)
+    for filename, content in get_documents_from_folder(SAMPLE_DIR):
+        assert chunker.split_text(content) == langchain_chunks(content, chunk_size, chunk_overlap), filename
+
+
+def test_randomized_texts_match():
+    """Random separator-heavy texts, sizes and overlaps chunk identically"""
+    rng = random.Random(1234)
+    for _ in range(2000):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 300)))
+        chunk_size = rng.randint(1, 80)
+        chunk_overlap = rng.randint(0, chunk_size)
+        assert TextChunker(chunk_size, chunk_overlap).split_text(text) == \
+            langchain_chunks(text, chunk_size, chunk_overlap), repr(text)
+
+
+def test_custom_separators_match():
+    """Multi-character separators below the top level chunk identically"""
+    rng = random.Random(99)
+    separators = ["\n\n\n", "ab", "\n", " ", ""]
+    for _ in range(500):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 200)))
+        chunk_size = rng.randint(2, 40)
+        chunk_overlap = rng.randint(0, chunk_size // 2)
+        expected = langchain_chunks(text, chunk_size, chunk_overlap, separators)
+        assert TextChunker(chunk_size, chunk_overlap, separators).split_text(text) == expected
+
+
+def test_memoryview_and_streaming():
+    """memoryview input and the streaming interface give the same chunks"""
+    content = get_documents_from_folder(SAMPLE_DIR)[0][1]
+    chunker = TextChunker()
+    expected = chunker.split_text(content)
+
+    assert chunker.split_text(memoryview(content.encode("utf-8"))) == expected
+
+    stream = chunker.iter_chunks(content)
+    assert next(stream) == expected[0]
+    assert [expected[0]] + list(stream) == expected
+
+
+def test_invalid_overlap_rejected():
+    """Overlap larger than chunk size is rejected like LangChain does"""
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=10, chunk_overlap=20)
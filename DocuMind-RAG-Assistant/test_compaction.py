@@ -0,0 +1,119 @@
+"""
+Compaction Tests
+Tombstoned deletes, compaction and restoring a deleted document
+
+Runs offline against an in-memory Chroma client, like test_edge_cases.py.
+"""
+
+import os
+import uuid
+
+import chromadb
+from chromadb.config import Settings
+
+import src.rag_system as rag_system
+from src.rag_system import RAGAssistant
+from src.backends import create_llm
+from src.offline import HashingEmbeddings
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "data", "sample_documents")
+DELETED = "document1_vae.md"
+KEPT = "document2_agentic_ai.md"
+
+CHROMA_CLIENT = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+
+def make_assistant(collection_name=None):
+    """Offline assistant over the sample documents in its own collection"""
+    rag = RAGAssistant(
+        documents_folder=SAMPLE_DIR,
+        llm=create_llm("echo"),
+        embeddings=HashingEmbeddings(),
+        collection_name=collection_name or f"compaction_{uuid.uuid4().hex}",
+        chroma_client=CHROMA_CLIENT,
+        answer_cache=False
+    )
+    if collection_name is None:
+        rag.load_documents()
+    return rag
+
+
+def stored(rag):
+    return rag.vectorstore._collection.count()
+
+
+def sources(rag, query, k=10):
+    return {doc.metadata["source"] for doc in rag.retrieve_relevant(query, k=k, multi_query=False)}
+
+
+def test_delete_compact_and_restore():
+    rag = make_assistant()
+    total = stored(rag)
+    deleted_chunks = len(rag._live_ids(DELETED))
+    assert deleted_chunks and DELETED in sources(rag, "What is a VAE?")
+
+    # Delete: hidden at once, storage kept until compaction
+    version = rag.index_version
+    assert rag.delete_source(DELETED) == deleted_chunks
+    assert rag.index_version == version + 1
+    assert stored(rag) == total
+    assert rag.tombstone_ratio() == deleted_chunks / total
+    assert sources(rag, "What is a VAE?") == {KEPT}
+
+    # Compact: storage reclaimed, results and index version unchanged
+    assert rag.compact() == deleted_chunks
+    assert stored(rag) == total - deleted_chunks
+    assert rag.tombstone_ratio() == 0.0
+    assert rag.index_version == version + 1
+    assert rag.compaction_stats["compactions"] == 1
+    assert rag.compaction_stats["reclaimed_chunks"] == deleted_chunks
+    assert sources(rag, "What is a VAE?") == {KEPT}
+    names = {c.name for c in CHROMA_CLIENT.list_collections()}
+    assert rag.collection_name in names
+    assert not {f"{rag.collection_name}-compacting", f"{rag.collection_name}-retired"} & names
+
+    # Restore: the document comes back with the same chunk ids
+    assert rag.update_source(DELETED) == deleted_chunks
+    assert stored(rag) == total
+    assert DELETED in sources(rag, "What is a VAE?")
+
+
+def test_tombstones_survive_reopen_and_compact_after_it():
+    rag = make_assistant()
+    total = stored(rag)
+    deleted_chunks = rag.delete_source(DELETED)
+
+    reopened = make_assistant(rag.collection_name)
+
+    assert reopened._tombstones == rag._tombstones
+    assert reopened.index_version == rag.index_version
+    assert sources(reopened, "What is a VAE?") == {KEPT}
+    assert reopened.compact() == deleted_chunks
+    assert stored(reopened) == total - deleted_chunks
+
+
+def test_restoring_before_compaction_revives_tombstoned_chunks():
+    rag = make_assistant()
+    total = stored(rag)
+    rag.delete_source(DELETED)
+
+    rag.update_source(DELETED)
+
+    assert rag.tombstone_ratio() == 0.0
+    assert rag.compact() == 0
+    assert stored(rag) == total
+    assert DELETED in sources(rag, "What is a VAE?")
+
+
+def test_compaction_starts_in_background_past_the_threshold(monkeypatch):
+    monkeypatch.setattr(rag_system, "COMPACTION_MIN_TOMBSTONES", 1)
+    monkeypatch.setattr(rag_system, "COMPACTION_TOMBSTONE_RATIO", 0.01)
+    rag = make_assistant()
+    total = stored(rag)
+
+    deleted_chunks = rag.delete_source(DELETED)
+    rag._compaction_thread.join(timeout=30)
+
+    assert rag.compaction_stats["compactions"] == 1
+    assert stored(rag) == total - deleted_chunks
+    assert sources(rag, "What is a VAE?") == {KEPT}
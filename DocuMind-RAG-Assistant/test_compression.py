@@ -0,0 +1,152 @@
+"""
+Compression Tests
+Sentence splitting and selection of query-relevant sentences for the prompt
+
+A fake embedder gives every sentence a chosen cosine similarity to the
+query, so which sentences are kept is fully determined by the test.
+"""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.compression import compress_documents
+from src.extractive import split_sentences
+
+QUERY = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+
+class ScoredEmbeddings:
+    """Embeds each known sentence at its given cosine similarity to QUERY"""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[score, np.sqrt(1 - score ** 2), 0.0] for score in (self.scores[text] for text in texts)]
+
+
+def document(doc_id, *sentences):
+    return Document(page_content=" ".join(sentences), metadata={"source": f"{doc_id}.md", "chunk_id": 0}, id=doc_id)
+
+
+A = [f"Sentence {i} of the first chunk is here." for i in range(5)]
+B = [f"Sentence {i} of the second chunk is here." for i in range(3)]
+
+
+def compress(scores, documents, **kwargs):
+    kwargs.setdefault("cutoff", 0.5)
+    kwargs.setdefault("neighbours", 0)
+    kwargs.setdefault("min_sentences", 0)
+    return compress_documents(QUERY, documents, ScoredEmbeddings(scores), **kwargs)
+
+
+# ----- split_sentences -----
+
+def test_split_sentences_on_ends_blank_lines_and_list_items():
+    text = (
+        "# Variational Autoencoders\n\n"
+        "A VAE learns a latent distribution. It is trained with the ELBO!\n\n"
+        "Is the KL term   needed?   Yes, it regularizes the latent space.\n"
+        "- The encoder outputs a mean and a variance.\n"
+        "1. The decoder reconstructs the input.\n"
+        "Too short."
+    )
+
+    assert split_sentences(text) == [
+        "A VAE learns a latent distribution.",
+        "It is trained with the ELBO!",
+        "Is the KL term needed?",
+        "Yes, it regularizes the latent space.",
+        "The encoder outputs a mean and a variance.",
+        "The decoder reconstructs the input.",
+    ]
+
+
+def test_split_sentences_of_nothing():
+    assert split_sentences("") == []
+    assert split_sentences(None) == []
+
+
+# ----- compress_documents -----
+
+def test_keeps_relevant_sentences_in_document_order():
+    scores = dict.fromkeys(A + B, 0.1)
+    scores.update({A[3]: 0.9, A[1]: 0.6})
+
+    result = compress(scores, [document("a", *A), document("b", *B)])
+
+    assert [doc.page_content for doc in result["documents"]] == [f"{A[1]} {A[3]}"]
+    assert [doc.id for doc in result["sources"]] == ["a"]
+
+
+def test_neighbours_are_kept_within_the_chunk():
+    scores = dict.fromkeys(A + B, 0.1)
+    scores.update({A[4]: 0.9, B[0]: 0.8})
+
+    result = compress(scores, [document("a", *A), document("b", *B)], neighbours=1)
+
+    assert [doc.page_content for doc in result["documents"]] == [
+        f"{A[3]} {A[4]}",
+        f"{B[0]} {B[1]}",
+    ]
+
+
+def test_min_sentences_keeps_the_best_below_the_cutoff():
+    scores = {A[0]: 0.2, A[1]: 0.1, A[2]: 0.4, A[3]: 0.0, A[4]: 0.3}
+
+    result = compress(scores, [document("a", *A)], min_sentences=2)
+
+    # The two best, but in their original order rather than by score
+    assert result["documents"][0].page_content == f"{A[2]} {A[4]}"
+
+
+def test_cutoff_and_min_sentences_bound_what_is_kept():
+    scores = {sentence: 0.1 * i for i, sentence in enumerate(A)}
+
+    assert compress(scores, [document("a", *A)], cutoff=0.25)["documents"][0].page_content == f"{A[3]} {A[4]}"
+    assert compress(scores, [document("a", *A)], cutoff=1.1)["documents"] == []
+    assert compress(scores, [document("a", *A)], cutoff=0.0)["ratio"] == pytest.approx(1.0)
+
+
+def test_metadata_id_and_sizes_are_reported():
+    scores = dict.fromkeys(A, 0.1)
+    scores[A[0]] = 0.9
+    original = document("a", *A)
+
+    result = compress(scores, [original])
+
+    compressed = result["documents"][0]
+    assert compressed.id == "a" and compressed.metadata == original.metadata
+    assert compressed.metadata is not original.metadata
+    assert result["original_chars"] == len(original.page_content)
+    assert result["compressed_chars"] == len(A[0])
+    assert result["ratio"] == pytest.approx(len(A[0]) / len(original.page_content))
+
+
+def test_sentence_cache_and_scored_skip_embedding():
+    scores = dict.fromkeys(A + B, 0.1)
+    scores[A[2]] = 0.9
+    documents = [document("a", *A), document("b", *B)]
+    embeddings = ScoredEmbeddings(scores)
+    cache = {}
+
+    first = compress_documents(QUERY, documents, embeddings, cache=cache, cutoff=0.5, neighbours=0, min_sentences=0)
+    assert set(cache) == {"a", "b"} and len(embeddings.embedded) == len(A + B)
+
+    second = compress_documents(QUERY, documents, embeddings, cache=cache, cutoff=0.5, neighbours=0, min_sentences=0)
+    reused = compress_documents(QUERY, documents, embeddings, scored=first["scored"],
+                                cutoff=0.5, neighbours=0, min_sentences=0)
+
+    assert len(embeddings.embedded) == len(A + B)
+    assert [doc.page_content for doc in second["documents"]] == [A[2]]
+    assert [doc.page_content for doc in reused["documents"]] == [A[2]]
+
+
+def test_no_documents():
+    result = compress({}, [])
+
+    assert result["documents"] == [] and result["sources"] == []
+    assert result["ratio"] == 1.0
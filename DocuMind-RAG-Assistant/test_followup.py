@@ -0,0 +1,181 @@
+"""
+Follow-up Tests
+Follow-up detection, chunk reuse and its invalidation on re-indexing
+
+Runs offline: the echo LLM, the hashing embedder and an in-memory Chroma
+client, like test_edge_cases.py.
+"""
+
+import os
+import uuid
+
+import chromadb
+import numpy as np
+import pytest
+from chromadb.config import Settings
+from langchain_core.documents import Document
+
+from src.rag_system import RAGAssistant
+from src.backends import create_llm
+from src.followup import SessionRetrievalCache
+from src.extractive import sentence_vectors
+from src.offline import HashingEmbeddings
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "data", "sample_documents")
+
+CHROMA_CLIENT = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+
+def make_assistant():
+    """Offline assistant over the sample documents in its own collection"""
+    rag = RAGAssistant(
+        documents_folder=SAMPLE_DIR,
+        llm=create_llm("echo"),
+        embeddings=HashingEmbeddings(),
+        collection_name=f"followup_{uuid.uuid4().hex}",
+        chroma_client=CHROMA_CLIENT,
+        answer_cache=False
+    )
+    rag.load_documents()
+    return rag
+
+
+def unit_at(cosine):
+    """Unit vector whose cosine similarity with [1, 0, 0] is cosine"""
+    return np.array([cosine, np.sqrt(1 - cosine ** 2), 0.0], dtype=np.float32)
+
+
+def chunk(doc_id, text):
+    return Document(page_content=text, metadata={"source": "notes.md"}, id=doc_id)
+
+
+# ----- SessionRetrievalCache -----
+
+def test_first_turn_is_never_a_follow_up():
+    assert not SessionRetrievalCache().is_follow_up(unit_at(1.0), index_version=1)
+
+
+def test_follow_up_threshold():
+    session = SessionRetrievalCache(threshold=0.45)
+    session.remember(unit_at(1.0), [], index_version=1)
+
+    assert session.is_follow_up(unit_at(1.0), 1)
+    assert session.is_follow_up(unit_at(0.5) * 3, 1)  # Scale does not matter
+    assert not session.is_follow_up(unit_at(0.4), 1)
+    assert not session.is_follow_up(unit_at(-1.0), 1)
+
+
+def test_new_index_version_ends_reuse():
+    session = SessionRetrievalCache()
+    session.remember(unit_at(1.0), [], index_version=1)
+
+    assert not session.is_follow_up(unit_at(1.0), 2)
+
+    session.reset()
+    assert not session.is_follow_up(unit_at(1.0), 1)
+
+
+def test_chunk_centroid_is_an_anchor_too():
+    embeddings = HashingEmbeddings()
+    text = "The VAE encoder maps inputs to a latent distribution."
+    documents = [chunk("vae-1", text)]
+    session = SessionRetrievalCache(threshold=0.45)
+    sentence_vectors(documents, embeddings, session.sentence_cache)
+
+    session.remember(embeddings.embed_query("Tell me about agents"), documents, index_version=1)
+
+    assert len(session.previous["anchors"]) == 2
+    assert session.is_follow_up(embeddings.embed_query(text), 1)
+
+
+def test_merge_deduplicates_and_ranks_by_best_sentence():
+    embeddings = HashingEmbeddings()
+    previous = [chunk("kl", "The KL term regularizes the latent space."), chunk("gan", "GANs use a discriminator.")]
+    delta = [chunk("kl", "The KL term regularizes the latent space."),
+             chunk("loss", "The VAE loss adds reconstruction error and the KL term.")]
+    session = SessionRetrievalCache()
+    session.remember(embeddings.embed_query("What is the KL term?"), previous, index_version=1)
+
+    merged = session.merge(embeddings.embed_query("What is the VAE loss?"), delta, 2, embeddings)
+
+    assert [doc.id for doc in merged] == ["loss", "kl"]
+    assert set(session.sentence_cache) == {"kl", "gan", "loss"}
+
+
+def test_remember_keeps_sentences_of_reusable_chunks_only():
+    embeddings = HashingEmbeddings()
+    docs = [chunk("a", "Alpha sentence."), chunk("b", "Beta sentence.")]
+    session = SessionRetrievalCache()
+    session.remember(unit_at(1.0), docs, 1)
+    session.merge(embeddings.embed_query("alpha"), [], 2, embeddings)
+
+    session.remember(embeddings.embed_query("alpha"), docs[:1], 1)
+
+    assert set(session.sentence_cache) == {"a"}
+
+
+def test_summary_reports_reuse_rate_and_time_saved():
+    session = SessionRetrievalCache()
+    session.record(False, 0.030)
+    session.record(False, 0.050)
+    session.record(True, 0.010)
+
+    summary = session.summary()
+
+    assert summary["turns"] == 3 and summary["reused"] == 1
+    assert summary["reuse_rate"] == pytest.approx(1 / 3)
+    assert summary["avg_full_ms"] == pytest.approx(40.0)
+    assert summary["avg_reuse_ms"] == pytest.approx(10.0)
+    assert summary["saved_ms"] == pytest.approx(30.0)
+    assert SessionRetrievalCache().summary()["saved_ms"] == 0.0
+
+
+# ----- RAGAssistant.query(follow_up=True) -----
+
+def test_query_reuses_chunks_for_a_follow_up():
+    rag = make_assistant()
+
+    _, first = rag.query("What is a VAE?", follow_up=True)
+    assert not rag.last_query_info["follow_up"]
+    _, second = rag.query("What is a VAE exactly?", follow_up=True)
+
+    assert rag.last_query_info["follow_up"]
+    assert {doc.metadata["source"] for doc in second} == {"document1_vae.md"}
+    assert len(second) == len(first)
+    assert rag.session.stats["turns"] == 2 and rag.session.stats["reused"] == 1
+    assert rag.session.previous["documents"] == second
+    assert rag.session.previous["index_version"] == rag.index_version
+
+
+def test_topic_change_is_a_full_search():
+    rag = make_assistant()
+    rag.query("What is a VAE?", follow_up=True)
+
+    _, sources = rag.query("What is agentic AI?", follow_up=True)
+
+    assert not rag.last_query_info["follow_up"]
+    assert {doc.metadata["source"] for doc in sources} == {"document2_agentic_ai.md"}
+    assert rag.session.stats["turns"] == 2 and rag.session.stats["reused"] == 0
+
+
+def test_reindexing_invalidates_reuse():
+    rag = make_assistant()
+    _, first = rag.query("What is a VAE?", follow_up=True)
+    assert {doc.metadata["source"] for doc in first} == {"document1_vae.md"}
+
+    rag.delete_source("document1_vae.md")
+    _, sources = rag.query("What is a VAE exactly?", follow_up=True)
+
+    assert not rag.last_query_info["follow_up"]
+    assert "document1_vae.md" not in {doc.metadata["source"] for doc in sources}
+    assert rag.session.stats["reused"] == 0
+
+
+def test_plain_queries_leave_the_session_alone():
+    rag = make_assistant()
+
+    rag.query("What is a VAE?")
+    rag.query("What is a VAE exactly?")
+
+    assert rag.session.previous is None
+    assert rag.session.stats["turns"] == 0
@@ -0,0 +1,277 @@
+"""
+Governor Tests
+Token buckets, circuit breaker, Retry-After parsing, AIMD and retries
+
+A fake clock replaces the governor's time module, so nothing sleeps.
+"""
+
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import pytest
+
+import src.governor as governor
+from src.deadline import Deadline, DeadlineExceeded
+from src.governor import (
+    TokenBucket, CircuitBreaker, CircuitOpenError, RequestGovernor,
+    RetriesExhaustedError, retry_after_seconds
+)
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() only advances the clock"""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class APIError(Exception):
+    """API exception shaped like the Groq/OpenAI client errors"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = Response(status_code, headers)
+
+
+class Script:
+    """Zero-argument func for RequestGovernor.call: raises or returns items in order"""
+
+    def __init__(self, *items):
+        self.items = list(items)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        item = self.items.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(governor, "time", clock)
+    return clock
+
+
+def make_governor(**kwargs):
+    kwargs.setdefault("requests_per_minute", 60)
+    kwargs.setdefault("tokens_per_minute", 6000)
+    kwargs.setdefault("backoff_base", 0.0)
+    return RequestGovernor(**kwargs)
+
+
+# ----- TokenBucket -----
+
+def test_bucket_waits_for_the_deficit_and_refills(clock):
+    bucket = TokenBucket(60)  # 1 token per second
+
+    assert bucket.reserve(50) == 0.0
+    assert bucket.reserve(20) == pytest.approx(10.0)
+
+    clock.now += 10
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_caps_tokens_and_reservations_at_capacity(clock):
+    bucket = TokenBucket(60, capacity=10)
+
+    clock.now += 3600
+    assert bucket.reserve(10) == 0.0
+    bucket.refund(100)
+    assert bucket.reserve(500) == 0.0  # More than capacity waits no longer than a full bucket
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_rate_change_keeps_accrued_tokens(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+
+    clock.now += 30
+    bucket.set_rate(120)
+
+    assert bucket.reserve(30) == 0.0
+    assert bucket.reserve(2) == pytest.approx(1.0)
+
+
+# ----- CircuitBreaker -----
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()  # Resets the count
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened_count == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_probe_through_after_recovery(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10)
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened_count == 2
+    clock.now += 9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+
+    breaker.release_probe()
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+# ----- retry_after_seconds -----
+
+def test_retry_after_seconds_and_http_date(clock):
+    assert retry_after_seconds(APIError(429, retry_after=7)) == 7.0
+    assert retry_after_seconds(APIError(429, retry_after="-3")) == 0.0
+
+    later = datetime.fromtimestamp(clock.now + 20, tz=timezone.utc)
+    assert retry_after_seconds(APIError(503, retry_after=format_datetime(later, usegmt=True))) == pytest.approx(20)
+
+
+def test_retry_after_missing_or_invalid():
+    assert retry_after_seconds(ValueError("no response")) is None
+    assert retry_after_seconds(APIError(429)) is None
+    assert retry_after_seconds(APIError(429, retry_after="soon")) is None
+
+
+# ----- RequestGovernor -----
+
+def test_request_rate_halves_on_429_and_recovers_one_per_success(clock):
+    gov = make_governor(requests_per_minute=8)
+
+    gov._adapt_rate(rate_limited=True)
+    gov._adapt_rate(rate_limited=True)
+    assert gov.request_bucket.rate_per_minute == 2.0
+
+    for _ in range(10):
+        gov._adapt_rate(rate_limited=False)
+    assert gov.request_bucket.rate_per_minute == 8.0
+
+    for _ in range(10):
+        gov._adapt_rate(rate_limited=True)
+    assert gov.request_bucket.rate_per_minute == 1.0
+
+
+def test_retries_do_not_drain_the_token_bucket(clock):
+    gov = make_governor()
+    func = Script(APIError(429, retry_after=0), APIError(503), ConnectionError("reset"), "answer")
+
+    result = gov.call(func, estimated_tokens=1000, usage_of=lambda _: 100)
+
+    assert result == "answer" and func.calls == 4
+    assert gov.token_bucket._tokens == pytest.approx(6000 - 100, abs=1)
+    metrics = gov.metrics()
+    assert metrics["retries"] == 3 and metrics["rate_limited"] == 1
+    assert metrics["tokens_used"] == 100
+
+
+def test_non_transient_error_refunds_and_is_raised_as_is(clock):
+    gov = make_governor()
+    error = APIError(400)
+
+    with pytest.raises(APIError) as raised:
+        gov.call(Script(error), estimated_tokens=1000)
+
+    assert raised.value is error
+    assert gov.token_bucket._tokens == pytest.approx(6000)
+    assert gov.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_exhausted_keeps_the_last_error(clock):
+    gov = make_governor(max_retries=2)
+    func = Script(*[APIError(503)] * 3)
+
+    with pytest.raises(RetriesExhaustedError) as raised:
+        gov.call(func, estimated_tokens=500)
+
+    assert func.calls == 3
+    assert raised.value.status_code == 503
+    assert gov.token_bucket._tokens == pytest.approx(6000)
+
+
+def test_retry_waits_at_least_retry_after(clock):
+    gov = make_governor()
+
+    gov.call(Script(APIError(429, retry_after=12), "answer"))
+
+    assert 12 in clock.slept
+
+
+def test_open_circuit_fails_fast(clock):
+    gov = make_governor(breaker=CircuitBreaker(failure_threshold=2, recovery_seconds=30), max_retries=1)
+    with pytest.raises(RetriesExhaustedError):
+        gov.call(Script(APIError(503), APIError(503)))
+
+    func = Script("answer")
+    with pytest.raises(CircuitOpenError):
+        gov.call(func)
+
+    assert func.calls == 0
+    assert gov.metrics()["circuit_rejections"] == 1
+
+
+def test_throttle_wait_past_the_deadline_gives_up_and_refunds(clock):
+    gov = make_governor(tokens_per_minute=600)
+    gov.token_bucket.reserve(600)
+
+    with pytest.raises(DeadlineExceeded):
+        gov.call(Script("answer"), estimated_tokens=100, deadline=Deadline(5))
+
+    assert gov.token_bucket._tokens == pytest.approx(0)
+    assert gov.metrics()["deadline_exceeded"] == 1
@@ -0,0 +1,96 @@
+"""
+Multi-query Tests
+Rule-based query variants, LLM rewrites and reciprocal-rank fusion
+"""
+
+import pytest
+from langchain_core.documents import Document
+
+from src.multi_query import rule_based_variants, llm_variants, reciprocal_rank_fusion
+from src.offline import ScriptedLLM
+
+
+def chunk(source, chunk_id, text=None, doc_id=None):
+    return Document(page_content=text or f"{source} #{chunk_id}",
+                    metadata={"source": source, "chunk_id": chunk_id}, id=doc_id)
+
+
+# ----- rule_based_variants -----
+
+def test_variants_drop_question_prefix_and_stopwords():
+    assert rule_based_variants("What are variational autoencoders?") == [
+        "variational autoencoders",
+        "variational autoencoder",
+    ]
+    assert rule_based_variants("Can you explain the KL divergence term in VAEs?") == [
+        "the KL divergence term in VAEs",
+        "kl divergence term vaes",
+        "kl divergence term vae",
+    ]
+
+
+def test_variants_exclude_the_query_and_duplicates():
+    assert rule_based_variants("attention heads") == ["attention head"]
+    assert rule_based_variants("Attention") == []
+    assert rule_based_variants("What is the class loss?") == ["the class loss", "class loss"]
+
+
+def test_variants_respect_max_variants():
+    query = "Can you explain the KL divergence term in VAEs?"
+    assert rule_based_variants(query, max_variants=1) == ["the KL divergence term in VAEs"]
+    assert rule_based_variants(query, max_variants=0) == []
+
+
+# ----- llm_variants -----
+
+def test_llm_variants_strip_numbering_and_blank_lines():
+    llm = ScriptedLLM(["1. VAE loss function\n\n- ELBO objective\n* KL term in VAEs\n4) extra"])
+    assert llm_variants(llm, "What is the VAE loss?", n=3) == [
+        "VAE loss function", "ELBO objective", "KL term in VAEs"
+    ]
+
+
+def test_llm_variants_failure_yields_none():
+    llm = ScriptedLLM([ConnectionError("API down")])
+    assert llm_variants(llm, "What is the VAE loss?") == []
+
+
+# ----- reciprocal_rank_fusion -----
+
+def test_fusion_ranks_documents_found_by_several_queries_first():
+    a, b, c, d = (chunk("doc.md", i) for i in range(4))
+
+    fused = reciprocal_rank_fusion([[a, b, c], [c, d], [d, c]], k=60)
+
+    assert [doc for doc, _ in fused] == [c, d, a, b]
+    scores = dict((doc.metadata["chunk_id"], score) for doc, score in fused)
+    assert scores[2] == pytest.approx(1 / 63 + 1 / 61 + 1 / 62)
+    assert scores[3] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores[0] == pytest.approx(1 / 61)
+
+
+def test_fusion_breaks_ties_by_first_appearance():
+    a, b = chunk("a.md", 0), chunk("b.md", 0)
+
+    assert [doc for doc, _ in reciprocal_rank_fusion([[a, b], [b, a]])] == [a, b]
+    assert [doc for doc, _ in reciprocal_rank_fusion([[b, a], [a, b]])] == [b, a]
+
+
+def test_fusion_deduplicates_by_id_then_by_source_chunk_and_text():
+    by_id = chunk("doc.md", 0, doc_id="chunk-1")
+    same_id = chunk("doc.md", 0, text="different text", doc_id="chunk-1")
+    no_id = chunk("doc.md", 1)
+    same_chunk = chunk("doc.md", 1)
+    other_text = chunk("doc.md", 1, text="edited")
+
+    fused = reciprocal_rank_fusion([[by_id, no_id], [same_id, same_chunk, other_text]], k=60)
+
+    assert [doc for doc, _ in fused] == [by_id, no_id, other_text]
+    assert fused[0][0] is by_id and fused[1][0] is no_id
+    assert fused[0][1] == pytest.approx(2 / 61)
+    assert fused[1][1] == pytest.approx(2 / 62)
+
+
+def test_fusion_of_nothing_is_empty():
+    assert reciprocal_rank_fusion([]) == []
+    assert reciprocal_rank_fusion([[], []]) == []
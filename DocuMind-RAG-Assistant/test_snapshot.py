@@ -0,0 +1,204 @@
+"""
+Snapshot Tests
+Export/import round trips, compatibility and integrity checks, atomic replacement
+
+Runs offline against an in-memory Chroma client, like test_edge_cases.py.
+"""
+
+import os
+import json
+import uuid
+
+import chromadb
+import pytest
+from chromadb.config import Settings
+
+import src.snapshot as snapshot
+from src.rag_system import RAGAssistant
+from src.backends import create_llm
+from src.offline import HashingEmbeddings
+from src.snapshot import SnapshotError, open_snapshot
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "data", "sample_documents")
+
+CHROMA_CLIENT = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+
+def make_assistant(load=True):
+    """Offline assistant in its own collection, optionally indexed"""
+    rag = RAGAssistant(
+        documents_folder=SAMPLE_DIR,
+        llm=create_llm("echo"),
+        embeddings=HashingEmbeddings(),
+        collection_name=f"snapshot_{uuid.uuid4().hex}",
+        chroma_client=CHROMA_CLIENT,
+        answer_cache=False
+    )
+    if load:
+        rag.load_documents()
+    return rag
+
+
+def collection_rows(rag):
+    """Every record of the assistant's collection, by id"""
+    rows = rag.vectorstore._collection.get(include=["embeddings", "documents", "metadatas"])
+    return {
+        chunk_id: (document, metadata, list(embedding))
+        for chunk_id, document, metadata, embedding in zip(
+            rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"]
+        )
+    }
+
+
+@pytest.fixture
+def hashing_backend(monkeypatch):
+    """Run with the hashing backend configured, as an offline replica would"""
+    monkeypatch.setattr(snapshot, "EMBEDDING_BACKEND", "hashing")
+    return monkeypatch
+
+
+def test_bundle_from_another_embedding_backend_is_refused(tmp_path, hashing_backend):
+    bundle = str(tmp_path / "bundle")
+    make_assistant().export_snapshot(bundle)
+    assert open_snapshot(bundle).manifest["config"]["EMBEDDING_BACKEND"] == "hashing"
+
+    hashing_backend.setattr(snapshot, "EMBEDDING_BACKEND", "huggingface")
+    replica = make_assistant(load=False)
+
+    with pytest.raises(SnapshotError, match="EMBEDDING_BACKEND"):
+        replica.import_snapshot(bundle)
+    assert replica.vectorstore._collection.count() == 0
+
+
+def test_bundle_with_another_hashing_dimension_is_refused(tmp_path, hashing_backend):
+    bundle = str(tmp_path / "bundle")
+    make_assistant().export_snapshot(bundle)
+
+    hashing_backend.setattr(snapshot, "HASHING_EMBEDDING_DIM", 512)
+
+    with pytest.raises(SnapshotError, match="HASHING_EMBEDDING_DIM"):
+        open_snapshot(bundle)
+
+
+def test_round_trip_restores_ids_documents_metadata_and_embeddings(tmp_path):
+    source = make_assistant()
+    bundle = str(tmp_path / "bundle")
+
+    manifest = source.export_snapshot(bundle)
+
+    assert manifest["count"] == source.vectorstore._collection.count()
+    assert manifest["dimension"] == HashingEmbeddings().dimension
+    assert sorted(os.listdir(bundle)) == sorted(
+        [snapshot.MANIFEST_FILE, snapshot.CONFIG_FILE, snapshot.EMBEDDINGS_FILE, snapshot.RECORDS_FILE]
+    )
+
+    replica = make_assistant(load=False)
+    version = replica.index_version
+    assert replica.import_snapshot(bundle) == manifest["count"]
+
+    expected = collection_rows(source)
+    assert collection_rows(replica).keys() == expected.keys()
+    for chunk_id, (document, metadata, embedding) in collection_rows(replica).items():
+        assert (document, metadata) == expected[chunk_id][:2]
+        assert embedding == pytest.approx(expected[chunk_id][2])
+    assert replica.index_version == version + 1
+    assert [doc.page_content for doc in replica.retrieve_relevant("What is a VAE?")] == \
+        [doc.page_content for doc in source.retrieve_relevant("What is a VAE?")]
+
+
+def test_small_batches_round_trip(tmp_path):
+    source = make_assistant()
+    bundle = str(tmp_path / "bundle")
+    snapshot.export_snapshot(source.vectorstore, bundle, batch_size=3)
+
+    replica = make_assistant(load=False)
+    assert snapshot.import_snapshot(replica.vectorstore, bundle, batch_size=4) == len(collection_rows(source))
+
+    assert collection_rows(replica).keys() == collection_rows(source).keys()
+
+
+def test_bundle_with_other_chunking_is_refused(tmp_path, monkeypatch):
+    bundle = str(tmp_path / "bundle")
+    make_assistant().export_snapshot(bundle)
+
+    monkeypatch.setattr(snapshot, "CHUNK_SIZE", snapshot.CHUNK_SIZE + 100)
+
+    with pytest.raises(SnapshotError, match="CHUNK_SIZE"):
+        open_snapshot(bundle)
+
+
+@pytest.mark.parametrize("damage", ["flip", "truncate", "delete"])
+def test_damaged_bundle_is_refused(tmp_path, damage):
+    bundle = str(tmp_path / "bundle")
+    make_assistant().export_snapshot(bundle)
+    records = os.path.join(bundle, snapshot.RECORDS_FILE)
+
+    with open(records, "rb") as f:
+        data = f.read()
+    if damage == "flip":
+        data = data[:100] + bytes([data[100] ^ 0x01]) + data[101:]
+    elif damage == "truncate":
+        data = data[:len(data) // 2]
+    if damage == "delete":
+        os.remove(records)
+    else:
+        with open(records, "wb") as f:
+            f.write(data)
+
+    message = {"flip": "Checksum mismatch", "truncate": "truncated", "delete": "missing"}[damage]
+    replica = make_assistant(load=False)
+    with pytest.raises(SnapshotError, match=message):
+        replica.import_snapshot(bundle)
+    assert replica.vectorstore._collection.count() == 0
+
+
+def test_unknown_format_version_and_missing_manifest_are_refused(tmp_path):
+    with pytest.raises(SnapshotError, match="No snapshot manifest"):
+        open_snapshot(str(tmp_path))
+
+    bundle = str(tmp_path / "bundle")
+    make_assistant().export_snapshot(bundle)
+    manifest_path = os.path.join(bundle, snapshot.MANIFEST_FILE)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["format_version"] = snapshot.SNAPSHOT_FORMAT_VERSION + 1
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(SnapshotError, match="format version"):
+        open_snapshot(bundle)
+
+
+def test_empty_index_cannot_be_exported(tmp_path):
+    bundle = str(tmp_path / "bundle")
+
+    with pytest.raises(SnapshotError, match="empty"):
+        make_assistant(load=False).export_snapshot(bundle)
+
+    assert not os.path.exists(bundle)
+    assert os.listdir(tmp_path) == []
+
+
+def test_export_replaces_an_existing_bundle_atomically(tmp_path, monkeypatch):
+    bundle = str(tmp_path / "bundle")
+    rag = make_assistant()
+    first = rag.export_snapshot(bundle)
+
+    # A failed export leaves the previous bundle untouched and no temp dir behind
+    def broken_sha256(path, block_size=1 << 20):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(snapshot, "_sha256", broken_sha256)
+        with pytest.raises(OSError):
+            rag.export_snapshot(bundle)
+    assert os.listdir(tmp_path) == ["bundle"]
+    assert open_snapshot(bundle).manifest["created_at"] == first["created_at"]
+
+    rag.delete_source("document1_vae.md")
+    rag.compact()
+    second = rag.export_snapshot(bundle)
+
+    assert os.listdir(tmp_path) == ["bundle"]
+    assert second["count"] < first["count"]
+    assert len(open_snapshot(bundle)) == second["count"]
@@ -0,0 +1,187 @@
+"""
+Multi-tenant Tests
+Tenant id validation and LRU eviction by count and by memory budget
+
+Runs offline: each test gets its own Chroma database and tenant folders.
+"""
+
+import os
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.tenants as tenants_module
+from src.rag_system import RAGAssistant
+from src.tenants import MultiTenantAssistant, TENANT_BASE_BYTES, HNSW_LINK_BYTES
+from src.chunker import TextChunker
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP
+from src.backends import create_llm
+from src.offline import HashingEmbeddings
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "data", "sample_documents")
+
+TENANT_DOCUMENTS = {
+    "acme": ["document1_vae.md"],
+    "globex": ["document2_agentic_ai.md"],
+    "initech": ["document1_vae.md", "document2_agentic_ai.md"],
+}
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def make_tenants(tmp_path):
+    """
+    Builds MultiTenantAssistants over one database and tenant folder tree
+
+    Chroma keeps one client per database path, so every assistant of a
+    test must use the same memory budget.
+    """
+    for tenant_id, filenames in TENANT_DOCUMENTS.items():
+        os.makedirs(tmp_path / "tenants" / tenant_id)
+        for filename in filenames:
+            shutil.copy(os.path.join(SAMPLE_DIR, filename), tmp_path / "tenants" / tenant_id)
+
+    def make(**kwargs):
+        return MultiTenantAssistant(
+            vector_db_path=str(tmp_path / "chroma"),
+            documents_root=str(tmp_path / "tenants"),
+            llm=create_llm("echo"),
+            embeddings=HashingEmbeddings(),
+            answer_cache=False,
+            **kwargs
+        )
+    return make
+
+
+def indexed_sizes():
+    """Estimated bytes of each tenant once its documents are indexed"""
+    chunker = TextChunker(CHUNK_SIZE, CHUNK_OVERLAP)
+    bytes_per_chunk = HashingEmbeddings().dimension * 4 + HNSW_LINK_BYTES + CHUNK_SIZE
+    sizes = {}
+    for tenant_id, filenames in TENANT_DOCUMENTS.items():
+        chunks = 0
+        for filename in filenames:
+            with open(os.path.join(SAMPLE_DIR, filename), encoding="utf-8") as f:
+                chunks += len(chunker.split_text(f.read()))
+        sizes[tenant_id] = TENANT_BASE_BYTES + chunks * bytes_per_chunk
+    return sizes
+
+
+@pytest.mark.parametrize("tenant_id", ["", "-acme", "acme-", "a/b", "a b", "a" * 65])
+def test_invalid_tenant_ids_are_rejected(make_tenants, tenant_id):
+    with pytest.raises(ValueError):
+        make_tenants().get(tenant_id)
+
+
+@pytest.mark.parametrize("tenant_id", ["a", "a.b_c-d", "a" * 64])
+def test_valid_tenant_ids_open_a_collection(make_tenants, tenant_id):
+    tenants = make_tenants()
+    assistant = tenants.get(tenant_id)
+    assert assistant.collection_name == tenants.collection_name_for(tenant_id)
+    assert tenants.open_tenants() == [tenant_id]
+
+
+def test_least_recently_used_tenant_is_evicted(make_tenants):
+    tenants = make_tenants(max_open=2)
+    indexed = tenants.load_documents("globex")
+
+    tenants.get("acme")
+    tenants.get("globex")
+    assert tenants.get("acme") is tenants.get("acme")
+    tenants.get("initech")
+
+    assert tenants.open_tenants() == ["acme", "initech"]
+    assert tenants.stats == {"hits": 3, "opens": 3, "evictions": 1}
+
+    # An evicted tenant reopens with its collection intact
+    assert tenants.get("globex").vectorstore._collection.count() == indexed
+    assert tenants.open_tenants() == ["initech", "globex"]
+    assert tenants.stats["evictions"] == 2
+
+
+def test_memory_budget_evicts_cold_tenants(make_tenants):
+    sizes = indexed_sizes()
+    budget = sizes["globex"] + sizes["initech"]
+    tenants = make_tenants(memory_budget_mb=budget / MB)
+    for tenant_id in TENANT_DOCUMENTS:
+        tenants.load_documents(tenant_id)
+        tenants.evict(tenant_id)
+
+    for tenant_id in ("acme", "globex", "initech"):
+        tenants.get(tenant_id)
+
+    assert tenants.open_tenants() == ["globex", "initech"]
+    assert tenants.memory_usage_bytes() == budget
+    assert tenants.stats["evictions"] == 1
+
+
+def test_hottest_tenant_stays_open_over_budget(make_tenants):
+    sizes = indexed_sizes()
+    tenants = make_tenants(memory_budget_mb=(sizes["initech"] - 1) / MB)
+
+    tenants.get("acme")
+    tenants.load_documents("initech")
+
+    assert tenants.open_tenants() == ["initech"]
+    assert tenants.memory_usage_bytes() == sizes["initech"]
+
+
+def test_loading_documents_rechecks_the_budget(make_tenants):
+    sizes = indexed_sizes()
+    tenants = make_tenants(memory_budget_mb=(sizes["acme"] + sizes["globex"] - 1) / MB)
+
+    tenants.load_documents("acme")
+    tenants.get("globex")
+    assert tenants.open_tenants() == ["acme", "globex"]
+
+    tenants.load_documents("globex")
+
+    assert tenants.open_tenants() == ["globex"]
+
+
+def test_evicted_tenant_releases_its_search_threads(make_tenants):
+    tenants = make_tenants(max_open=1)
+    tenants.load_documents("acme")
+    acme = tenants.get("acme")
+    assert acme.retrieve_relevant("What is a VAE?", multi_query=True)
+    pool = acme._search_pool
+    assert pool is not None
+
+    tenants.get("globex")
+
+    assert acme._search_pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+
+
+def test_slow_open_does_not_block_other_tenants(make_tenants, monkeypatch):
+    opening = threading.Event()
+    release = threading.Event()
+
+    class SlowAssistant(RAGAssistant):
+        def __init__(self, **kwargs):
+            if kwargs["collection_name"].endswith("_globex"):
+                opening.set()
+                release.wait(5)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(tenants_module, "RAGAssistant", SlowAssistant)
+    tenants = make_tenants()
+    acme = tenants.get("acme")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        globex = [pool.submit(tenants.get, "globex") for _ in range(2)]
+        assert opening.wait(5)
+        started = time.monotonic()
+        assert tenants.get("acme") is acme
+        assert time.monotonic() - started < 1.0
+        release.set()
+        first, second = (future.result(5) for future in globex)
+
+    assert first is second
+    assert tenants.stats["opens"] == 2
+    assert tenants.open_tenants() == ["acme", "globex"]
@@ -0,0 +1,128 @@
+"""
+Watcher Tests
+Change detection with PollingBackend and DocumentWatcher's debounced batching
+"""
+
+import time
+
+import pytest
+
+from src.watcher import DocumentWatcher, PollingBackend
+
+POLL_INTERVAL = 0.02
+
+
+class Batches:
+    """on_change callback recording each batch and when it arrived"""
+
+    def __init__(self, fail_first=False):
+        self.batches = []
+        self.times = []
+        self.fail_first = fail_first
+
+    def __call__(self, changed):
+        self.times.append(time.monotonic())
+        self.batches.append(set(changed))
+        if self.fail_first and len(self.batches) == 1:
+            raise RuntimeError("re-indexing failed")
+
+    def wait(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while len(self.batches) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return len(self.batches) >= count
+
+
+@pytest.fixture
+def watch(tmp_path):
+    """Starts DocumentWatchers on tmp_path with a fast polling backend"""
+    watchers = []
+
+    def start(on_change, debounce_seconds, max_delay_seconds=30.0):
+        watcher = DocumentWatcher(
+            str(tmp_path), on_change,
+            debounce_seconds=debounce_seconds, max_delay_seconds=max_delay_seconds,
+            backend=PollingBackend(str(tmp_path), poll_interval=POLL_INTERVAL)
+        )
+        watcher.start()
+        watchers.append(watcher)
+        return watcher
+
+    yield start
+    for watcher in watchers:
+        watcher.stop()
+
+
+def test_polling_backend_reports_created_modified_and_deleted_documents(tmp_path):
+    (tmp_path / "kept.md").write_text("unchanged")
+    (tmp_path / "edited.txt").write_text("v1")
+    (tmp_path / "removed.md").write_text("gone soon")
+    backend = PollingBackend(str(tmp_path), poll_interval=POLL_INTERVAL)
+
+    assert backend.wait(1.0) == set()
+
+    (tmp_path / "edited.txt").write_text("version 2")
+    (tmp_path / "removed.md").unlink()
+    (tmp_path / "new.markdown").write_text("new")
+    (tmp_path / "image.png").write_bytes(b"not a document")
+
+    assert backend.wait(1.0) == {"edited.txt", "removed.md", "new.markdown"}
+    assert backend.wait(1.0) == set()
+
+
+def test_burst_of_changes_is_flushed_as_one_batch(tmp_path, watch):
+    batches = Batches()
+    watch(batches, debounce_seconds=0.3)
+
+    started = time.monotonic()
+    for name in ("a.md", "b.md", "c.txt"):
+        (tmp_path / name).write_text(name)
+        time.sleep(0.05)
+
+    assert batches.wait(1)
+    time.sleep(0.4)
+    assert batches.batches == [{"a.md", "b.md", "c.txt"}]
+    # Flushed only after the burst went quiet for the debounce period
+    assert batches.times[0] - started >= 0.3 + 0.1
+
+
+def test_separate_bursts_are_separate_batches(tmp_path, watch):
+    batches = Batches()
+    watch(batches, debounce_seconds=0.2)
+
+    (tmp_path / "a.md").write_text("a")
+    assert batches.wait(1)
+    (tmp_path / "b.md").write_text("b")
+    assert batches.wait(2)
+
+    assert batches.batches == [{"a.md"}, {"b.md"}]
+
+
+def test_continuous_changes_are_flushed_after_max_delay(tmp_path, watch):
+    batches = Batches()
+    watch(batches, debounce_seconds=0.3, max_delay_seconds=0.5)
+
+    # A change every 0.1s never leaves the debounce period quiet
+    started = time.monotonic()
+    for i in range(15):
+        (tmp_path / "busy.md").write_text("x" * (i + 1))
+        time.sleep(0.1)
+    stopped = time.monotonic()
+
+    assert batches.batches, "max_delay_seconds should flush while changes continue"
+    assert batches.times[0] < stopped
+    assert batches.times[0] - started < 0.5 + 0.2
+    assert all(batch == {"busy.md"} for batch in batches.batches)
+
+
+def test_failed_batch_does_not_stop_the_watcher(tmp_path, watch):
+    batches = Batches(fail_first=True)
+    watcher = watch(batches, debounce_seconds=0.1)
+
+    (tmp_path / "a.md").write_text("a")
+    assert batches.wait(1)
+    (tmp_path / "b.md").write_text("b")
+    assert batches.wait(2)
+
+    assert batches.batches == [{"a.md"}, {"b.md"}]
+    assert watcher.batches_processed == 1